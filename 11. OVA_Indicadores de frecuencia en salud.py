@@ -6,8 +6,14 @@ from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import math
 import random
+import threading
 from io import BytesIO
 import base64
+from cohorte import CohorteSimulada
+from servicio_graficos import servicio_graficos
+
+# Tamaños de población que ofrece el simulador de cohortes
+POPULATION_SIZES = [10000, 50000, 75000, 100000, 1000000, 10000000]
 
 class OVAIndicadoresSalud:
     def __init__(self):
@@ -37,6 +43,7 @@ class OVAIndicadoresSalud:
         self.sim_prevalence = 2.0
         self.sim_incidence = 1.0
         self.sim_lethality = 10.0
+        self.cohort = None
 
     def main(self, page: ft.Page):
         page.title = "OVA 11: Indicadores de Frecuencia en Salud"
@@ -549,9 +556,9 @@ class OVAIndicadoresSalud:
 
     def create_simulator_section(self):
         # Controles del simulador
-        self.sim_pop_slider = ft.Slider(
-            min=1000, max=100000, value=self.sim_population,
-            divisions=99, label="{value}",
+        self.sim_pop_dropdown = ft.Dropdown(
+            options=[ft.dropdown.Option(str(size), f"{size:,}") for size in POPULATION_SIZES],
+            value=str(self.sim_population),
             on_change=self.update_simulation
         )
         self.sim_prev_slider = ft.Slider(
@@ -570,10 +577,22 @@ class OVAIndicadoresSalud:
             on_change=self.update_simulation
         )
         
+        # Día de corte: consulta los acumulados de la cohorte ya simulada
+        self.sim_day_slider = ft.Slider(
+            min=0, max=365, value=365,
+            divisions=365, label="Día {value}",
+            disabled=True,
+            on_change=self.show_cohort_day
+        )
+        
         # Resultados del simulador
         self.sim_prev_result = ft.Text("2.0%", size=20, weight=ft.FontWeight.BOLD, color=ft.colors.RED_600)
         self.sim_inc_result = ft.Text("1.0%", size=20, weight=ft.FontWeight.BOLD, color=ft.colors.BLUE_600)
         self.sim_let_result = ft.Text("10%", size=20, weight=ft.FontWeight.BOLD, color=ft.colors.PURPLE_600)
+        self.sim_period_result = ft.Text("-", size=20, weight=ft.FontWeight.BOLD, color=ft.colors.ORANGE_700)
+        self.sim_density_result = ft.Text("-", size=20, weight=ft.FontWeight.BOLD, color=ft.colors.TEAL_700)
+        self.sim_status = ft.Text("Ejecuta la simulación para generar la cohorte.", size=12, color=ft.colors.GREY_600)
+        self.sim_chart = ft.Image(width=400, height=300, fit=ft.ImageFit.CONTAIN, visible=False)
         
         # Cálculos combinatorios
         self.combinations_result = ft.Text("C(10000,100) ≈ 10^139", size=12)
@@ -588,7 +607,7 @@ class OVAIndicadoresSalud:
                                 ft.Text("Parámetros de Simulación", size=16, weight=ft.FontWeight.BOLD),
                                 ft.Column([
                                     ft.Text("Tamaño de Población:", weight=ft.FontWeight.BOLD),
-                                    self.sim_pop_slider,
+                                    self.sim_pop_dropdown,
                                     ft.Text("Tasa de Prevalencia Inicial (%):", weight=ft.FontWeight.BOLD),
                                     self.sim_prev_slider,
                                     ft.Text("Tasa de Incidencia Anual (%):", weight=ft.FontWeight.BOLD),
@@ -618,13 +637,16 @@ class OVAIndicadoresSalud:
                             ft.Column([
                                 ft.Text("Resultados de la Simulación", size=16, weight=ft.FontWeight.BOLD),
                                 ft.Container(
-                                    content=ft.Text("Gráfico circular aquí", text_align=ft.TextAlign.CENTER),
+                                    content=self.sim_chart,
                                     bgcolor=ft.colors.GREY_100,
                                     width=400,
                                     height=300,
                                     border_radius=8,
                                     alignment=ft.alignment.center
                                 ),
+                                self.sim_status,
+                                ft.Text("Día de corte del seguimiento:", weight=ft.FontWeight.BOLD),
+                                self.sim_day_slider,
                                 ft.Row([
                                     ft.Container(
                                         content=ft.Column([
@@ -656,6 +678,28 @@ class OVAIndicadoresSalud:
                                         border_radius=8,
                                         expand=True
                                     )
+                                ], spacing=10),
+                                ft.Row([
+                                    ft.Container(
+                                        content=ft.Column([
+                                            self.sim_period_result,
+                                            ft.Text("Prevalencia de período", size=12, color=ft.colors.GREY_600)
+                                        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                                        bgcolor=ft.colors.ORANGE_50,
+                                        padding=10,
+                                        border_radius=8,
+                                        expand=True
+                                    ),
+                                    ft.Container(
+                                        content=ft.Column([
+                                            self.sim_density_result,
+                                            ft.Text("Densidad de incidencia (x 1000 personas-año)", size=12, color=ft.colors.GREY_600)
+                                        ], horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                                        bgcolor=ft.colors.TEAL_50,
+                                        padding=10,
+                                        border_radius=8,
+                                        expand=True
+                                    )
                                 ], spacing=10)
                             ], expand=True)
                         ], spacing=20)
@@ -693,7 +737,7 @@ class OVAIndicadoresSalud:
         ], spacing=15, scroll=ft.ScrollMode.AUTO)
 
     def update_simulation(self, e):
-        self.sim_population = int(self.sim_pop_slider.value)
+        self.sim_population = int(self.sim_pop_dropdown.value)
         self.sim_prevalence = self.sim_prev_slider.value
         self.sim_incidence = self.sim_inc_slider.value
         self.sim_lethality = self.sim_let_slider.value
@@ -706,29 +750,85 @@ class OVAIndicadoresSalud:
             self.combinations_result.update()
 
     def run_simulation(self, e):
+        """Genera la cohorte individuo por individuo en segundo plano"""
         population = int(self.sim_population)
-        prevalence = self.sim_prevalence
-        incidence = self.sim_incidence
-        lethality = self.sim_lethality
+        prevalence = self.sim_prevalence / 100
+        incidence = self.sim_incidence / 100
+        lethality = self.sim_lethality / 100
+        
+        self.sim_status.value = f"Simulando una cohorte de {population:,} personas..."
+        self.refresh_controls(self.sim_status)
         
-        # Simular datos
-        existing_cases = int(population * prevalence / 100)
-        new_cases = int((population - existing_cases) * incidence / 100)
-        deaths = int((existing_cases + new_cases) * lethality / 100)
+        def work():
+            try:
+                cohort = CohorteSimulada(population, prevalence, incidence, lethality)
+            except Exception as exc:
+                self.sim_status.value = f"❌ La simulación falló: {exc}"
+                self.refresh_controls(self.sim_status)
+                return
+            self.cohort = cohort
+            self.cohort_series = cohort.serie()
+            self.sim_day_slider.disabled = False
+            self.sim_day_slider.value = cohort.dias
+            self.show_cohort_day(None)
         
-        # Calcular indicadores finales
-        final_prevalence = ((existing_cases + new_cases - deaths) / population * 100)
-        final_incidence = (new_cases / (population - existing_cases) * 100)
-        final_lethality = (deaths / (existing_cases + new_cases) * 100) if (existing_cases + new_cases) > 0 else 0
+        threading.Thread(target=work, daemon=True).start()
+
+    def show_cohort_day(self, e):
+        """Indicadores y gráfico al día elegido, a partir de los acumulados de la cohorte"""
+        if self.cohort is None:
+            return
+        day = int(self.sim_day_slider.value)
+        indicators = self.cohort.indicadores(day)
         
-        # Actualizar resultados
-        self.sim_prev_result.value = f"{final_prevalence:.2f}%"
-        self.sim_inc_result.value = f"{final_incidence:.2f}%"
-        self.sim_let_result.value = f"{final_lethality:.1f}%"
+        self.sim_prev_result.value = f"{indicators['prevalencia_puntual'] * 100:.2f}%"
+        self.sim_inc_result.value = f"{indicators['incidencia_acumulada'] * 100:.2f}%"
+        self.sim_let_result.value = f"{indicators['letalidad'] * 100:.1f}%"
+        self.sim_period_result.value = f"{indicators['prevalencia_periodo'] * 100:.2f}%"
+        self.sim_density_result.value = f"{indicators['densidad_incidencia'] * 1000:.2f}"
+        self.sim_status.value = (
+            f"Día {day}: {indicators['casos_basales']:,} casos al inicio, "
+            f"{indicators['casos_nuevos']:,} casos nuevos, {indicators['muertes']:,} muertes; "
+            f"{indicators['persona_anios']:,.0f} personas-año en riesgo."
+        )
         
-        self.sim_prev_result.update()
-        self.sim_inc_result.update()
-        self.sim_let_result.update()
+        spec = {
+            'tipo': 'ova11_cohorte', 'figsize': (5.5, 4.2), 'dia': day,
+            'series': self.cohort_series, 'poblacion': self.cohort.poblacion
+        }
+        self.sim_chart.visible = True
+        servicio_graficos.asignar(self.sim_chart, spec)
+        self.refresh_controls(
+            self.sim_prev_result, self.sim_inc_result, self.sim_let_result,
+            self.sim_period_result, self.sim_density_result, self.sim_status,
+            self.sim_day_slider, self.sim_chart
+        )
+
+    @staticmethod
+    def refresh_controls(*controls):
+        for control in controls:
+            if control.page is not None:
+                control.update()
+
+    @staticmethod
+    def draw_cohort_evolution(fig, spec):
+        """Evolución de prevalencias, incidencia acumulada y letalidad con el día de corte"""
+        series = spec['series']
+        days = series['dia']
+        ax1, ax2 = fig.subplots(2, 1, sharex=True)
+        ax1.plot(days, series['prevalencia_puntual'] * 100, color='#dc2626', label='Prevalencia puntual')
+        ax1.plot(days, series['prevalencia_periodo'] * 100, color='#ea580c', linestyle='--', label='Prevalencia de período')
+        ax1.plot(days, series['incidencia_acumulada'] * 100, color='#2563eb', label='Incidencia acumulada')
+        ax1.set_ylabel('%')
+        ax1.legend(fontsize=7, loc='upper left')
+        ax1.set_title(f"Cohorte de {spec['poblacion']:,} personas", fontsize=10)
+        ax2.plot(days, series['letalidad'] * 100, color='#7c3aed', label='Letalidad')
+        ax2.set_ylabel('Letalidad (%)')
+        ax2.set_xlabel('Día de seguimiento')
+        for ax in (ax1, ax2):
+            ax.axvline(spec['dia'], color='grey', linestyle=':')
+            ax.grid(True, alpha=0.3)
+        fig.tight_layout()
 
     def load_scenario(self, scenario):
         scenarios = {
@@ -739,12 +839,12 @@ class OVAIndicadoresSalud:
         
         if scenario in scenarios:
             data = scenarios[scenario]
-            self.sim_pop_slider.value = data["population"]
+            self.sim_pop_dropdown.value = str(data["population"])
             self.sim_prev_slider.value = data["prevalence"]
             self.sim_inc_slider.value = data["incidence"]
             self.sim_let_slider.value = data["lethality"]
             
-            self.sim_pop_slider.update()
+            self.sim_pop_dropdown.update()
             self.sim_prev_slider.update()
             self.sim_inc_slider.update()
             self.sim_let_slider.update()
@@ -1429,6 +1529,9 @@ class OVAIndicadoresSalud:
         print("• Visualizaciones apropiadas")
         print("• Consideraciones éticas")
 
+servicio_graficos.registrar('ova11_cohorte', OVAIndicadoresSalud.draw_cohort_evolution)
+
+
 def main(page: ft.Page):
     app = OVAIndicadoresSalud()
     app.main(page)
@@ -4,8 +4,13 @@ import numpy as np
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
-import math
 import json
+import os
+import threading
+from agregacion import capas_dispersion
+from correlacion import motor_correlacion
+from regresion import RegresionLineal
+from servicio_graficos import servicio_graficos
 
 class OVAApp:
     def __init__(self):
@@ -14,6 +19,17 @@ class OVAApp:
         self.quiz_answers = [None] * 10
         self.progress = 0
         
+        # Último modelo ajustado en el simulador (lo usa el predictor)
+        self.regression_model = None
+        
+        # Datos del simulador que no caben en los campos de texto (registro simulado)
+        self.sim_large_data = None
+        self.sim_labels = ["X", "Y"]
+        
+        # Tabla cargada para la matriz de correlaciones
+        self.matrix_file = None
+        self.matrix_picker = None
+        
         # Datos para casos de estudio
         self.case_data = {
             "imc_pa": {
@@ -594,13 +610,15 @@ class OVAApp:
             label="Datos X (separados por comas)",
             value="20, 25, 30, 35, 40, 22, 28, 33, 38, 42",
             multiline=True,
-            max_lines=3
+            max_lines=3,
+            on_change=self.clear_large_data
         )
         self.sim_data_y = ft.TextField(
             label="Datos Y (separados por comas)",
             value="110, 125, 135, 145, 155, 115, 130, 138, 148, 158",
             multiline=True,
-            max_lines=3
+            max_lines=3,
+            on_change=self.clear_large_data
         )
         self.sim_corr_result = ft.Text("-", size=20, weight=ft.FontWeight.BOLD, color=ft.colors.BLUE_600)
         self.sim_r2_result = ft.Text("-", size=20, weight=ft.FontWeight.BOLD, color=ft.colors.GREEN_600)
@@ -608,6 +626,13 @@ class OVAApp:
         self.sim_interpretation = ft.Text("Ingresa datos y calcula la correlación para ver la interpretación.")
         self.sim_predict_input = ft.TextField(label="Valor X", width=100)
         self.sim_predict_result = ft.Text("")
+        self.sim_chart = ft.Container(
+            content=ft.Text("📊 Gráfico de Correlación y Regresión", text_align=ft.TextAlign.CENTER),
+            height=200,
+            bgcolor=ft.colors.GREY_100,
+            border_radius=5,
+            alignment=ft.alignment.center
+        )
         
         simulador_content = ft.Column([
             ft.Text("Simulador Interactivo", size=28, weight=ft.FontWeight.BOLD, text_align=ft.TextAlign.CENTER),
@@ -625,7 +650,8 @@ class OVAApp:
                                 ft.dropdown.Option("imc_pa", "IMC vs Presión Arterial"),
                                 ft.dropdown.Option("edad_cvf", "Edad vs Capacidad Pulmonar"),
                                 ft.dropdown.Option("dosis_tiempo", "Dosis vs Tiempo Recuperación"),
-                                ft.dropdown.Option("sueno_cognitivo", "Sueño vs Rendimiento Cognitivo")
+                                ft.dropdown.Option("sueno_cognitivo", "Sueño vs Rendimiento Cognitivo"),
+                                ft.dropdown.Option("registro", "Registro Simulado (200.000 pacientes)")
                             ],
                             value="custom",
                             on_change=self.update_simulation_data
@@ -682,13 +708,7 @@ class OVAApp:
                     content=ft.Column([
                         ft.Text("Visualización y Resultados", size=18, weight=ft.FontWeight.BOLD),
                         
-                        # Placeholder para gráfico
-                        ft.Container(
-                            content=ft.Text("📊 Gráfico de Correlación y Regresión", text_align=ft.TextAlign.CENTER),
-                            height=200,
-                            bgcolor=ft.colors.GREY_100,
-                            border_radius=5
-                        ),
+                        self.sim_chart,
                         
                         ft.Row([
                             ft.Container(
@@ -741,6 +761,8 @@ class OVAApp:
                 )
             ], spacing=20),
             
+            self.create_matrix_panel(),
+            
             ft.ElevatedButton(
                 "Realizar Actividades Prácticas →",
                 on_click=lambda _: self.show_section("actividades"),
@@ -751,84 +773,257 @@ class OVAApp:
         
         self.content_area.controls.append(simulador_content)
 
+    def create_matrix_panel(self):
+        """Panel para cargar una tabla ancha y ver su matriz de correlaciones"""
+        if self.matrix_picker is None:
+            self.matrix_picker = ft.FilePicker(on_result=self.on_matrix_file_picked)
+            self.page.overlay.append(self.matrix_picker)
+        
+        self.matrix_method = ft.Dropdown(
+            label="Método",
+            options=[
+                ft.dropdown.Option("pearson", "Pearson"),
+                ft.dropdown.Option("spearman", "Spearman")
+            ],
+            value="pearson",
+            width=160,
+            on_change=lambda _: self.show_matrix()
+        )
+        self.matrix_status = ft.Text(
+            "Carga un archivo CSV con variables clínicas numéricas (una columna por variable).",
+            size=12
+        )
+        self.matrix_progress = ft.ProgressRing(width=20, height=20, visible=False)
+        self.matrix_image = ft.Image(src="", visible=False, fit=ft.ImageFit.CONTAIN)
+        if self.matrix_file:
+            self.show_matrix()
+        
+        return ft.Container(
+            content=ft.Column([
+                ft.Text("Matriz de Correlaciones", size=18, weight=ft.FontWeight.BOLD),
+                ft.Row([
+                    ft.ElevatedButton(
+                        "Cargar Tabla CSV",
+                        icon=ft.icons.UPLOAD_FILE,
+                        bgcolor=ft.colors.TEAL_500,
+                        color="white",
+                        on_click=lambda _: self.matrix_picker.pick_files(
+                            allowed_extensions=["csv"], dialog_title="Tabla de variables clínicas"
+                        )
+                    ),
+                    self.matrix_method,
+                    self.matrix_progress
+                ], spacing=10),
+                self.matrix_status,
+                self.matrix_image
+            ], spacing=10),
+            bgcolor="white",
+            padding=15,
+            border_radius=10,
+            shadow=ft.BoxShadow(spread_radius=1, blur_radius=5, color=ft.colors.GREY_300)
+        )
+
+    def on_matrix_file_picked(self, e):
+        if not e.files or not e.files[0].path:
+            return
+        self.matrix_file = e.files[0].path
+        self.show_matrix()
+
+    def show_matrix(self):
+        """Calcula (o toma de la caché) la matriz y su mapa de calor en segundo plano"""
+        if not self.matrix_file:
+            return
+        path = self.matrix_file
+        method = self.matrix_method.value
+        self.matrix_progress.visible = True
+        self.matrix_status.value = f"Procesando {os.path.basename(path)}..."
+        if self.matrix_image.page is not None:
+            self.page.update()
+        
+        def progress(message):
+            self.matrix_status.value = message
+            if self.matrix_status.page is not None:
+                self.matrix_status.update()
+        
+        def work():
+            try:
+                result = motor_correlacion.calcular(path, al_avanzar=progress)
+            except Exception as exc:
+                self.matrix_status.value = f"❌ No se pudo calcular la matriz: {exc}"
+                self.matrix_image.visible = False
+            else:
+                if path != self.matrix_file or method != self.matrix_method.value:
+                    return
+                self.matrix_status.value = (
+                    f"{os.path.basename(path)}: {len(result['columnas'])} variables numéricas, "
+                    f"{result['n']:,} filas completas"
+                )
+                servicio_graficos.asignar(self.matrix_image, {
+                    'tipo': 'ova13_matriz', 'figsize': self.matrix_figsize(len(result['columnas'])),
+                    'matrix': result[method], 'columns': result['columnas'],
+                    'method': method, 'n': result['n']
+                })
+                self.matrix_image.visible = True
+            self.matrix_progress.visible = False
+            if self.matrix_image.page is not None:
+                self.page.update()
+        
+        threading.Thread(target=work, daemon=True).start()
+
+    @staticmethod
+    def matrix_figsize(columns):
+        side = min(12, 3 + 0.35 * columns)
+        return (side + 1.5, side)
+
+    @staticmethod
+    def draw_correlation_matrix(fig, spec):
+        """Mapa de calor de la matriz de correlación (coeficientes escritos si hay pocas variables)"""
+        matrix = spec['matrix']
+        columns = spec['columns']
+        ax = fig.subplots()
+        heatmap = ax.imshow(matrix, cmap='RdBu_r', vmin=-1, vmax=1)
+        fig.colorbar(heatmap, ax=ax, fraction=0.046, pad=0.04)
+        ticks = np.arange(len(columns))
+        ax.set_xticks(ticks)
+        ax.set_yticks(ticks)
+        ax.set_xticklabels(columns, rotation=60, ha='right', fontsize=8)
+        ax.set_yticklabels(columns, fontsize=8)
+        if len(columns) <= 15:
+            for i in ticks:
+                for j in ticks:
+                    ax.text(j, i, f"{matrix[i, j]:.2f}", ha='center', va='center', fontsize=7,
+                            color='white' if abs(matrix[i, j]) > 0.6 else 'black')
+        ax.set_title(f"Correlación de {spec['method'].title()} (n = {spec['n']:,})", fontweight='bold')
+
     def update_simulation_data(self, e):
-        if e.control.value != "custom":
+        if e.control.value == "registro":
+            # Registro grande: los datos viven en arreglos y los campos solo muestran un extracto
+            rng = np.random.default_rng(13)
+            imc = rng.normal(27, 4, 200_000).round(1)
+            presion = (70 + 2.2 * imc + rng.normal(0, 12, imc.size)).round()
+            self.sim_labels = ["IMC (kg/m²)", "Presión Arterial (mmHg)"]
+            self.sim_data_x.value = ", ".join(map(str, imc[:10])) + ", ..."
+            self.sim_data_y.value = ", ".join(map(str, presion[:10])) + ", ..."
+            self.sim_large_data = (imc, presion)
+            self.page.update()
+        elif e.control.value != "custom":
             data = self.case_data[e.control.value]
+            self.sim_labels = data["labels"]
             self.sim_data_x.value = ", ".join(map(str, data["x"]))
             self.sim_data_y.value = ", ".join(map(str, data["y"]))
+            self.sim_large_data = None
             self.page.update()
+        else:
+            self.sim_labels = ["X", "Y"]
+            self.sim_large_data = None
+
+    def clear_large_data(self, e):
+        """Al editar los campos a mano se deja de usar el registro simulado"""
+        self.sim_large_data = None
+
+    def get_simulation_data(self):
+        """Datos X e Y del simulador, o None (tras avisar) si no son válidos"""
+        if self.sim_large_data is not None:
+            return self.sim_large_data
+        x_data = self.parse_data(self.sim_data_x.value)
+        y_data = self.parse_data(self.sim_data_y.value)
+        
+        if len(x_data) != len(y_data) or len(x_data) < 2:
+            self.show_error("Los datos X e Y deben tener la misma cantidad de valores y al menos 2 puntos.")
+            return None
+        return x_data, y_data
+
+    def render_simulation_chart(self, x_data, y_data, model):
+        """Dibuja dispersión (o densidad, si hay muchos puntos) con la recta en segundo plano"""
+        layers = capas_dispersion(x_data, y_data, model)
+        layer = layers.pop("capa")
+        if not isinstance(self.sim_chart.content, ft.Image):
+            self.sim_chart.content = ft.Image(fit=ft.ImageFit.CONTAIN)
+            self.sim_chart.height = 420
+        # El servicio descarta un dibujo viejo si llega después de uno más nuevo
+        servicio_graficos.asignar(self.sim_chart.content, {
+            'tipo': 'ova13_dispersion', 'figsize': (8, 5), 'labels': list(self.sim_labels),
+            'layer': layer, **layers
+        })
+
+    @staticmethod
+    def draw_simulation_chart(fig, spec):
+        """Puntos o densidad en rejilla, con la recta de regresión y su banda de confianza 95%"""
+        ax = fig.subplots()
+        layer = spec['layer']
+        if layer['modo'] == 'puntos':
+            ax.scatter(layer['x'], layer['y'], s=25, color='#1f77b4', alpha=0.7, label='Datos')
+        else:
+            density = ax.pcolormesh(layer['x'], layer['y'], np.ma.masked_invalid(layer['z']),
+                                    cmap='Blues', shading='nearest')
+            fig.colorbar(density, ax=ax, label='Pacientes')
+        ax.fill_between(spec['recta_x'], spec['inferior'], spec['superior'],
+                        color='#d62728', alpha=0.2, linewidth=0, label='IC 95%')
+        ax.plot(spec['recta_x'], spec['recta_y'], color='#d62728', linewidth=2, label='Regresión')
+        title = f"n = {spec['n']:,} · r = {spec['r']:.3f}"
+        if layer['modo'] == 'densidad':
+            title += " · densidad agregada"
+        ax.set_title(title)
+        ax.set_xlabel(spec['labels'][0])
+        ax.set_ylabel(spec['labels'][1])
+        ax.legend(loc='best')
+        ax.grid(True, alpha=0.3)
 
     def parse_data(self, data_string):
         try:
-            return [float(x.strip()) for x in data_string.split(",") if x.strip()]
+            return np.array([float(x.strip()) for x in data_string.split(",") if x.strip()])
         except:
-            return []
+            return np.array([])
 
     def pearson_correlation(self, x, y):
         if len(x) != len(y) or len(x) < 2:
             return 0
-        
-        n = len(x)
-        sum_x = sum(x)
-        sum_y = sum(y)
-        sum_xy = sum(xi * yi for xi, yi in zip(x, y))
-        sum_x2 = sum(xi * xi for xi in x)
-        sum_y2 = sum(yi * yi for yi in y)
-        
-        numerator = n * sum_xy - sum_x * sum_y
-        denominator = math.sqrt((n * sum_x2 - sum_x * sum_x) * (n * sum_y2 - sum_y * sum_y))
-        
-        return numerator / denominator if denominator != 0 else 0
+        return RegresionLineal.desde_arreglos(x, y).r
 
     def linear_regression(self, x, y):
         if len(x) != len(y) or len(x) < 2:
             return {"slope": 0, "intercept": 0}
-        
-        n = len(x)
-        sum_x = sum(x)
-        sum_y = sum(y)
-        sum_xy = sum(xi * yi for xi, yi in zip(x, y))
-        sum_x2 = sum(xi * xi for xi in x)
-        
-        slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-        intercept = (sum_y - slope * sum_x) / n
-        
-        return {"slope": slope, "intercept": intercept}
+        model = RegresionLineal.desde_arreglos(x, y)
+        return {"slope": model.pendiente, "intercept": model.intercepto}
 
     def calculate_correlation(self, e):
-        x_data = self.parse_data(self.sim_data_x.value)
-        y_data = self.parse_data(self.sim_data_y.value)
-        
-        if len(x_data) != len(y_data) or len(x_data) < 2:
-            self.show_error("Los datos X e Y deben tener la misma cantidad de valores y al menos 2 puntos.")
+        data = self.get_simulation_data()
+        if data is None:
             return
+        x_data, y_data = data
         
-        correlation = self.pearson_correlation(x_data, y_data)
+        model = RegresionLineal.desde_arreglos(x_data, y_data)
+        correlation = model.r
         r2 = correlation * correlation
         
         self.sim_corr_result.value = f"{correlation:.3f}"
         self.sim_r2_result.value = f"{r2:.3f}"
         
         self.update_interpretation(correlation, r2)
+        self.render_simulation_chart(x_data, y_data, model)
         self.page.update()
 
     def calculate_regression(self, e):
-        x_data = self.parse_data(self.sim_data_x.value)
-        y_data = self.parse_data(self.sim_data_y.value)
-        
-        if len(x_data) != len(y_data) or len(x_data) < 2:
-            self.show_error("Los datos X e Y deben tener la misma cantidad de valores y al menos 2 puntos.")
+        data = self.get_simulation_data()
+        if data is None:
             return
+        x_data, y_data = data
         
-        regression = self.linear_regression(x_data, y_data)
-        correlation = self.pearson_correlation(x_data, y_data)
-        r2 = correlation * correlation
+        # Un solo ajuste alimenta r, R², la ecuación y el predictor
+        self.regression_model = RegresionLineal.desde_arreglos(x_data, y_data)
+        summary = self.regression_model.resumen()
+        regression = {"slope": summary["slope"], "intercept": summary["intercept"]}
+        correlation = summary["r"]
+        r2 = summary["r2"]
         
         self.sim_corr_result.value = f"{correlation:.3f}"
         self.sim_r2_result.value = f"{r2:.3f}"
         self.sim_equation.value = f"Y = {regression['intercept']:.2f} + {regression['slope']:.2f}X"
         
         self.update_interpretation(correlation, r2, regression)
+        if summary["n"] > 2:
+            self.sim_interpretation.value += f"\nError estándar residual: {summary['residual_se']:.3f}"
+        self.render_simulation_chart(x_data, y_data, self.regression_model)
         self.page.update()
 
     def update_interpretation(self, correlation, r2, regression=None):
@@ -858,22 +1053,18 @@ class OVAApp:
     def make_prediction(self, e):
         try:
             x_value = float(self.sim_predict_input.value)
-            equation_text = self.sim_equation.value
             
-            if equation_text == "Y = a + bX":
+            if self.regression_model is None:
                 self.show_error("Primero calcula la regresión lineal.")
                 return
             
-            # Extraer coeficientes de la ecuación
-            import re
-            match = re.search(r'Y = ([-\d.]+) \+ ([-\d.]+)X', equation_text)
-            if match:
-                intercept = float(match.group(1))
-                slope = float(match.group(2))
-                prediction = intercept + slope * x_value
-                
-                self.sim_predict_result.value = f"Para X = {x_value}, Y predicho = {prediction:.2f}"
-                self.page.update()
+            prediction, lower, upper = self.regression_model.intervalo_prediccion(x_value)
+            result = f"Para X = {x_value}, Y predicho = {prediction:.2f}"
+            if self.regression_model.n > 2:
+                result += f"\nIntervalo de predicción 95%: [{lower:.2f}, {upper:.2f}]"
+            
+            self.sim_predict_result.value = result
+            self.page.update()
         except ValueError:
             self.show_error("Por favor, ingresa un valor numérico válido.")
 
@@ -1327,6 +1518,9 @@ class OVAApp:
             padding=15
         )
 
+servicio_graficos.registrar('ova13_matriz', OVAApp.draw_correlation_matrix)
+servicio_graficos.registrar('ova13_dispersion', OVAApp.draw_simulation_chart)
+
 def main(page: ft.Page):
     app = OVAApp()
     app.main(page)
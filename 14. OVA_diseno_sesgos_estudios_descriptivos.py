@@ -1,6 +1,5 @@
 
 import flet as ft
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
@@ -9,12 +8,11 @@ from reportlab.lib.pagesizes import letter
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-import io
-import base64
 import random
 import json
 import os
 from datetime import datetime
+from servicio_graficos import servicio_graficos
 
 class OVA14App:
     def __init__(self):
@@ -579,35 +577,11 @@ class OVA14App:
         real_prevalence = 25
         observed_prevalence = real_prevalence * (1 + selection_bias/100) * (1 + information_bias/100)
         
-        # Crear gráfico con matplotlib
-        fig, ax = plt.subplots(figsize=(8, 6))
-        categories = ['Población Real', 'Muestra Observada', 'Muestra Corregida']
-        values = [real_prevalence, observed_prevalence, real_prevalence]
-        colors = ['#3B82F6', '#EF4444', '#10B981']
-        
-        bars = ax.bar(categories, values, color=colors)
-        ax.set_ylabel('Prevalencia (%)')
-        ax.set_title('Impacto de Sesgos en Prevalencia de Hipertensión')
-        ax.set_ylim(0, 50)
-        
-        # Agregar valores en las barras
-        for bar, value in zip(bars, values):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                   f'{value:.1f}%', ha='center', va='bottom')
-        
-        plt.tight_layout()
-        
-        # Convertir a imagen
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        # Actualizar el contenedor del gráfico
-        self.simulation_chart.content = ft.Image(
-            src_base64=img_base64,
+        # Crear gráfico en segundo plano
+        spec = {'tipo': 'ova14_sesgos', 'figsize': (8, 6),
+                'real_prevalence': real_prevalence, 'observed_prevalence': observed_prevalence}
+        self.simulation_chart.content = servicio_graficos.imagen(
+            spec,
             width=400,
             height=300,
             fit=ft.ImageFit.CONTAIN
@@ -633,6 +607,28 @@ class OVA14App:
         dialog.open = True
         self.page.update()
 
+    @staticmethod
+    def draw_simulation_chart(fig, spec):
+        real_prevalence = spec['real_prevalence']
+        observed_prevalence = spec['observed_prevalence']
+        ax = fig.subplots()
+        categories = ['Población Real', 'Muestra Observada', 'Muestra Corregida']
+        values = [real_prevalence, observed_prevalence, real_prevalence]
+        colors = ['#3B82F6', '#EF4444', '#10B981']
+        
+        bars = ax.bar(categories, values, color=colors)
+        ax.set_ylabel('Prevalencia (%)')
+        ax.set_title('Impacto de Sesgos en Prevalencia de Hipertensión')
+        ax.set_ylim(0, 50)
+        
+        # Agregar valores en las barras
+        for bar, value in zip(bars, values):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                   f'{value:.1f}%', ha='center', va='bottom')
+        
+        fig.tight_layout()
+
     def close_dialog(self):
         self.page.dialog.open = False
         self.page.update()
@@ -728,27 +724,19 @@ class OVA14App:
         ], alignment=ft.MainAxisAlignment.SPACE_BETWEEN)
 
     def create_sample_chart(self):
+        spec = {'tipo': 'ova14_muestra', 'figsize': (6, 4)}
+        return servicio_graficos.imagen(spec, width=300, height=200, fit=ft.ImageFit.CONTAIN)
+
+    @staticmethod
+    def draw_sample_chart(fig, spec):
         # Crear gráfico de dona simple
-        fig, ax = plt.subplots(figsize=(6, 4))
+        ax = fig.subplots()
         sizes = [45, 55]
         labels = ['Hombres', 'Mujeres']
         colors = ['#3B82F6', '#EC4899']
         
         ax.pie(sizes, labels=labels, colors=colors, autopct='%1.1f%%', startangle=90)
         ax.set_title('Distribución por Sexo')
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        return ft.Image(
-            src_base64=img_base64,
-            width=300,
-            height=200,
-            fit=ft.ImageFit.CONTAIN
-        )
 
     def create_bias_analysis(self):
         return ft.Container(
@@ -1631,6 +1619,9 @@ class OVA14App:
         dialog.open = True
         self.page.update()
 
+servicio_graficos.registrar('ova14_sesgos', OVA14App.draw_simulation_chart)
+servicio_graficos.registrar('ova14_muestra', OVA14App.draw_sample_chart)
+
 def main(page: ft.Page):
     app = OVA14App()
     app.main(page)
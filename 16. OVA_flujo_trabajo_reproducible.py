@@ -1,14 +1,10 @@
 
 import flet as ft
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-import io
-import base64
 import random
 import json
 from datetime import datetime
 import os
+from servicio_graficos import servicio_graficos
 
 class OVAApp:
     def __init__(self):
@@ -1128,8 +1124,20 @@ reporte <- paste(
         self.page.update()
 
     def create_results_charts(self):
-        # Crear gráfico simple usando matplotlib
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
+        # Crear gráfico en segundo plano (se reutiliza desde caché al volver a la sección)
+        spec = {'tipo': 'ova16_resultados', 'figsize': (12, 5)}
+        
+        return ft.Column([
+            ft.Text("Resultados del Análisis", size=18, weight=ft.FontWeight.BOLD),
+            ft.Container(
+                content=servicio_graficos.imagen(spec, width=600, height=300),
+                alignment=ft.alignment.center
+            )
+        ])
+
+    @staticmethod
+    def draw_results_charts(fig, spec):
+        ax1, ax2 = fig.subplots(1, 2)
         
         # Gráfico 1: Distribución de PAS
         pas_ranges = ['120-129', '130-139', '140-149', '150-159', '160+']
@@ -1147,22 +1155,7 @@ reporte <- paste(
         ax2.set_ylabel('PAS (mmHg)')
         ax2.set_ylim(135, 150)
         
-        plt.tight_layout()
-        
-        # Convertir a imagen base64
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=100, bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.getvalue()).decode()
-        plt.close()
-        
-        return ft.Column([
-            ft.Text("Resultados del Análisis", size=18, weight=ft.FontWeight.BOLD),
-            ft.Container(
-                content=ft.Image(src_base64=img_base64, width=600, height=300),
-                alignment=ft.alignment.center
-            )
-        ])
+        fig.tight_layout()
 
     def show_evaluation_section(self):
         title = ft.Text("Evaluación Automatizada", 
@@ -1783,6 +1776,8 @@ Universidad Antonio Nariño
             self.page.snack_bar.open = True
             self.page.update()
 
+servicio_graficos.registrar('ova16_resultados', OVAApp.draw_results_charts)
+
 def main(page: ft.Page):
     app = OVAApp()
     app.main(page)
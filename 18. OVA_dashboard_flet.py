@@ -1,15 +1,13 @@
 
 import flet as ft
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import threading
 import time
-import io
-import base64
 from datetime import datetime
 import math
+from servicio_graficos import servicio_graficos
 
 class OVADashboard:
     def __init__(self):
@@ -115,9 +113,20 @@ class OVADashboard:
             }
         ]
 
-    def create_chart_image(self, chart_type, data, title="", labels=None):
-        """Crear gráfico usando matplotlib y convertir a imagen base64"""
-        fig, ax = plt.subplots(figsize=(8, 6))
+    def create_chart_image(self, chart_type, data, title="", labels=None, **kwargs):
+        """Crear gráfico en segundo plano; retorna el control que mostrará la imagen"""
+        spec = {'tipo': 'ova18_grafico', 'figsize': (8, 6), 'chart_type': chart_type,
+                'data': data, 'title': title, 'labels': labels}
+        return servicio_graficos.imagen(spec, **kwargs)
+
+    @staticmethod
+    def draw_chart(fig, spec):
+        """Dibujar gráfico de línea, barras o torta"""
+        chart_type = spec['chart_type']
+        data = spec['data']
+        title = spec['title']
+        labels = spec['labels']
+        ax = fig.subplots()
         fig.patch.set_facecolor('white')
         
         if chart_type == "line":
@@ -132,7 +141,7 @@ class OVADashboard:
                 bars = ax.bar(labels, data, color=['#3B82F6', '#10B981', '#F59E0B', '#EF4444', '#8B5CF6', '#6B7280'])
                 # Rotar etiquetas si son muchas
                 if len(labels) > 6:
-                    plt.xticks(rotation=45)
+                    ax.tick_params(axis='x', labelrotation=45)
             else:
                 bars = ax.bar(range(len(data)), data)
                 
@@ -141,16 +150,7 @@ class OVADashboard:
             ax.pie(data, labels=labels, autopct='%1.1f%%', colors=colors[:len(data)])
             
         ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-        plt.tight_layout()
-        
-        # Convertir a base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close(fig)
-        
-        return f"data:image/png;base64,{image_base64}"
+        fig.tight_layout()
 
     def update_progress(self, page):
         """Actualizar barra de progreso"""
@@ -457,8 +457,8 @@ class OVADashboard:
         age_data = [23, 156, 298, 387, 267, 116]
         age_labels = ['0-18', '19-30', '31-45', '46-60', '61-75', '76+']
         
-        time_chart = self.create_chart_image("line", time_series_data, "Tendencia Temporal", time_labels)
-        age_chart = self.create_chart_image("bar", age_data, "Distribución por Edad", age_labels)
+        time_chart = self.create_chart_image("line", time_series_data, "Tendencia Temporal", time_labels, width=400, height=250, fit=ft.ImageFit.CONTAIN)
+        age_chart = self.create_chart_image("bar", age_data, "Distribución por Edad", age_labels, width=400, height=250, fit=ft.ImageFit.CONTAIN)
         
         # Dropdown para seleccionar dataset
         dataset_dropdown = ft.Dropdown(
@@ -501,7 +501,7 @@ class OVADashboard:
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Tendencia Temporal", size=16, weight=ft.FontWeight.BOLD),
-                            ft.Image(src=time_chart, width=400, height=250, fit=ft.ImageFit.CONTAIN)
+                            time_chart
                         ]),
                         bgcolor=ft.colors.GREY_50,
                         padding=15,
@@ -512,7 +512,7 @@ class OVADashboard:
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Distribución por Edad", size=16, weight=ft.FontWeight.BOLD),
-                            ft.Image(src=age_chart, width=400, height=250, fit=ft.ImageFit.CONTAIN)
+                            age_chart
                         ]),
                         bgcolor=ft.colors.GREY_50,
                         padding=15,
@@ -648,12 +648,12 @@ class OVADashboard:
         # Gráfico para caso 1
         case1_data = [3, 8, 12, 9, 7, 4, 2]
         case1_labels = ['0-10', '11-20', '21-30', '31-40', '41-50', '51-60', '61-70']
-        case1_chart = self.create_chart_image("bar", case1_data, "Casos por Edad", case1_labels)
+        case1_chart = self.create_chart_image("bar", case1_data, "Casos por Edad", case1_labels, width=300, height=200, fit=ft.ImageFit.CONTAIN)
         
         # Gráfico para caso 2
         days = list(range(1, 31))
         systolic = [145, 142, 148, 155, 138, 162, 149, 144, 151, 139, 147, 153, 141, 158, 146, 143, 150, 156, 140, 152, 148, 145, 159, 142, 147, 154, 141, 149, 146, 143]
-        case2_chart = self.create_chart_image("line", systolic, "Presión Arterial - 30 días", [f"D{i}" for i in days[::5]])
+        case2_chart = self.create_chart_image("line", systolic, "Presión Arterial - 30 días", [f"D{i}" for i in days[::5]], width=300, height=200, fit=ft.ImageFit.CONTAIN)
         
         return ft.Container(
             content=ft.Column([
@@ -692,7 +692,7 @@ class OVADashboard:
                                         ft.Text("• Tiempo de evolución: 6-24 horas")
                                     ], expand=True),
                                     ft.Container(
-                                        content=ft.Image(src=case1_chart, width=300, height=200, fit=ft.ImageFit.CONTAIN),
+                                        content=case1_chart,
                                         bgcolor=ft.colors.WHITE,
                                         padding=10,
                                         border_radius=8
@@ -774,7 +774,7 @@ class OVADashboard:
                                         ft.Text("Mediciones fuera de rango: 23%")
                                     ], expand=True),
                                     ft.Container(
-                                        content=ft.Image(src=case2_chart, width=300, height=200, fit=ft.ImageFit.CONTAIN),
+                                        content=case2_chart,
                                         bgcolor=ft.colors.WHITE,
                                         padding=10,
                                         border_radius=8
@@ -852,7 +852,7 @@ class OVADashboard:
         # Crear gráfico para ejercicio 2
         exercise_data = [65, 78, 90, 81, 95, 87, 102]
         exercise_labels = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio', 'Julio']
-        exercise_chart = self.create_chart_image("line", exercise_data, "Casos Registrados por Mes", exercise_labels)
+        exercise_chart = self.create_chart_image("line", exercise_data, "Casos Registrados por Mes", exercise_labels, width=500, height=300, fit=ft.ImageFit.CONTAIN)
         
         return ft.Container(
             content=ft.Column([
@@ -964,7 +964,7 @@ class OVADashboard:
                                 ft.Text("Observa el siguiente dashboard de un hospital y responde las preguntas:"),
                                 ft.Container(height=10),
                                 ft.Container(
-                                    content=ft.Image(src=exercise_chart, width=500, height=300, fit=ft.ImageFit.CONTAIN),
+                                    content=exercise_chart,
                                     bgcolor=ft.colors.WHITE,
                                     padding=15,
                                     border_radius=8
@@ -1280,6 +1280,8 @@ class OVADashboard:
             )
         )
 
+servicio_graficos.registrar('ova18_grafico', OVADashboard.draw_chart)
+
 def main(page: ft.Page):
     page.title = "OVA Dashboard Descriptivo - Ciencias de la Salud"
     page.theme_mode = ft.ThemeMode.LIGHT
@@ -1,14 +1,12 @@
 
 import flet as ft
-import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import pandas as pd
-import io
-import base64
 from datetime import datetime
 import json
+from servicio_graficos import servicio_graficos
 
 class OVAInequidadesSalud:
     def __init__(self):
@@ -506,8 +504,13 @@ class OVAInequidadesSalud:
         self.page.show_snack_bar(ft.SnackBar(content=ft.Text(f"Mostrando detalles de: {concept_title}")))
 
     def create_trend_chart(self):
+        spec = {'tipo': 'ova19_tendencia', 'figsize': (6, 4)}
+        return servicio_graficos.imagen(spec, height=200)
+
+    @staticmethod
+    def draw_trend_chart(fig, spec):
         # Crear gráfico simple con matplotlib
-        fig, ax = plt.subplots(figsize=(6, 4))
+        ax = fig.subplots()
         years = ['2018', '2019', '2020', '2021', '2022']
         privileged = [45, 42, 40, 38, 35]
         disadvantaged = [95, 92, 88, 85, 82]
@@ -518,14 +521,6 @@ class OVAInequidadesSalud:
         ax.set_title('Tendencias de Inequidad')
         ax.legend()
         ax.grid(True, alpha=0.3)
-        
-        # Convertir a imagen
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return ft.Image(src_base64=base64.b64encode(buf.getvalue()).decode(), height=200)
 
     def calculate_inequality(self, e):
         try:
@@ -766,7 +761,12 @@ class OVAInequidadesSalud:
         self.page.update()
 
     def create_maternal_chart(self):
-        fig, ax = plt.subplots(figsize=(6, 4))
+        spec = {'tipo': 'ova19_materna', 'figsize': (6, 4)}
+        return servicio_graficos.imagen(spec, height=200)
+
+    @staticmethod
+    def draw_maternal_chart(fig, spec):
+        ax = fig.subplots()
         departments = ['Chocó', 'La Guajira', 'Antioquia', 'Valle', 'Bogotá']
         rates = [155.2, 142.8, 45.3, 38.7, 28.5]
         colors = ['red', 'orange', 'yellow', 'lightgreen', 'cyan']
@@ -775,16 +775,14 @@ class OVAInequidadesSalud:
         ax.set_ylabel('Tasa de Mortalidad Materna')
         ax.set_title('Mortalidad Materna por Departamento')
         ax.tick_params(axis='x', rotation=45)
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return ft.Image(src_base64=base64.b64encode(buf.getvalue()).decode(), height=200)
 
     def create_inequality_chart(self):
-        fig, ax = plt.subplots(figsize=(6, 4))
+        spec = {'tipo': 'ova19_inequidad', 'figsize': (6, 4)}
+        return servicio_graficos.imagen(spec, height=200)
+
+    @staticmethod
+    def draw_inequality_chart(fig, spec):
+        ax = fig.subplots()
         departments = ['Bogotá', 'Valle', 'Antioquia', 'La Guajira', 'Chocó']
         ratios = [1.0, 1.36, 1.59, 5.01, 5.44]
         
@@ -794,13 +792,6 @@ class OVAInequidadesSalud:
         ax.set_title('Inequidad Relativa')
         ax.tick_params(axis='x', rotation=45)
         ax.grid(True, alpha=0.3)
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        plt.close()
-        
-        return ft.Image(src_base64=base64.b64encode(buf.getvalue()).decode(), height=200)
 
     def create_guided_steps(self):
         steps = [
@@ -1126,6 +1117,10 @@ class OVAInequidadesSalud:
     def generate_certificate(self, e):
         self.page.show_snack_bar(ft.SnackBar(content=ft.Text("¡Felicitaciones! Generando certificado de finalización...")))
 
+servicio_graficos.registrar('ova19_tendencia', OVAInequidadesSalud.draw_trend_chart)
+servicio_graficos.registrar('ova19_materna', OVAInequidadesSalud.draw_maternal_chart)
+servicio_graficos.registrar('ova19_inequidad', OVAInequidadesSalud.draw_inequality_chart)
+
 def main(page: ft.Page):
     app = OVAInequidadesSalud()
     app.main(page)
@@ -1,9 +1,19 @@
 
 import flet as ft
-import math
+import os
 import random
+import threading
 import time
 from datetime import datetime
+import numpy as np
+import pandas as pd
+from tablas_frecuencia import ConteoCategorias
+from tablas_contingencia import MotorContingencia
+
+# Categorías que se muestran antes de agrupar el resto en "Otros"
+TOP_CATEGORIES = 15
+# Máximo de categorías de una variable para usarla en una tabla cruzada
+MAX_CROSSTAB_CATEGORIES = 20
 
 class OVAApp:
     def __init__(self):
@@ -11,6 +21,10 @@ class OVAApp:
         self.progress = 0
         self.quiz_answers = {}
         self.chat_messages = []
+        self.frequency_counts = None
+        self.frequency_picker = None
+        self.crosstab_engine = None
+        self.crosstab_picker = None
         
     def main(self, page: ft.Page):
         page.title = "OVA: Tablas de Frecuencias y Resúmenes Categóricos"
@@ -492,24 +506,42 @@ class OVAApp:
             width=300
         )
         
+        if self.frequency_picker is None:
+            self.frequency_picker = ft.FilePicker(on_result=lambda e: self.on_frequency_file_picked(page, e))
+            page.overlay.append(self.frequency_picker)
+        
         self.data_input_field = ft.TextField(
             label="Categorías y Frecuencias",
-            hint_text="Formato: Categoría,Frecuencia\nDiabetes,45\nHipertensión,67",
+            hint_text="Formato: Categoría,Frecuencia\nDiabetes,45\nHipertensión,67\n(o una observación por línea)",
             multiline=True,
             min_lines=6,
             max_lines=10,
             width=300
         )
         
+        self.ci_method_dropdown = ft.Dropdown(
+            label="Intervalo de confianza",
+            options=[
+                ft.dropdown.Option("wilson", "Wilson"),
+                ft.dropdown.Option("wald", "Wald"),
+                ft.dropdown.Option("clopper_pearson", "Clopper–Pearson (exacto)")
+            ],
+            value="wilson",
+            width=300,
+            on_change=lambda e: self.show_frequency_table(page)
+        )
+        
         self.result_container = ft.Container(
             content=ft.Text("Los resultados aparecerán aquí...", color=ft.colors.GREY_500),
             bgcolor=ft.colors.WHITE,
             padding=20,
             border_radius=8,
             border=ft.border.all(1, ft.colors.GREY_300),
-            width=400,
+            width=450,
             height=300
         )
+        if self.frequency_counts is not None:
+            self.show_frequency_table(page)
         
         # Campos para el ejercicio
         self.hypertension_field = ft.TextField(
@@ -548,15 +580,26 @@ class OVAApp:
                                 ft.Text("Ingresa los Datos", size=16, weight=ft.FontWeight.BOLD),
                                 self.variable_name_field,
                                 self.data_input_field,
-                                ft.ElevatedButton(
-                                    text="Calcular Tabla",
-                                    icon=ft.icons.CALCULATE,
-                                    on_click=lambda e: self.calculate_frequency_table(page),
-                                    style=ft.ButtonStyle(
-                                        bgcolor=self.colors['secondary'],
-                                        color=ft.colors.WHITE
+                                self.ci_method_dropdown,
+                                ft.Row([
+                                    ft.ElevatedButton(
+                                        text="Calcular Tabla",
+                                        icon=ft.icons.CALCULATE,
+                                        on_click=lambda e: self.calculate_frequency_table(page),
+                                        style=ft.ButtonStyle(
+                                            bgcolor=self.colors['secondary'],
+                                            color=ft.colors.WHITE
+                                        )
+                                    ),
+                                    ft.OutlinedButton(
+                                        text="Cargar CSV",
+                                        icon=ft.icons.UPLOAD_FILE,
+                                        tooltip="Tabula la columna indicada en 'Nombre de la Variable' (o la primera)",
+                                        on_click=lambda e: self.frequency_picker.pick_files(
+                                            allowed_extensions=["csv"], dialog_title="Archivo con la variable categórica"
+                                        )
                                     )
-                                )
+                                ])
                             ]),
                             ft.Column([
                                 ft.Text("Resultado", size=16, weight=ft.FontWeight.BOLD),
@@ -570,6 +613,9 @@ class OVAApp:
                     margin=ft.margin.only(bottom=20)
                 ),
                 
+                # Tablas de contingencia
+                self.create_crosstab_panel(page),
+                
                 # Ejercicio Interactivo
                 ft.Container(
                     content=ft.Column([
@@ -669,70 +715,321 @@ class OVAApp:
             return
         
         try:
-            lines = data_input.strip().split('\n')
-            data = []
-            total = 0
-            
-            for line in lines:
+            # Líneas "Categoría,Frecuencia" o una observación cruda por línea
+            categories, frequencies, observations = [], [], []
+            for line in data_input.strip().split('\n'):
+                line = line.strip()
+                if not line:
+                    continue
                 if ',' in line:
-                    parts = line.split(',')
-                    if len(parts) >= 2:
-                        category = parts[0].strip()
-                        frequency = int(parts[1].strip())
-                        data.append({'category': category, 'frequency': frequency})
-                        total += frequency
+                    category, frequency = line.rsplit(',', 1)
+                    categories.append(category.strip())
+                    frequencies.append(int(frequency.strip()))
+                else:
+                    observations.append(line)
             
-            if not data:
+            counts = ConteoCategorias()
+            if categories:
+                counts.agregar_conteos(categories, frequencies)
+            if observations:
+                counts.agregar(observations)
+            if counts.total == 0:
                 raise ValueError('No se encontraron datos válidos')
             
-            # Calcular proporciones e intervalos de confianza
-            for item in data:
-                item['proportion'] = (item['frequency'] / total) * 100
-                p = item['frequency'] / total
-                se = math.sqrt(p * (1 - p) / total)
-                margin = 1.96 * se
-                item['ci_lower'] = max(0, (p - margin) * 100)
-                item['ci_upper'] = min(100, (p + margin) * 100)
-            
-            # Crear tabla de resultados
-            table_rows = []
-            for item in data:
-                table_rows.append(
-                    ft.DataRow(cells=[
-                        ft.DataCell(ft.Text(item['category'])),
-                        ft.DataCell(ft.Text(str(item['frequency']))),
-                        ft.DataCell(ft.Text(f"{item['proportion']:.1f}%")),
-                        ft.DataCell(ft.Text(f"({item['ci_lower']:.1f}% - {item['ci_upper']:.1f}%)"))
-                    ])
-                )
-            
+            self.frequency_counts = counts
+            self.show_frequency_table(page)
+            return
+        except Exception as e:
+            self.result_container.content = ft.Text(f"Error: {str(e)}", color=ft.colors.RED_500)
+        
+        page.update()
+    
+    def on_frequency_file_picked(self, page, e):
+        """Cuenta la columna elegida de un CSV en segundo plano, por bloques"""
+        if not e.files or not e.files[0].path:
+            return
+        path = e.files[0].path
+        self.result_container.content = ft.Row([
+            ft.ProgressRing(width=20, height=20),
+            ft.Text(f"Contando categorías de {os.path.basename(path)}...")
+        ])
+        page.update()
+        
+        def work():
+            try:
+                columns = pd.read_csv(path, nrows=0).columns.tolist()
+                if not columns:
+                    raise ValueError('El archivo no tiene columnas')
+                column = self.variable_name_field.value if self.variable_name_field.value in columns else columns[0]
+                self.frequency_counts = ConteoCategorias.desde_csv(path, column)
+                self.variable_name_field.value = column
+            except Exception as exc:
+                self.result_container.content = ft.Text(f"Error: {exc}", color=ft.colors.RED_500)
+                page.update()
+                return
+            self.show_frequency_table(page)
+        
+        threading.Thread(target=work, daemon=True).start()
+    
+    def show_frequency_table(self, page):
+        """Muestra la tabla de los conteos actuales con el intervalo elegido"""
+        if self.frequency_counts is None:
+            return
+        method = self.ci_method_dropdown.value
+        table = self.frequency_counts.tabla(top_k=TOP_CATEGORIES)
+        intervals = table[method] * 100
+        
+        table_rows = []
+        for category, frequency, proportion, (lower, upper) in zip(
+            table['categorias'], table['n'], table['proporcion'], intervals
+        ):
             table_rows.append(
                 ft.DataRow(cells=[
-                    ft.DataCell(ft.Text("Total", weight=ft.FontWeight.BOLD)),
-                    ft.DataCell(ft.Text(str(total), weight=ft.FontWeight.BOLD)),
-                    ft.DataCell(ft.Text("100.0%", weight=ft.FontWeight.BOLD)),
-                    ft.DataCell(ft.Text("-", weight=ft.FontWeight.BOLD))
+                    ft.DataCell(ft.Text(category)),
+                    ft.DataCell(ft.Text(f"{frequency:,}")),
+                    ft.DataCell(ft.Text(f"{proportion * 100:.1f}%")),
+                    ft.DataCell(ft.Text(f"({lower:.1f}% - {upper:.1f}%)"))
                 ])
             )
-            
-            result_table = ft.Column([
-                ft.Text(f"Tabla de Frecuencias: {variable_name}", weight=ft.FontWeight.BOLD),
-                ft.DataTable(
-                    columns=[
-                        ft.DataColumn(ft.Text("Categoría", weight=ft.FontWeight.BOLD)),
-                        ft.DataColumn(ft.Text("n", weight=ft.FontWeight.BOLD)),
-                        ft.DataColumn(ft.Text("%", weight=ft.FontWeight.BOLD)),
-                        ft.DataColumn(ft.Text("IC 95%", weight=ft.FontWeight.BOLD))
-                    ],
-                    rows=table_rows
-                )
+        
+        table_rows.append(
+            ft.DataRow(cells=[
+                ft.DataCell(ft.Text("Total", weight=ft.FontWeight.BOLD)),
+                ft.DataCell(ft.Text(f"{table['total']:,}", weight=ft.FontWeight.BOLD)),
+                ft.DataCell(ft.Text("100.0%", weight=ft.FontWeight.BOLD)),
+                ft.DataCell(ft.Text("-", weight=ft.FontWeight.BOLD))
             ])
-            
-            self.result_container.content = result_table
-            
-        except Exception as e:
-            self.result_container.content = ft.Text(f"Error: {str(e)}", color=ft.colors.RED_500)
+        )
+        
+        notes = []
+        if table['agrupadas']:
+            notes.append(f"'Otros' agrupa {table['agrupadas']:,} categorías menos frecuentes.")
+        if table['faltantes']:
+            notes.append(f"Se excluyeron {table['faltantes']:,} registros sin dato.")
+        
+        self.result_container.content = ft.Column([
+            ft.Text(f"Tabla de Frecuencias: {self.variable_name_field.value}", weight=ft.FontWeight.BOLD),
+            ft.DataTable(
+                columns=[
+                    ft.DataColumn(ft.Text("Categoría", weight=ft.FontWeight.BOLD)),
+                    ft.DataColumn(ft.Text("n", weight=ft.FontWeight.BOLD)),
+                    ft.DataColumn(ft.Text("%", weight=ft.FontWeight.BOLD)),
+                    ft.DataColumn(ft.Text("IC 95%", weight=ft.FontWeight.BOLD))
+                ],
+                rows=table_rows
+            ),
+            *[ft.Text(note, size=12, color=ft.colors.GREY_600) for note in notes]
+        ], scroll=ft.ScrollMode.AUTO)
+        page.update()
+    
+    def create_crosstab_panel(self, page):
+        """Panel de tablas cruzadas de dos y tres vías sobre registros crudos"""
+        if self.crosstab_picker is None:
+            self.crosstab_picker = ft.FilePicker(on_result=lambda e: self.on_crosstab_file_picked(page, e))
+            page.overlay.append(self.crosstab_picker)
+        
+        refresh = lambda e: self.show_crosstab(page)
+        self.crosstab_row = ft.Dropdown(label="Filas", width=180, on_change=refresh)
+        self.crosstab_col = ft.Dropdown(label="Columnas", width=180, on_change=refresh)
+        self.crosstab_stratum = ft.Dropdown(label="Estratificar por", width=180, on_change=refresh)
+        self.crosstab_filter = ft.Dropdown(label="Filtro", width=220, on_change=refresh)
+        self.crosstab_percent = ft.RadioGroup(
+            content=ft.Row([
+                ft.Radio(value="fila", label="% por fila"),
+                ft.Radio(value="columna", label="% por columna"),
+                ft.Radio(value="total", label="% del total")
+            ]),
+            value="fila",
+            on_change=refresh
+        )
+        self.crosstab_result = ft.Container(
+            content=ft.Text("Usa los datos de ejemplo o carga un CSV con una fila por paciente.",
+                            color=ft.colors.GREY_500),
+            bgcolor=ft.colors.WHITE,
+            padding=20,
+            border_radius=8,
+            border=ft.border.all(1, ft.colors.GREY_300)
+        )
+        if self.crosstab_engine is not None:
+            self.set_crosstab_variables(page)
         
+        return ft.Container(
+            content=ft.Column([
+                ft.Text("Tablas de Contingencia", size=20, weight=ft.FontWeight.BOLD, color=self.colors['secondary']),
+                ft.Text("Cruza dos variables categóricas (y opcionalmente una tercera como estrato) "
+                        "a partir de los registros individuales.", size=14),
+                ft.Row([
+                    ft.ElevatedButton(
+                        text="Datos de ejemplo",
+                        icon=ft.icons.DATASET,
+                        on_click=lambda e: self.load_crosstab_demo(page),
+                        style=ft.ButtonStyle(bgcolor=self.colors['secondary'], color=ft.colors.WHITE)
+                    ),
+                    ft.OutlinedButton(
+                        text="Cargar CSV",
+                        icon=ft.icons.UPLOAD_FILE,
+                        on_click=lambda e: self.crosstab_picker.pick_files(
+                            allowed_extensions=["csv"], dialog_title="Registros de pacientes"
+                        )
+                    )
+                ]),
+                ft.Row([self.crosstab_row, self.crosstab_col, self.crosstab_stratum, self.crosstab_filter], wrap=True),
+                self.crosstab_percent,
+                self.crosstab_result
+            ], spacing=10),
+            bgcolor=ft.colors.BLUE_50,
+            padding=20,
+            border_radius=10,
+            margin=ft.margin.only(bottom=20)
+        )
+    
+    def generate_crosstab_demo(self, n=200000, seed=42):
+        """Registros simulados: la hipertensión depende de la edad y del tabaquismo"""
+        rng = np.random.default_rng(seed)
+        age = rng.choice(["18-39", "40-59", "60+"], n, p=[0.4, 0.35, 0.25])
+        sex = rng.choice(["Femenino", "Masculino"], n)
+        smoking_risk = np.select([age == "18-39", age == "40-59"], [0.3, 0.25], 0.15)
+        smoker = np.where(rng.random(n) < smoking_risk, "Fumador", "No fumador")
+        htn_risk = np.select([age == "18-39", age == "40-59"], [0.08, 0.25], 0.5)
+        htn_risk = np.where(smoker == "Fumador", np.minimum(htn_risk * 1.4, 0.95), htn_risk)
+        hypertension = np.where(rng.random(n) < htn_risk, "Sí", "No")
+        area = rng.choice(["Urbana", "Rural"], n, p=[0.7, 0.3])
+        return pd.DataFrame({
+            "grupo_edad": age, "sexo": sex, "tabaquismo": smoker,
+            "hipertension": hypertension, "zona": area
+        })
+    
+    def load_crosstab_demo(self, page):
+        self.load_crosstab_data(page, self.generate_crosstab_demo, "datos de ejemplo")
+    
+    def on_crosstab_file_picked(self, page, e):
+        if not e.files or not e.files[0].path:
+            return
+        path = e.files[0].path
+        self.load_crosstab_data(page, lambda: pd.read_csv(path, dtype=str), os.path.basename(path))
+    
+    def load_crosstab_data(self, page, loader, source):
+        """Lee y codifica los registros en segundo plano"""
+        self.crosstab_result.content = ft.Row([
+            ft.ProgressRing(width=20, height=20),
+            ft.Text(f"Codificando {source}...")
+        ])
+        page.update()
+        
+        def work():
+            try:
+                self.crosstab_engine = MotorContingencia(loader())
+            except Exception as exc:
+                self.crosstab_result.content = ft.Text(f"Error: {exc}", color=ft.colors.RED_500)
+                page.update()
+                return
+            self.set_crosstab_variables(page)
+        
+        threading.Thread(target=work, daemon=True).start()
+    
+    def set_crosstab_variables(self, page):
+        """Llena los selectores con las variables categóricas utilizables"""
+        engine = self.crosstab_engine
+        variables = [v for v in engine.variables
+                     if 2 <= len(engine.categorias(v)) <= MAX_CROSSTAB_CATEGORIES]
+        if len(variables) < 2:
+            self.crosstab_result.content = ft.Text(
+                f"Se necesitan al menos dos variables con 2 a {MAX_CROSSTAB_CATEGORIES} categorías.",
+                color=ft.colors.RED_500
+            )
+            page.update()
+            return
+        
+        options = [ft.dropdown.Option(v) for v in variables]
+        self.crosstab_row.options = options
+        self.crosstab_col.options = list(options)
+        self.crosstab_stratum.options = [ft.dropdown.Option("", "Ninguna")] + list(options)
+        self.crosstab_filter.options = [ft.dropdown.Option("", "Sin filtro")] + [
+            ft.dropdown.Option(f"{v}={c}", f"{v} = {c}") for v in variables for c in engine.categorias(v)
+        ]
+        if self.crosstab_row.value not in variables:
+            self.crosstab_row.value = variables[0]
+        if self.crosstab_col.value not in variables:
+            self.crosstab_col.value = variables[1]
+        self.crosstab_stratum.value = self.crosstab_stratum.value if self.crosstab_stratum.value in variables else ""
+        self.crosstab_filter.value = ""
+        self.show_crosstab(page)
+    
+    def show_crosstab(self, page):
+        """Muestra la tabla cruzada (de la caché del motor si ya se calculó)"""
+        engine = self.crosstab_engine
+        if engine is None:
+            return
+        row, col = self.crosstab_row.value, self.crosstab_col.value
+        stratum = self.crosstab_stratum.value or None
+        if row == col or stratum in (row, col):
+            self.crosstab_result.content = ft.Text("Elige variables distintas para filas, columnas y estrato.",
+                                                   color=ft.colors.ORANGE_700)
+            page.update()
+            return
+        filter_ = tuple([tuple(self.crosstab_filter.value.split("=", 1))]) if self.crosstab_filter.value else ()
+        
+        table = engine.tabla(row, col, stratum, filter_)
+        mode = self.crosstab_percent.value
+        counts, percents = table['conteos'], table['porcentajes'][mode]
+        row_totals, col_totals = counts.sum(axis=1), counts.sum(axis=0)
+        total = max(table['total'], 1)
+        
+        rows = []
+        for i, label in enumerate(table['filas']):
+            row_pct = 100.0 if mode == "fila" else row_totals[i] / total * 100
+            rows.append(ft.DataRow(cells=[
+                ft.DataCell(ft.Text(label, weight=ft.FontWeight.BOLD)),
+                *[ft.DataCell(ft.Text(f"{counts[i, j]:,} ({percents[i, j]:.1f}%)"))
+                  for j in range(counts.shape[1])],
+                ft.DataCell(ft.Text(f"{row_totals[i]:,} ({row_pct:.1f}%)" if mode != "columna" else f"{row_totals[i]:,}"))
+            ]))
+        col_pct = [100.0 if mode == "columna" else t / total * 100 for t in col_totals]
+        rows.append(ft.DataRow(cells=[
+            ft.DataCell(ft.Text("Total", weight=ft.FontWeight.BOLD)),
+            *[ft.DataCell(ft.Text(f"{t:,} ({p:.1f}%)" if mode != "fila" else f"{t:,}", weight=ft.FontWeight.BOLD))
+              for t, p in zip(col_totals, col_pct)],
+            ft.DataCell(ft.Text(f"{table['total']:,}", weight=ft.FontWeight.BOLD))
+        ]))
+        
+        chi2 = table['chi2']
+        summary = [
+            f"Chi-cuadrado = {chi2['estadistico']:.2f} (gl = {chi2['gl']}, p = {chi2['p']:.4f})"
+            if chi2['gl'] else "Chi-cuadrado no aplicable: la tabla tiene una sola fila o columna con datos."
+        ]
+        if chi2['gl'] and chi2['esperado_minimo'] < 5:
+            summary.append("⚠️ Hay frecuencias esperadas menores a 5: interpreta el chi-cuadrado con cautela.")
+        if stratum:
+            mh = table['mantel_haenszel']
+            if mh is not None:
+                summary.append(
+                    f"Cochran–Mantel–Haenszel por {stratum}: χ² = {mh['estadistico']:.2f} "
+                    f"(gl = {mh['gl']}, p = {mh['p']:.4f}, {mh['estratos']} estratos)"
+                )
+                if 'odds_ratio' in mh:
+                    by_stratum = ", ".join(
+                        f"{label}: {value:.2f}" for label, value in zip(table['estratos'], mh['odds_ratio_estratos'])
+                        if np.isfinite(value)
+                    )
+                    summary.append(
+                        f"OR de Mantel–Haenszel = {mh['odds_ratio']:.2f} "
+                        f"(IC 95%: {mh['ic_inferior']:.2f} - {mh['ic_superior']:.2f}); OR por estrato: {by_stratum}"
+                    )
+        if table['excluidos']:
+            summary.append(f"Registros excluidos (sin dato o fuera del filtro): {table['excluidos']:,}")
+        
+        self.crosstab_result.content = ft.Column([
+            ft.Text(f"{row} × {col}", weight=ft.FontWeight.BOLD),
+            ft.Row([
+                ft.DataTable(
+                    columns=[ft.DataColumn(ft.Text(row, weight=ft.FontWeight.BOLD))]
+                    + [ft.DataColumn(ft.Text(c, weight=ft.FontWeight.BOLD)) for c in table['columnas']]
+                    + [ft.DataColumn(ft.Text("Total", weight=ft.FontWeight.BOLD))],
+                    rows=rows
+                )
+            ], scroll=ft.ScrollMode.AUTO),
+            *[ft.Text(line, size=12) for line in summary]
+        ])
         page.update()
     
     def check_exercise_answers(self, page):
@@ -1,73 +1,86 @@
 
 import flet as ft
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
+import hashlib
+import threading
 import numpy as np
-import statistics
-import random
-import io
-import base64
-from typing import List, Dict, Any
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Union
+from estadistica_streaming import medidas_centrales
+from servicio_graficos import servicio_graficos
 
 class EstadisticasCalculator:
     """Clase para cálculos estadísticos"""
     
+    # Resúmenes recientes indexados por el contenido de los datos: cada caso
+    # pide media, mediana y moda por separado y el histograma vuelve a
+    # necesitar media y mediana para sus líneas de referencia
+    _resumenes: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+    _max_resumenes = 32
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def resumen(datos: List[float]) -> Dict[str, Any]:
+        """Media, mediana y modas calculadas una sola vez por conjunto de datos"""
+        arreglo = np.asarray(datos)
+        clave = arreglo.dtype.str + hashlib.blake2b(arreglo.tobytes(), digest_size=16).hexdigest()
+        cache = EstadisticasCalculator._resumenes
+        with EstadisticasCalculator._lock:
+            if clave in cache:
+                cache.move_to_end(clave)
+                return cache[clave]
+        
+        resultado = medidas_centrales(arreglo)
+        with EstadisticasCalculator._lock:
+            cache[clave] = resultado
+            if len(cache) > EstadisticasCalculator._max_resumenes:
+                cache.popitem(last=False)
+        return resultado
+    
     @staticmethod
     def calcular_media(datos: List[float]) -> float:
-        return sum(datos) / len(datos)
+        return EstadisticasCalculator.resumen(datos)['media']
     
     @staticmethod
     def calcular_mediana(datos: List[float]) -> float:
-        return statistics.median(datos)
+        return EstadisticasCalculator.resumen(datos)['mediana']
     
     @staticmethod
     def calcular_moda(datos: List[float]) -> str:
-        try:
-            moda = statistics.mode(datos)
-            return str(moda)
-        except statistics.StatisticsError:
-            # Si no hay moda única, encontrar las más frecuentes
-            frecuencias = {}
-            for dato in datos:
-                frecuencias[dato] = frecuencias.get(dato, 0) + 1
-            
-            max_freq = max(frecuencias.values())
-            if max_freq == 1:
-                return "No hay moda"
-            
-            modas = [k for k, v in frecuencias.items() if v == max_freq]
-            return ", ".join(map(str, modas))
+        modas = EstadisticasCalculator.resumen(datos)['modas']
+        if not modas:
+            return "No hay moda"
+        return ", ".join(map(str, modas))
 
 class GraficosGenerator:
     """Clase para generar gráficos"""
     
     @staticmethod
-    def crear_histograma(datos: List[float], titulo: str, color: str = 'blue') -> str:
-        """Crea un histograma y retorna la imagen como base64"""
-        plt.figure(figsize=(8, 6))
-        plt.hist(datos, bins=min(10, len(set(datos))), alpha=0.7, color=color, edgecolor='black')
-        plt.title(titulo, fontsize=14, fontweight='bold')
-        plt.xlabel('Valores')
-        plt.ylabel('Frecuencia')
-        plt.grid(True, alpha=0.3)
+    def dibujar_histograma(fig, spec: Dict[str, Any]) -> None:
+        """Dibuja el histograma con las líneas de media y mediana"""
+        datos = spec['datos']
+        resumen = EstadisticasCalculator.resumen(datos)
+        ax = fig.subplots()
+        ax.hist(datos, bins=min(10, resumen['distintos']), alpha=0.7, color=spec['color'], edgecolor='black')
+        ax.set_title(spec['titulo'], fontsize=14, fontweight='bold')
+        ax.set_xlabel('Valores')
+        ax.set_ylabel('Frecuencia')
+        ax.grid(True, alpha=0.3)
         
         # Agregar líneas para media y mediana
-        media = EstadisticasCalculator.calcular_media(datos)
-        mediana = EstadisticasCalculator.calcular_mediana(datos)
-        
-        plt.axvline(media, color='red', linestyle='--', linewidth=2, label=f'Media: {media:.1f}')
-        plt.axvline(mediana, color='green', linestyle='--', linewidth=2, label=f'Mediana: {mediana:.1f}')
-        plt.legend()
-        
-        # Convertir a base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
+        media = resumen['media']
+        mediana = resumen['mediana']
         
-        return f"data:image/png;base64,{image_base64}"
+        ax.axvline(media, color='red', linestyle='--', linewidth=2, label=f'Media: {media:.1f}')
+        ax.axvline(mediana, color='green', linestyle='--', linewidth=2, label=f'Mediana: {mediana:.1f}')
+        ax.legend()
+    
+    @staticmethod
+    def crear_histograma(datos: List[float], titulo: str, color: str = 'blue', **kwargs) -> ft.Container:
+        """Crea un histograma en segundo plano y retorna el control que lo mostrará"""
+        spec = {'tipo': 'ova4_histograma', 'figsize': (8, 6), 'datos': datos, 'titulo': titulo, 'color': color}
+        return servicio_graficos.imagen(spec, **kwargs)
+
+servicio_graficos.registrar('ova4_histograma', GraficosGenerator.dibujar_histograma)
 
 class SimuladorDatos:
     """Clase para simular datos clínicos"""
@@ -81,38 +94,35 @@ class SimuladorDatos:
     }
     
     @staticmethod
-    def generar_datos(tipo_variable: str, num_pacientes: int, distribucion: str) -> List[float]:
-        """Genera datos simulados según los parámetros"""
+    def generar_datos(tipo_variable: str, num_pacientes: int, distribucion: str,
+                      semilla: Optional[Union[int, np.random.Generator]] = None) -> np.ndarray:
+        """Genera la cohorte completa con operaciones vectorizadas
+
+        `semilla` puede ser un entero (resultados reproducibles) o un
+        `np.random.Generator` ya creado.
+        """
         config = SimuladorDatos.VARIABLES_CLINICAS[tipo_variable]
-        datos = []
+        rng = np.random.default_rng(semilla)
+        minimo, maximo = config['min'], config['max']
+        amplitud = maximo - minimo
         
-        for _ in range(num_pacientes):
-            if distribucion == 'normal':
-                media = (config['min'] + config['max']) / 2
-                desviacion = (config['max'] - config['min']) / 6
-                valor = np.random.normal(media, desviacion)
-            elif distribucion == 'asimetrica':
-                valor = config['min'] + np.random.exponential(2) * (config['max'] - config['min']) / 10
-            else:  # bimodal
-                if random.random() < 0.5:
-                    valor = np.random.normal(config['min'] + (config['max'] - config['min']) * 0.25, 
-                                          (config['max'] - config['min']) * 0.1)
-                else:
-                    valor = np.random.normal(config['min'] + (config['max'] - config['min']) * 0.75, 
-                                          (config['max'] - config['min']) * 0.1)
-            
-            # Ajustar a los límites
-            valor = max(config['min'], min(config['max'], valor))
-            
-            # Redondear según el tipo
-            if tipo_variable == 'temperatura':
-                valor = round(valor, 1)
-            else:
-                valor = round(valor)
-            
-            datos.append(valor)
+        if distribucion == 'normal':
+            valores = rng.normal((minimo + maximo) / 2, amplitud / 6, num_pacientes)
+        elif distribucion == 'asimetrica':
+            valores = minimo + rng.exponential(2, num_pacientes) * amplitud / 10
+        else:  # bimodal
+            # Mezcla 50/50: cada paciente elige su componente y se muestrea
+            # la normal con el centro correspondiente
+            centros = np.where(rng.random(num_pacientes) < 0.5, 0.25, 0.75) * amplitud + minimo
+            valores = rng.normal(centros, amplitud * 0.1)
+        
+        # Ajustar a los límites
+        np.clip(valores, minimo, maximo, out=valores)
         
-        return datos
+        # Redondear según el tipo
+        if tipo_variable == 'temperatura':
+            return np.round(valores, 1)
+        return np.rint(valores).astype(int)
 
 class OVAApp:
     def __init__(self, page: ft.Page):
@@ -538,7 +548,7 @@ class OVAApp:
         moda = EstadisticasCalculator.calcular_moda(datos)
         
         # Crear gráfico
-        imagen_base64 = GraficosGenerator.crear_histograma(datos, "Presión Arterial Sistólica", "red")
+        imagen_histograma = GraficosGenerator.crear_histograma(datos, "Presión Arterial Sistólica", "red", width=600, height=400)
         
         self.caso1_resultados.controls = [
             ft.Divider(),
@@ -585,7 +595,7 @@ class OVAApp:
                 border_radius=5,
                 border=ft.border.only(left=ft.border.BorderSide(4, ft.colors.YELLOW_600))
             ),
-            ft.Image(src=imagen_base64, width=600, height=400)
+            imagen_histograma
         ]
         self.caso1_resultados.visible = True
         self.page.update()
@@ -614,7 +624,7 @@ class OVAApp:
             conteo_clasif[c] = conteo_clasif.get(c, 0) + 1
         
         # Crear gráfico
-        imagen_base64 = GraficosGenerator.crear_histograma(datos, "Índice de Masa Corporal", "green")
+        imagen_histograma = GraficosGenerator.crear_histograma(datos, "Índice de Masa Corporal", "green", width=600, height=400)
         
         self.caso2_resultados.controls = [
             ft.Divider(),
@@ -673,7 +683,7 @@ class OVAApp:
                 border_radius=5,
                 border=ft.border.only(left=ft.border.BorderSide(4, ft.colors.GREEN_600))
             ),
-            ft.Image(src=imagen_base64, width=600, height=400)
+            imagen_histograma
         ]
         self.caso2_resultados.visible = True
         self.page.update()
@@ -686,7 +696,7 @@ class OVAApp:
         moda = EstadisticasCalculator.calcular_moda(datos)
         
         # Crear gráfico
-        imagen_base64 = GraficosGenerator.crear_histograma(datos, "Días de Recuperación", "blue")
+        imagen_histograma = GraficosGenerator.crear_histograma(datos, "Días de Recuperación", "blue", width=600, height=400)
         
         self.caso3_resultados.controls = [
             ft.Divider(),
@@ -733,7 +743,7 @@ class OVAApp:
                 border_radius=5,
                 border=ft.border.only(left=ft.border.BorderSide(4, ft.colors.BLUE_600))
             ),
-            ft.Image(src=imagen_base64, width=600, height=400)
+            imagen_histograma
         ]
         self.caso3_resultados.visible = True
         self.page.update()
@@ -868,10 +878,12 @@ class OVAApp:
         interpretacion = self.generar_interpretacion_clinica(self.tipo_variable.value, media, mediana, datos)
         
         # Crear gráfico
-        imagen_base64 = GraficosGenerator.crear_histograma(
+        imagen_histograma = GraficosGenerator.crear_histograma(
             datos, 
             f"Distribución de {config['nombre']}", 
-            "blue"
+            "blue",
+            width=650,
+            height=450
         )
         
         self.resultados_simulador.controls = [
@@ -917,7 +929,7 @@ class OVAApp:
                 border_radius=5,
                 border=ft.border.only(left=ft.border.BorderSide(4, ft.colors.BLUE_500))
             ),
-            ft.Image(src=imagen_base64, width=650, height=450)
+            imagen_histograma
         ]
         self.resultados_simulador.visible = True
         self.page.update()
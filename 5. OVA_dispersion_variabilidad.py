@@ -1,7 +1,6 @@
 
 import flet as ft
 import math
-import statistics
 import random
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
@@ -10,27 +9,21 @@ import numpy as np
 import io
 import base64
 
+from estadistica_streaming import AcumuladorDispersion
+
 class StatCalculator:
     @staticmethod
     def calculate_stats(data):
-        if not data:
+        """Resumen de dispersión en una sola pasada
+
+        `data` puede ser una lista, un arreglo NumPy o cualquier iterable de
+        valores (por ejemplo, un generador que lee una exportación de monitoreo).
+        """
+        acumulador = AcumuladorDispersion()
+        acumulador.push_many(data)
+        if acumulador.n == 0:
             return None
-        
-        n = len(data)
-        mean = statistics.mean(data)
-        variance = statistics.variance(data) if n > 1 else 0
-        std_dev = statistics.stdev(data) if n > 1 else 0
-        data_range = max(data) - min(data)
-        cv = (std_dev / mean) * 100 if mean != 0 else 0
-        
-        return {
-            'n': n,
-            'mean': mean,
-            'variance': variance,
-            'std_dev': std_dev,
-            'range': data_range,
-            'cv': cv
-        }
+        return acumulador.resumen()
     
     @staticmethod
     def get_interpretation(cv):
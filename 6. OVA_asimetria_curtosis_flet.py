@@ -1,16 +1,17 @@
 
 import flet as ft
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
-import io
-import base64
 from scipy import stats
 import pandas as pd
 import math
 import random
+import threading
+from collections import OrderedDict
 from datetime import datetime
+from densidad import kde_fft
+from estadistica_streaming import AcumuladorMomentos, DigestoCuantiles
+from servicio_graficos import servicio_graficos
+from simulacion_montecarlo import explorador_muestreo
 
 class OVAAsimetriaCurtosis:
     def __init__(self):
@@ -89,23 +90,36 @@ class OVAAsimetriaCurtosis:
         ]
 
     def calculate_statistics(self, data):
-        """Calcula estadísticas descriptivas y de forma"""
-        n = len(data)
-        mean = np.mean(data)
-        median = np.median(data)
-        std = np.std(data, ddof=1)
-        
-        # Asimetría y curtosis
-        skewness = stats.skew(data)
-        kurtosis = stats.kurtosis(data)
+        """Calcula estadísticas descriptivas y de forma
+
+        Los momentos salen de una sola pasada con `AcumuladorMomentos`. `data`
+        puede ser una lista o un arreglo, o un iterable de bloques (por ejemplo,
+        trozos leídos de una exportación de laboratorio); en ese caso la
+        mediana se aproxima con un t-digest para no cargar todo en memoria.
+        """
+        momentos = AcumuladorMomentos()
+        if isinstance(data, (list, tuple, np.ndarray)):
+            momentos.push_many(data)
+            median = np.median(data)
+        else:
+            digesto = DigestoCuantiles()
+            for bloque in data:
+                bloque = np.asarray(bloque, dtype=float)
+                momentos.push_many(bloque)
+                digesto.push_many(bloque)
+            median = digesto.mediana
         
         return {
-            'n': n,
-            'mean': mean,
+            'n': momentos.n,
+            'mean': momentos.media,
             'median': median,
-            'std': std,
-            'skewness': skewness,
-            'kurtosis': kurtosis
+            'std': momentos.desviacion,
+            'skewness': momentos.asimetria,
+            'kurtosis': momentos.curtosis,
+            'skewness_adj': momentos.asimetria_corregida,
+            'kurtosis_adj': momentos.curtosis_corregida,
+            'jarque_bera': momentos.jarque_bera,
+            'jarque_bera_p': momentos.jarque_bera_p
         }
 
     def generate_distribution_data(self, dist_type, sample_size, shape_param):
@@ -129,29 +143,59 @@ class OVAAsimetriaCurtosis:
         
         return data
 
-    def create_histogram_plot(self, data, title="Histograma"):
-        """Crea un histograma usando matplotlib"""
-        plt.figure(figsize=(8, 6))
-        plt.hist(data, bins=20, density=True, alpha=0.7, color='skyblue', edgecolor='black')
-        plt.title(title, fontsize=14, fontweight='bold')
-        plt.xlabel('Valor')
-        plt.ylabel('Densidad')
-        plt.grid(True, alpha=0.3)
+    def create_histogram_plot(self, image, data, title="Histograma", config=None):
+        """Crea un histograma en segundo plano y lo muestra en `image`
+
+        `config` es la terna (distribución, tamaño, forma) del simulador; con
+        ella la curva de densidad se reutiliza al volver a una configuración.
+        """
+        spec = {'tipo': 'ova6_histograma', 'figsize': (8, 6), 'data': data, 'title': title, 'config': config}
+        return servicio_graficos.asignar(image, spec)
+
+    # Curvas de densidad del simulador por (distribución, tamaño, forma); los
+    # datos de cada terna son fijos porque la semilla también lo es
+    _densidades = OrderedDict()
+    _max_densidades = 256
+    _densidades_lock = threading.Lock()
+
+    @staticmethod
+    def density_curve(data, config=None):
+        """Puntos (x, densidad) de la curva KDE, o None si no está definida"""
+        cache = OVAAsimetriaCurtosis._densidades
+        if config is not None:
+            with OVAAsimetriaCurtosis._densidades_lock:
+                if config in cache:
+                    cache.move_to_end(config)
+                    return cache[config]
+
+        data = np.asarray(data, dtype=float)
+        x = np.linspace(data.min(), data.max(), 100)
+        densidad = kde_fft(data, x)
+        curva = (x, densidad) if densidad is not None else None
+
+        if config is not None:
+            with OVAAsimetriaCurtosis._densidades_lock:
+                cache[config] = curva
+                if len(cache) > OVAAsimetriaCurtosis._max_densidades:
+                    cache.popitem(last=False)
+        return curva
+
+    @staticmethod
+    def draw_histogram_plot(fig, spec):
+        """Dibuja el histograma con la curva de densidad estimada"""
+        data = spec['data']
+        ax = fig.subplots()
+        ax.hist(data, bins=20, density=True, alpha=0.7, color='skyblue', edgecolor='black')
+        ax.set_title(spec['title'], fontsize=14, fontweight='bold')
+        ax.set_xlabel('Valor')
+        ax.set_ylabel('Densidad')
+        ax.grid(True, alpha=0.3)
         
         # Agregar curva de densidad
-        x = np.linspace(min(data), max(data), 100)
-        kde = stats.gaussian_kde(data)
-        plt.plot(x, kde(x), 'r-', linewidth=2, label='Densidad estimada')
-        plt.legend()
-        
-        # Convertir a imagen base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-        
-        return image_base64
+        curva = OVAAsimetriaCurtosis.density_curve(data, spec.get('config'))
+        if curva is not None:
+            ax.plot(curva[0], curva[1], 'r-', linewidth=2, label='Densidad estimada')
+            ax.legend()
 
     def get_ai_interpretation(self, stats_dict):
         """Genera interpretación automática de las estadísticas"""
@@ -744,6 +788,27 @@ class OVAAsimetriaCurtosis:
             fit=ft.ImageFit.CONTAIN
         )
         
+        # Distribución muestral (Monte Carlo)
+        self.sampling_replicas = ft.Dropdown(
+            label="Réplicas",
+            options=[ft.dropdown.Option(str(r)) for r in (1000, 2000, 5000, 10000)],
+            value="2000",
+            width=150
+        )
+        self.sampling_progress = ft.ProgressBar(value=0, width=400, visible=False)
+        self.sampling_summary = ft.Text(
+            "Simula miles de muestras con los parámetros actuales para ver cuánto varían "
+            "la asimetría y la curtosis de una muestra a otra.",
+            size=12
+        )
+        self.sampling_chart = ft.Image(
+            width=800,
+            height=350,
+            fit=ft.ImageFit.CONTAIN,
+            visible=False
+        )
+        self.sampling_run = None
+        
         return ft.Column([
             ft.Text("Simulador Interactivo de Distribuciones", 
                    size=24, weight=ft.FontWeight.BOLD),
@@ -814,9 +879,105 @@ class OVAAsimetriaCurtosis:
                     expand=True,
                     padding=20
                 )
-            ])
+            ]),
+            
+            # Distribución muestral de los estimadores
+            ft.Container(
+                content=ft.Column([
+                    ft.Text("Distribución Muestral de Asimetría y Curtosis", 
+                           size=16, weight=ft.FontWeight.BOLD),
+                    ft.Row([
+                        self.sampling_replicas,
+                        ft.ElevatedButton(
+                            "Simular Réplicas",
+                            icon=ft.icons.SCATTER_PLOT,
+                            on_click=self.run_sampling_simulation,
+                            bgcolor=ft.colors.PURPLE_600,
+                            color=ft.colors.WHITE
+                        )
+                    ]),
+                    self.sampling_progress,
+                    self.sampling_summary,
+                    self.sampling_chart
+                ]),
+                padding=20,
+                bgcolor=ft.colors.PURPLE_50,
+                border_radius=10
+            )
         ])
 
+    def run_sampling_simulation(self, e):
+        """Lanza las réplicas Monte Carlo para la configuración actual del simulador"""
+        if self.sampling_run is not None:
+            self.sampling_run.cancelar()
+        
+        dist_type = self.dist_type.value
+        sample_size = int(self.sample_size.value)
+        shape_param = self.shape_param.value
+        replicas = int(self.sampling_replicas.value)
+        
+        self.sampling_progress.value = 0
+        self.sampling_progress.visible = True
+        self.sampling_summary.value = f"Simulando {replicas} muestras de tamaño {sample_size}..."
+        self.page.update()
+        
+        self.sampling_run = explorador_muestreo.explorar(
+            dist_type, sample_size, shape_param, replicas,
+            al_avanzar=self.show_sampling_progress
+        )
+
+    def show_sampling_progress(self, run):
+        """Actualiza barra, resumen e histograma cada vez que termina un lote"""
+        if run is not self.sampling_run:
+            return
+        
+        dist_type, sample_size, shape_param = run.config
+        if run.error is not None:
+            self.sampling_summary.value = f"❌ La simulación falló: {run.error}"
+            self.sampling_progress.visible = False
+            self.page.update()
+            return
+        
+        skews = run.asimetrias()
+        kurts = run.curtosis()
+        self.sampling_progress.value = run.completadas / run.total
+        self.sampling_progress.visible = not run.terminada
+        self.sampling_summary.value = (
+            f"Réplicas: {run.completadas}/{run.total} · "
+            f"Asimetría media {skews.mean():.3f} (DE {skews.std(ddof=1) if skews.size > 1 else 0:.3f}) · "
+            f"Curtosis media {kurts.mean():.3f} (DE {kurts.std(ddof=1) if kurts.size > 1 else 0:.3f})\n"
+            f"La regla |asimetría| < 2 y |curtosis| < 7 rechaza la normalidad en el "
+            f"{run.tasa_rechazo * 100:.1f}% de las muestras."
+        )
+        
+        spec = {
+            'tipo': 'ova6_muestreo', 'figsize': (11, 4.5),
+            'skews': skews, 'kurts': kurts,
+            'title': f"{dist_type.title()} · n = {sample_size} · forma = {shape_param}"
+        }
+        self.sampling_chart.visible = True
+        servicio_graficos.asignar(self.sampling_chart, spec)
+        self.page.update()
+
+    @staticmethod
+    def draw_sampling_distribution(fig, spec):
+        """Histogramas de la asimetría y la curtosis de las réplicas con los umbrales de la regla"""
+        ax1, ax2 = fig.subplots(1, 2)
+        for ax, values, limit, color, label in (
+            (ax1, spec['skews'], 2, 'skyblue', 'Asimetría (g1)'),
+            (ax2, spec['kurts'], 7, 'lightgreen', 'Curtosis (g2)'),
+        ):
+            ax.hist(values, bins=40, color=color, edgecolor='black', alpha=0.8)
+            ax.axvline(np.mean(values), color='red', linewidth=2, label=f'Media: {np.mean(values):.2f}')
+            for threshold in (-limit, limit):
+                if values.min() <= threshold <= values.max():
+                    ax.axvline(threshold, color='black', linestyle='--', linewidth=1)
+            ax.set_xlabel(label)
+            ax.set_ylabel('Réplicas')
+            ax.grid(True, alpha=0.3)
+            ax.legend()
+        fig.suptitle(spec['title'], fontsize=13, fontweight='bold')
+
     def update_simulation(self, e):
         """Actualiza la simulación cuando cambian los parámetros"""
         dist_type = self.dist_type.value
@@ -835,15 +996,16 @@ class OVAAsimetriaCurtosis:
             ft.Row([ft.Text("Mediana:", size=12), ft.Text(f"{stats_dict['median']:.2f}", size=12, font_family="Courier")]),
             ft.Row([ft.Text("Desv. Estándar:", size=12), ft.Text(f"{stats_dict['std']:.2f}", size=12, font_family="Courier")]),
             ft.Row([ft.Text("Asimetría:", size=12), ft.Text(f"{stats_dict['skewness']:.3f}", size=12, font_family="Courier")]),
-            ft.Row([ft.Text("Curtosis:", size=12), ft.Text(f"{stats_dict['kurtosis']:.3f}", size=12, font_family="Courier")])
+            ft.Row([ft.Text("Curtosis:", size=12), ft.Text(f"{stats_dict['kurtosis']:.3f}", size=12, font_family="Courier")]),
+            ft.Row([ft.Text("Jarque–Bera:", size=12), ft.Text(f"{stats_dict['jarque_bera']:.2f} (p={stats_dict['jarque_bera_p']:.3f})", size=12, font_family="Courier")])
         ]
         
         # Actualizar interpretación IA
         self.ai_interpretation.value = self.get_ai_interpretation(stats_dict)
         
         # Crear y mostrar gráfico
-        image_base64 = self.create_histogram_plot(data, f"Distribución {dist_type.title()}")
-        self.chart_image.src_base64 = image_base64
+        self.create_histogram_plot(self.chart_image, data, f"Distribución {dist_type.title()}",
+                                   config=(dist_type, sample_size, shape_param))
         
         self.page.update()
 
@@ -1131,7 +1293,10 @@ class OVAAsimetriaCurtosis:
                             ft.Text("Forma de la Distribución", 
                                    weight=ft.FontWeight.BOLD, color=ft.colors.GREEN_800),
                             ft.Row([ft.Text("Asimetría:"), ft.Text(f"{stats_dict['skewness']:.3f}", font_family="Courier")]),
-                            ft.Row([ft.Text("Curtosis:"), ft.Text(f"{stats_dict['kurtosis']:.3f}", font_family="Courier")])
+                            ft.Row([ft.Text("Curtosis:"), ft.Text(f"{stats_dict['kurtosis']:.3f}", font_family="Courier")]),
+                            ft.Row([ft.Text("Asimetría corregida (G1):"), ft.Text(f"{stats_dict['skewness_adj']:.3f}", font_family="Courier")]),
+                            ft.Row([ft.Text("Curtosis corregida (G2):"), ft.Text(f"{stats_dict['kurtosis_adj']:.3f}", font_family="Courier")]),
+                            ft.Row([ft.Text("Jarque–Bera:"), ft.Text(f"{stats_dict['jarque_bera']:.2f} (p={stats_dict['jarque_bera_p']:.3f})", font_family="Courier")])
                         ]),
                         bgcolor=ft.colors.GREEN_50,
                         padding=10,
@@ -1160,8 +1325,7 @@ class OVAAsimetriaCurtosis:
             ])
             
             # Create and display chart
-            image_base64 = self.create_histogram_plot(data, "Análisis de Datos")
-            self.practice_chart.src_base64 = image_base64
+            self.create_histogram_plot(self.practice_chart, data, "Análisis de Datos")
             
             self.page.update()
             
@@ -1528,6 +1692,9 @@ analizar_normalidad <- function(datos, nombre_variable = "Variable") {
             ft.SnackBar(content=ft.Text(f"Script R guardado como {filename}"))
         )
 
+servicio_graficos.registrar('ova6_histograma', OVAAsimetriaCurtosis.draw_histogram_plot)
+servicio_graficos.registrar('ova6_muestreo', OVAAsimetriaCurtosis.draw_sampling_distribution)
+
 def main(page: ft.Page):
     app = OVAAsimetriaCurtosis()
     app.main(page)
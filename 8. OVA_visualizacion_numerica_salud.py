@@ -5,12 +5,11 @@ import matplotlib.patches as patches
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import pandas as pd
-import io
-import base64
 import random
 import math
 from datetime import datetime
 import json
+from servicio_graficos import servicio_graficos
 
 class OVAVisualizacionSalud:
     def __init__(self):
@@ -379,7 +378,12 @@ class OVAVisualizacionSalud:
         ], scroll=ft.ScrollMode.AUTO, spacing=20)
         
     def create_example_chart(self):
-        fig, ax = plt.subplots(figsize=(8, 5))
+        spec = {'tipo': 'ova8_ejemplo', 'figsize': (8, 5)}
+        return servicio_graficos.imagen(spec, width=600, height=400, fit=ft.ImageFit.CONTAIN)
+        
+    @staticmethod
+    def draw_example_chart(fig, spec):
+        ax = fig.subplots()
         
         # Datos de ejemplo para presión arterial
         bins = ['100-110', '110-120', '120-130', '130-140', '140-150', '150-160', '160-170', '170-180']
@@ -391,22 +395,8 @@ class OVAVisualizacionSalud:
         ax.set_ylabel('Número de Pacientes')
         ax.grid(True, alpha=0.3)
         
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        # Convertir a imagen
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        return ft.Image(
-            src_base64=img_base64,
-            width=600,
-            height=400,
-            fit=ft.ImageFit.CONTAIN
-        )
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
         
     def update_example_chart(self, e):
         chart_type = e.control.value
@@ -603,7 +593,12 @@ class OVAVisualizacionSalud:
         ], scroll=ft.ScrollMode.AUTO, spacing=20)
         
     def create_practice_histogram(self):
-        fig, ax = plt.subplots(figsize=(6, 4))
+        spec = {'tipo': 'ova8_histograma_practica', 'figsize': (6, 4)}
+        return servicio_graficos.imagen(spec, width=400, height=300, fit=ft.ImageFit.CONTAIN)
+        
+    @staticmethod
+    def draw_practice_histogram(fig, spec):
+        ax = fig.subplots()
         
         bins = ['18-22', '22-26', '26-30', '30-34', '34-38', '38-42', '42-46']
         frequencies = [8, 25, 45, 60, 35, 20, 7]
@@ -614,24 +609,16 @@ class OVAVisualizacionSalud:
         ax.set_ylabel('Frecuencia')
         ax.grid(True, alpha=0.3)
         
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        return ft.Image(
-            src_base64=img_base64,
-            width=400,
-            height=300,
-            fit=ft.ImageFit.CONTAIN
-        )
+        ax.tick_params(axis='x', labelrotation=45)
+        fig.tight_layout()
         
     def create_practice_boxplot(self):
-        fig, ax = plt.subplots(figsize=(6, 4))
+        spec = {'tipo': 'ova8_boxplot_practica', 'figsize': (6, 4)}
+        return servicio_graficos.imagen(spec, width=400, height=300, fit=ft.ImageFit.CONTAIN)
+        
+    @staticmethod
+    def draw_practice_boxplot(fig, spec):
+        ax = fig.subplots()
         
         # Simular datos de boxplot
         groups = ['Hombres', 'Mujeres']
@@ -653,23 +640,15 @@ class OVAVisualizacionSalud:
         ax.legend()
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        return ft.Image(
-            src_base64=img_base64,
-            width=400,
-            height=300,
-            fit=ft.ImageFit.CONTAIN
-        )
+        fig.tight_layout()
         
     def create_practice_violin(self):
-        fig, ax = plt.subplots(figsize=(6, 4))
+        spec = {'tipo': 'ova8_violin_practica', 'figsize': (6, 4)}
+        return servicio_graficos.imagen(spec, width=400, height=300, fit=ft.ImageFit.CONTAIN)
+        
+    @staticmethod
+    def draw_practice_violin(fig, spec):
+        ax = fig.subplots()
         
         # Simular gráfico de violín con líneas
         x = np.linspace(20, 40, 21)
@@ -690,20 +669,7 @@ class OVAVisualizacionSalud:
         ax.legend()
         ax.grid(True, alpha=0.3)
         
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        return ft.Image(
-            src_base64=img_base64,
-            width=400,
-            height=300,
-            fit=ft.ImageFit.CONTAIN
-        )
+        fig.tight_layout()
         
     def check_practice_answers(self, e):
         feedback = []
@@ -1014,13 +980,27 @@ class OVAVisualizacionSalud:
         return data
         
     def create_lab_chart(self, variable, chart_type, data):
-        fig, ax = plt.subplots(figsize=(8, 5))
+        spec = {
+            'tipo': 'ova8_laboratorio',
+            'figsize': (8, 5),
+            'variable_label': self.get_variable_label(variable),
+            'chart_type': chart_type,
+            'data': data
+        }
+        return servicio_graficos.imagen(spec, width=600, height=400, fit=ft.ImageFit.CONTAIN)
+        
+    @staticmethod
+    def draw_lab_chart(fig, spec):
+        data = spec['data']
+        chart_type = spec['chart_type']
+        variable_label = spec['variable_label']
+        ax = fig.subplots()
         
         values = [d["value"] for d in data]
         
         if chart_type == "histogram":
             ax.hist(values, bins=15, color='#3b82f6', alpha=0.7, edgecolor='#1e40af')
-            ax.set_title(f'Histograma: {self.get_variable_label(variable)}')
+            ax.set_title(f'Histograma: {variable_label}')
             ax.set_ylabel('Frecuencia')
             
         elif chart_type == "boxplot":
@@ -1028,7 +1008,7 @@ class OVAVisualizacionSalud:
             group_b = [d["value"] for d in data if d["group"] == "Grupo B"]
             
             ax.boxplot([group_a, group_b], labels=['Grupo A', 'Grupo B'])
-            ax.set_title(f'Boxplot: {self.get_variable_label(variable)}')
+            ax.set_title(f'Boxplot: {variable_label}')
             
         elif chart_type == "violin":
             group_a = [d["value"] for d in data if d["group"] == "Grupo A"]
@@ -1037,7 +1017,7 @@ class OVAVisualizacionSalud:
             # Simular violin plot con histogramas
             ax.hist(group_a, bins=20, alpha=0.5, label='Grupo A', color='#3b82f6', density=True)
             ax.hist(group_b, bins=20, alpha=0.5, label='Grupo B', color='#ec4899', density=True)
-            ax.set_title(f'Distribución de Densidad: {self.get_variable_label(variable)}')
+            ax.set_title(f'Distribución de Densidad: {variable_label}')
             ax.legend()
             ax.set_ylabel('Densidad')
             
@@ -1049,26 +1029,13 @@ class OVAVisualizacionSalud:
             
             ax.scatter(group_a_x, group_a_y, alpha=0.6, label='Grupo A', color='#3b82f6')
             ax.scatter(group_b_x, group_b_y, alpha=0.6, label='Grupo B', color='#ec4899')
-            ax.set_title(f'Scatterplot: {self.get_variable_label(variable)} vs Edad')
+            ax.set_title(f'Scatterplot: {variable_label} vs Edad')
             ax.set_xlabel('Edad (años)')
             ax.legend()
             
-        ax.set_xlabel(self.get_variable_label(variable))
+        ax.set_xlabel(variable_label)
         ax.grid(True, alpha=0.3)
-        plt.tight_layout()
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100, bbox_inches='tight')
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.read()).decode()
-        plt.close()
-        
-        return ft.Image(
-            src_base64=img_base64,
-            width=600,
-            height=400,
-            fit=ft.ImageFit.CONTAIN
-        )
+        fig.tight_layout()
         
     def get_variable_label(self, variable):
         labels = {
@@ -1584,6 +1551,12 @@ class OVAVisualizacionSalud:
             )
         )
 
+servicio_graficos.registrar('ova8_ejemplo', OVAVisualizacionSalud.draw_example_chart)
+servicio_graficos.registrar('ova8_histograma_practica', OVAVisualizacionSalud.draw_practice_histogram)
+servicio_graficos.registrar('ova8_boxplot_practica', OVAVisualizacionSalud.draw_practice_boxplot)
+servicio_graficos.registrar('ova8_violin_practica', OVAVisualizacionSalud.draw_practice_violin)
+servicio_graficos.registrar('ova8_laboratorio', OVAVisualizacionSalud.draw_lab_chart)
+
 def main(page: ft.Page):
     app = OVAVisualizacionSalud()
     app.main(page)
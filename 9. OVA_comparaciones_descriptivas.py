@@ -5,12 +5,13 @@ import matplotlib.patches as patches
 from matplotlib.backends.backend_agg import FigureCanvasAgg
 import numpy as np
 import pandas as pd
-import statistics
 import math
 import io
 import base64
 import os
 from datetime import datetime
+from comparacion_grupos import estadisticos_por_grupo
+from bootstrap import iniciar_bootstrap
 
 class OVAApp:
     def __init__(self):
@@ -518,20 +519,10 @@ class OVAApp:
         self.page.update()
     
     def calculate_descriptive_stats(self, data):
-        sorted_data = sorted(data)
-        n = len(data)
-        mean = sum(data) / n
-        median = statistics.median(data)
-        variance = sum((x - mean) ** 2 for x in data) / (n - 1)
-        sd = math.sqrt(variance)
-        
-        return {
-            'mean': mean,
-            'median': median,
-            'sd': sd,
-            'min': min(data),
-            'max': max(data)
-        }
+        """Estadísticos de un solo grupo (caso particular del motor por grupos)"""
+        data = np.asarray(data)
+        stats = estadisticos_por_grupo(data, np.zeros(data.size, dtype=np.int8))
+        return {key: stats[key][0].item() for key in ('mean', 'median', 'sd', 'min', 'max', 'iqr')}
     
     def create_simulation_section(self):
         # Controles para la simulación
@@ -544,6 +535,21 @@ class OVAApp:
         self.sim_stats = ft.Text("Ejecute la simulación para ver los resultados.")
         self.sim_differences = ft.Text("Ejecute la simulación para ver el análisis.")
         
+        # Intervalos de confianza bootstrap de las diferencias
+        self.bootstrap_replicas = ft.Dropdown(
+            label="Réplicas bootstrap",
+            options=[ft.dropdown.Option(str(b)) for b in (1000, 10000, 100000)],
+            value="10000",
+            width=200
+        )
+        self.bootstrap_progress = ft.ProgressBar(value=0, visible=False)
+        self.bootstrap_text = ft.Text(
+            "Al ejecutar la simulación se remuestrean ambos grupos para estimar "
+            "intervalos de confianza del 95% (percentil y BCa) de cada diferencia.",
+            size=12
+        )
+        self.bootstrap_run = None
+        
         return ft.Container(
             content=ft.Column([
                 ft.Card(
@@ -578,6 +584,7 @@ class OVAApp:
                                             self.sd2_slider,
                                             ft.Text("Tamaño de muestra (cada grupo):"),
                                             self.sample_size_slider,
+                                            self.bootstrap_replicas,
                                             ft.ElevatedButton(
                                                 text="Ejecutar Simulación",
                                                 on_click=self.run_simulation,
@@ -630,7 +637,18 @@ class OVAApp:
                                             border=ft.border.all(1, ft.colors.GREY_300),
                                             expand=True
                                         )
-                                    ])
+                                    ]),
+                                    ft.Container(
+                                        content=ft.Column([
+                                            ft.Text("Intervalos de Confianza Bootstrap (95%)", weight=ft.FontWeight.BOLD),
+                                            self.bootstrap_progress,
+                                            self.bootstrap_text
+                                        ]),
+                                        bgcolor=ft.colors.WHITE,
+                                        padding=15,
+                                        border_radius=8,
+                                        border=ft.border.all(1, ft.colors.GREY_300)
+                                    )
                                 ], expand=2)
                             ])
                         ]),
@@ -652,28 +670,28 @@ class OVAApp:
         group1 = np.random.normal(mean1, sd1, n)
         group2 = np.random.normal(mean2, sd2, n)
         
-        # Calcular estadísticos
-        stats1 = self.calculate_descriptive_stats(group1.tolist())
-        stats2 = self.calculate_descriptive_stats(group2.tolist())
+        # Calcular estadísticos y diferencias de ambos grupos en una sola pasada
+        stats = estadisticos_por_grupo(
+            np.concatenate([group1, group2]),
+            np.repeat([1, 2], [group1.size, group2.size])
+        )
         
         # Mostrar estadísticos
-        stats_text = f"""Grupo 1:
-Media: {stats1['mean']:.1f}
-DE: {stats1['sd']:.1f}
-Mediana: {stats1['median']:.1f}
-
-Grupo 2:
-Media: {stats2['mean']:.1f}
-DE: {stats2['sd']:.1f}
-Mediana: {stats2['median']:.1f}"""
+        stats_text = "\n\n".join(
+            f"""Grupo {label}:
+Media: {stats['mean'][i]:.1f}
+DE: {stats['sd'][i]:.1f}
+Mediana: {stats['median'][i]:.1f}
+RIC: {stats['iqr'][i]:.1f}"""
+            for i, label in enumerate(stats['grupos'])
+        )
         
         self.sim_stats.value = stats_text
         
-        # Calcular diferencias
-        absolute_diff = stats2['mean'] - stats1['mean']
-        relative_diff = (absolute_diff / stats1['mean']) * 100
-        pooled_sd = math.sqrt(((stats1['sd'] ** 2) + (stats2['sd'] ** 2)) / 2)
-        cohen_d = absolute_diff / pooled_sd
+        # Diferencias del grupo 2 respecto del grupo 1
+        absolute_diff = stats['diferencia'][0, 1]
+        relative_diff = stats['diferencia_relativa'][0, 1]
+        cohen_d = stats['cohen_d'][0, 1]
         
         effect_size = 'pequeño'
         if abs(cohen_d) >= 0.8:
@@ -688,6 +706,59 @@ Tamaño del efecto: {effect_size}"""
         
         self.sim_differences.value = diff_text
         
+        self.start_bootstrap(group1, group2)
+        self.page.update()
+    
+    def start_bootstrap(self, group1, group2):
+        """Lanza el remuestreo de ambos grupos, cancelando el anterior si sigue en curso"""
+        if self.bootstrap_run is not None:
+            self.bootstrap_run.cancelar()
+        
+        replicas = int(self.bootstrap_replicas.value)
+        self.bootstrap_progress.value = 0
+        self.bootstrap_progress.visible = True
+        self.bootstrap_text.value = f"Remuestreando {replicas} veces cada grupo..."
+        self.bootstrap_run = iniciar_bootstrap(
+            group1, group2, replicas, al_avanzar=self.show_bootstrap_progress
+        )
+    
+    def show_bootstrap_progress(self, run):
+        """Actualiza la barra y los intervalos cada vez que termina un lote de réplicas"""
+        if run is not self.bootstrap_run:
+            return
+        
+        if run.error is not None:
+            self.bootstrap_text.value = f"❌ El bootstrap falló: {run.error}"
+            self.bootstrap_progress.visible = False
+            self.page.update()
+            return
+        
+        intervals = run.intervalos()
+        self.bootstrap_progress.value = run.completadas / run.total
+        self.bootstrap_progress.visible = not run.terminada
+        if intervals is None:
+            return
+        
+        lines = [f"Réplicas: {run.completadas}/{run.total}"]
+        for key, label, fmt in (
+            ('diferencia', 'Diferencia absoluta', '{:.1f}'),
+            ('diferencia_relativa', 'Diferencia relativa (%)', '{:.1f}'),
+            ('cohen_d', 'd de Cohen', '{:.2f}'),
+        ):
+            interval = intervals[key]
+            percentile = ", ".join(fmt.format(v) for v in interval['percentil'])
+            bca = ", ".join(fmt.format(v) for v in interval['bca'])
+            lines.append(
+                f"{label}: {fmt.format(interval['estimado'])} · "
+                f"percentil [{percentile}] · BCa [{bca}]"
+            )
+        if run.terminada:
+            excludes = intervals['diferencia']['bca'][0] > 0 or intervals['diferencia']['bca'][1] < 0
+            lines.append(
+                "El intervalo BCa de la diferencia no incluye el 0." if excludes
+                else "El intervalo BCa de la diferencia incluye el 0: los datos son compatibles con grupos iguales."
+            )
+        self.bootstrap_text.value = "\n".join(lines)
         self.page.update()
     
     def create_evaluation_section(self):
@@ -0,0 +1,57 @@
+"""Gráficos de dispersión que escalan a cientos de miles de puntos.
+
+Por debajo de un umbral se dibuja cada punto. Por encima, los puntos se
+agregan en una rejilla 2D (histograma bidimensional) y se dibuja la densidad
+como mapa de calor, de modo que el tamaño de la figura depende de la rejilla
+y no de n. La recta de regresión y su banda de confianza se calculan siempre
+sobre todos los datos con `RegresionLineal`.
+"""
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from regresion import RegresionLineal
+
+# Número de puntos a partir del cual se agrega en una rejilla
+UMBRAL_PUNTOS = 5000
+# Celdas por eje de la rejilla de densidad
+CELDAS_POR_EJE = 120
+
+
+def agregar_dispersion(x, y, umbral: int = UMBRAL_PUNTOS, celdas: int = CELDAS_POR_EJE) -> Dict[str, Any]:
+    """Puntos tal cual o densidad en rejilla, según el tamaño de los datos"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if x.size <= umbral:
+        return {"modo": "puntos", "x": x, "y": y}
+
+    conteos, bordes_x, bordes_y = np.histogram2d(x, y, bins=celdas)
+    # Celdas vacías como NaN para que queden transparentes en el mapa de calor
+    densidad = np.where(conteos > 0, conteos, np.nan).T
+    return {
+        "modo": "densidad",
+        "z": densidad,
+        "x": (bordes_x[:-1] + bordes_x[1:]) / 2,
+        "y": (bordes_y[:-1] + bordes_y[1:]) / 2,
+    }
+
+
+def capas_dispersion(x, y, modelo: Optional[RegresionLineal] = None,
+                     umbral: int = UMBRAL_PUNTOS, celdas: int = CELDAS_POR_EJE) -> Dict[str, Any]:
+    """Datos del gráfico: puntos o densidad, y la recta con su banda de confianza 95%"""
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if modelo is None:
+        modelo = RegresionLineal.desde_arreglos(x, y)
+
+    recta_x = np.linspace(x.min(), x.max(), 100)
+    recta_y, inferior, superior = modelo.intervalo_confianza(recta_x)
+    return {
+        "capa": agregar_dispersion(x, y, umbral, celdas),
+        "recta_x": recta_x,
+        "recta_y": recta_y,
+        "inferior": inferior,
+        "superior": superior,
+        "n": modelo.n,
+        "r": modelo.r,
+    }
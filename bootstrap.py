@@ -0,0 +1,173 @@
+"""Intervalos de confianza bootstrap para las diferencias entre dos grupos.
+
+Cada grupo se remuestrea B veces (B hasta 10^5). Los índices de cada lote se
+sortean de una vez como una matriz (réplicas × n) y las medias y varianzas se
+calculan por filas; los lotes se reparten en el pool de procesos compartido y
+la UI recibe los intervalos recalculados a medida que llegan.
+
+Para cada estadístico de diferencia (absoluta, relativa y d de Cohen) se
+informan el intervalo percentil y el BCa; la aceleración del BCa sale del
+jackknife, calculado de forma vectorizada con fórmulas de “dejar uno fuera”.
+"""
+import threading
+import traceback
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from scipy.stats import norm
+
+from procesos import pool_procesos
+
+ESTADISTICOS = ("diferencia", "diferencia_relativa", "cohen_d")
+
+# Valores remuestreados (réplicas × (n1 + n2)) por tarea del pool
+VALORES_POR_LOTE = 2_000_000
+# Cantidad mínima de lotes, para que la UI se actualice varias veces
+LOTES_MINIMOS = 20
+
+
+def diferencias(m1, v1, n1, m2, v2, n2) -> np.ndarray:
+    """Diferencia absoluta, relativa (% de la media 1) y d de Cohen; última dimensión = 3"""
+    diferencia = m2 - m1
+    de_combinada = np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        relativa = np.where(m1 != 0, diferencia / m1 * 100, 0.0)
+        cohen_d = np.where(de_combinada > 0, diferencia / de_combinada, 0.0)
+    return np.stack([diferencia, relativa, cohen_d], axis=-1)
+
+
+def replicas_lote(grupo1: np.ndarray, grupo2: np.ndarray, replicas: int,
+                  semilla: np.random.SeedSequence) -> np.ndarray:
+    """Tarea del pool: `replicas` remuestreos de ambos grupos → matriz (replicas × 3)"""
+    rng = np.random.default_rng(semilla)
+    n1, n2 = grupo1.size, grupo2.size
+    muestra1 = grupo1[rng.integers(0, n1, size=(replicas, n1))]
+    muestra2 = grupo2[rng.integers(0, n2, size=(replicas, n2))]
+    return diferencias(muestra1.mean(axis=1), muestra1.var(axis=1, ddof=1), n1,
+                       muestra2.mean(axis=1), muestra2.var(axis=1, ddof=1), n2)
+
+
+def jackknife(grupo1: np.ndarray, grupo2: np.ndarray) -> np.ndarray:
+    """Estadísticos dejando fuera cada observación de cada grupo → matriz ((n1 + n2) × 3)"""
+    def dejar_uno_fuera(grupo):
+        n = grupo.size
+        media = grupo.mean()
+        suma_cuadrados = ((grupo - media) ** 2).sum()
+        medias = (n * media - grupo) / (n - 1)
+        varianzas = (suma_cuadrados - (grupo - media) ** 2 * n / (n - 1)) / (n - 2)
+        return medias, varianzas, media, suma_cuadrados / (n - 1)
+
+    medias1, varianzas1, m1, v1 = dejar_uno_fuera(grupo1)
+    medias2, varianzas2, m2, v2 = dejar_uno_fuera(grupo2)
+    n1, n2 = grupo1.size, grupo2.size
+    sin_uno_de_1 = diferencias(medias1, varianzas1, n1 - 1, m2, v2, n2)
+    sin_uno_de_2 = diferencias(m1, v1, n1, medias2, varianzas2, n2 - 1)
+    return np.concatenate([sin_uno_de_1, sin_uno_de_2])
+
+
+def intervalos(replicas: np.ndarray, estimado: np.ndarray, jack: np.ndarray,
+               nivel: float = 0.95) -> Dict[str, Dict[str, tuple]]:
+    """Intervalos percentil y BCa de cada estadístico a partir de las réplicas"""
+    alfa = (1 - nivel) / 2
+    b = replicas.shape[0]
+    percentil = np.quantile(replicas, [alfa, 1 - alfa], axis=0)
+
+    # Corrección de sesgo z0 (con empates a la mitad) y aceleración por jackknife
+    proporcion = (replicas < estimado).mean(axis=0) + 0.5 * (replicas == estimado).mean(axis=0)
+    z0 = norm.ppf(np.clip(proporcion, 1 / (b + 1), b / (b + 1)))
+    desvios = jack.mean(axis=0) - jack
+    denominador = 6 * (desvios ** 2).sum(axis=0) ** 1.5
+    with np.errstate(divide="ignore", invalid="ignore"):
+        aceleracion = np.where(denominador > 0, (desvios ** 3).sum(axis=0) / denominador, 0.0)
+
+    resultado = {}
+    for j, nombre in enumerate(ESTADISTICOS):
+        z = norm.ppf([alfa, 1 - alfa])
+        ajustados = norm.cdf(z0[j] + (z0[j] + z) / (1 - aceleracion[j] * (z0[j] + z)))
+        resultado[nombre] = {
+            "estimado": float(estimado[j]),
+            "percentil": (float(percentil[0, j]), float(percentil[1, j])),
+            "bca": tuple(float(v) for v in np.quantile(replicas[:, j], ajustados)),
+        }
+    return resultado
+
+
+class CorridaBootstrap:
+    """Réplicas acumuladas de un bootstrap en curso"""
+
+    def __init__(self, grupo1: np.ndarray, grupo2: np.ndarray, replicas: int):
+        self.total = replicas
+        self.completadas = 0
+        self.error: Optional[BaseException] = None
+        self.cancelada = False
+        self.estimado = diferencias(grupo1.mean(), grupo1.var(ddof=1), grupo1.size,
+                                    grupo2.mean(), grupo2.var(ddof=1), grupo2.size)
+        self._jackknife = jackknife(grupo1, grupo2)
+        self._lotes: List[np.ndarray] = []
+        self._futuros: List[Future] = []
+        self._lock = threading.Lock()
+
+    @property
+    def terminada(self) -> bool:
+        return self.cancelada or self.error is not None or self.completadas >= self.total
+
+    def replicas(self) -> np.ndarray:
+        with self._lock:
+            return np.concatenate(self._lotes) if self._lotes else np.empty((0, len(ESTADISTICOS)))
+
+    def intervalos(self, nivel: float = 0.95) -> Optional[Dict[str, Dict[str, tuple]]]:
+        """Intervalos con las réplicas disponibles hasta ahora (None si aún no hay)"""
+        replicas = self.replicas()
+        if replicas.shape[0] < 2:
+            return None
+        return intervalos(replicas, self.estimado, self._jackknife, nivel)
+
+    def cancelar(self) -> None:
+        self.cancelada = True
+        for futuro in self._futuros:
+            futuro.cancel()
+
+    def _agregar(self, lote: np.ndarray) -> None:
+        with self._lock:
+            self._lotes.append(lote)
+            self.completadas += lote.shape[0]
+
+
+def iniciar_bootstrap(grupo1, grupo2, replicas: int = 10_000,
+                      al_avanzar: Optional[Callable[[CorridaBootstrap], None]] = None) -> CorridaBootstrap:
+    """Reparte `replicas` remuestreos en lotes y devuelve la corrida en curso
+
+    `al_avanzar(corrida)` se llama al terminar cada lote, desde un hilo del pool.
+    """
+    grupo1 = np.asarray(grupo1, dtype=float)
+    grupo2 = np.asarray(grupo2, dtype=float)
+    if grupo1.size < 3 or grupo2.size < 3:
+        raise ValueError("Cada grupo necesita al menos 3 observaciones")
+
+    corrida = CorridaBootstrap(grupo1, grupo2, replicas)
+    por_lote = max(1, min(VALORES_POR_LOTE // (grupo1.size + grupo2.size),
+                          -(-replicas // LOTES_MINIMOS)))
+    tamanos = [min(por_lote, replicas - inicio) for inicio in range(0, replicas, por_lote)]
+    semillas = np.random.SeedSequence().spawn(len(tamanos))
+
+    def listo(futuro: Future):
+        if corrida.cancelada or futuro.cancelled():
+            return
+        try:
+            corrida._agregar(futuro.result())
+        except Exception as exc:
+            traceback.print_exc()
+            corrida.error = exc
+        if al_avanzar is not None:
+            try:
+                al_avanzar(corrida)
+            except Exception:
+                traceback.print_exc()
+
+    pool = pool_procesos()
+    for tamano, semilla in zip(tamanos, semillas):
+        futuro = pool.submit(replicas_lote, grupo1, grupo2, tamano, semilla)
+        corrida._futuros.append(futuro)
+        futuro.add_done_callback(listo)
+    return corrida
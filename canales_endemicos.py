@@ -0,0 +1,162 @@
+"""Canales endémicos, descomposición estacional y alertas de brote en series semanales.
+
+El canal endémico resume los años históricos semana a semana: con el método
+de cuartiles (Bortman) los límites son Q1, la mediana y Q3 de cada semana
+epidemiológica; con "media ± 2 DE" se usan la media geométrica y ± 2
+desviaciones estándar de log(1 + casos), que no dan límites negativos. Los
+límites se precalculan de una sola vez en un arreglo compacto (52 semanas ×
+3 límites), así que clasificar una semana nueva es una consulta O(1).
+
+La semana 53, que solo aparece en algunos años, no entra en la historia del
+canal (así no reemplaza el dato de la semana 52 de ese año); al vigilar, una
+semana 53 se clasifica con los límites de la 52. En la descomposición ambas
+semanas aportan a la misma media estacional.
+
+La descomposición es al estilo STL: tendencia por media móvil centrada de un
+año, componente estacional como media de cada semana del año sobre la serie
+sin tendencia, y unas pocas pasadas con pesos robustos (bicuadrados) para
+que un brote no deforme la estacionalidad de los demás años.
+"""
+import warnings
+from typing import Dict, Optional
+
+import numpy as np
+
+from series_tiempo import SerieDiaria, semana_epidemiologica
+
+METODOS = ("cuartiles", "media_2de")
+ZONAS = ("éxito", "seguridad", "alerta", "epidemia")
+# Semanas de un año en la media móvil de la tendencia
+PERIODO = 52
+
+
+def _indice_semana(semanas) -> np.ndarray:
+    """Fila del arreglo de límites para cada semana epidemiológica (1-53)"""
+    return np.minimum(np.asarray(semanas, dtype=np.int64), PERIODO) - 1
+
+
+def semanas_completas(serie: SerieDiaria) -> Dict[str, np.ndarray]:
+    """Totales por semana epidemiológica de una serie diaria, sin las semanas incompletas de los extremos"""
+    datos = serie.agregada("semana")
+    completas = datos["dias"] == 7
+    anios, semanas = semana_epidemiologica(datos["inicio"][completas])
+    return {
+        "inicio": datos["inicio"][completas],
+        "anio": anios,
+        "semana": semanas,
+        "conteos": datos["conteos"][completas],
+        "etiquetas": datos["etiquetas"][completas],
+    }
+
+
+class CanalEndemico:
+    """Límites inferior, central y superior de cada semana epidemiológica"""
+
+    def __init__(self, anios, semanas, conteos, metodo: str = "cuartiles"):
+        if metodo not in METODOS:
+            raise ValueError(f"Método desconocido: {metodo}")
+        anios = np.asarray(anios, dtype=np.int64)
+        semanas = np.asarray(semanas, dtype=np.int64)
+        conteos = np.asarray(conteos, dtype=float)
+        # Una celda por año y semana: la semana 53 se deja fuera de la historia
+        comunes = semanas <= PERIODO
+        anios, semanas, conteos = anios[comunes], semanas[comunes], conteos[comunes]
+        historicos = np.unique(anios)
+        if historicos.size < 2:
+            raise ValueError("El canal endémico necesita al menos dos años de historia")
+        self.metodo = metodo
+        self.anios = historicos
+
+        # Matriz años × semanas (NaN donde falta la semana) y límites por columna
+        matriz = np.full((historicos.size, PERIODO), np.nan)
+        matriz[np.searchsorted(historicos, anios), _indice_semana(semanas)] = conteos
+        # Semanas sin historia quedan en NaN (nanquantile/nanmean avisan con RuntimeWarning)
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)
+            if metodo == "cuartiles":
+                limites = np.nanquantile(matriz, [0.25, 0.5, 0.75], axis=0).T
+            else:
+                logaritmos = np.log1p(matriz)
+                media = np.nanmean(logaritmos, axis=0)
+                desviacion = np.nanstd(logaritmos, axis=0, ddof=1)
+                limites = np.expm1(np.stack([media - 2 * desviacion, media, media + 2 * desviacion], axis=1))
+        self.limites = np.clip(limites, 0, None).astype(np.float32)
+
+    @classmethod
+    def desde_serie(cls, serie: SerieDiaria, hasta_anio: Optional[int] = None,
+                    metodo: str = "cuartiles") -> "CanalEndemico":
+        """Canal con los años completos de una serie diaria anteriores a `hasta_anio`"""
+        semanal = semanas_completas(serie)
+        historia = semanal["anio"] < hasta_anio if hasta_anio is not None else slice(None)
+        return cls(semanal["anio"][historia], semanal["semana"][historia], semanal["conteos"][historia], metodo)
+
+    def zona(self, semana: int, casos: float) -> int:
+        """Índice en `ZONAS` de una semana: O(1), una fila del arreglo de límites"""
+        inferior, central, superior = self.limites[min(int(semana), PERIODO) - 1]
+        if casos > superior:
+            return 3
+        if casos > central:
+            return 2
+        return 1 if casos >= inferior else 0
+
+    def zonas(self, semanas, conteos) -> np.ndarray:
+        """Zonas de muchas semanas a la vez"""
+        limites = self.limites[_indice_semana(semanas)]
+        conteos = np.asarray(conteos, dtype=float)
+        return ((conteos >= limites[:, 0]).astype(np.int64) + (conteos > limites[:, 1]) + (conteos > limites[:, 2]))
+
+
+class VigilanciaBrotes:
+    """Revisa semana a semana contra el canal y alerta tras varias semanas sobre el límite superior"""
+
+    def __init__(self, canal: CanalEndemico, semanas_consecutivas: int = 2):
+        self.canal = canal
+        self.semanas_consecutivas = semanas_consecutivas
+        self.racha = 0
+
+    def agregar(self, semana: int, casos: float) -> Dict[str, object]:
+        zona = self.canal.zona(semana, casos)
+        self.racha = self.racha + 1 if zona == 3 else 0
+        return {"semana": int(semana), "zona": ZONAS[zona], "alerta": self.racha >= self.semanas_consecutivas}
+
+
+def _media_movil(valores: np.ndarray, pesos: np.ndarray, ventana: int) -> np.ndarray:
+    """Media móvil centrada y ponderada; en los extremos promedia la parte disponible de la ventana"""
+    nucleo = np.ones(ventana)
+    suma = np.convolve(valores * pesos, nucleo, mode="same")
+    total = np.convolve(pesos, nucleo, mode="same")
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(total > 0, suma / total, np.nan)
+
+
+def descomponer(semanas, conteos, iteraciones_robustas: int = 2) -> Dict[str, np.ndarray]:
+    """Tendencia + estacional + residuo de una serie semanal (aditiva, en casos)
+
+    También devuelve 'fuerza_estacional' = max(0, 1 - Var(residuo) / Var(estacional + residuo)).
+    """
+    conteos = np.asarray(conteos, dtype=float)
+    if conteos.size < 2 * PERIODO:
+        raise ValueError("La descomposición necesita al menos dos años de semanas")
+    indice = _indice_semana(semanas)
+    pesos = np.ones(conteos.size)
+    estacional = np.zeros(conteos.size)
+    for _ in range(iteraciones_robustas + 1):
+        for _ in range(2):
+            tendencia = _media_movil(conteos - estacional, pesos, PERIODO + 1)
+            sin_tendencia = conteos - tendencia
+            por_semana = (np.bincount(indice, weights=pesos * sin_tendencia, minlength=PERIODO)
+                          / np.maximum(np.bincount(indice, weights=pesos, minlength=PERIODO), 1e-12))
+            por_semana -= por_semana.mean()
+            estacional = por_semana[indice]
+        residuo = conteos - tendencia - estacional
+        escala = 6 * np.median(np.abs(residuo))
+        pesos = np.clip(1 - (residuo / escala) ** 2, 0, None) ** 2 if escala > 0 else np.ones(conteos.size)
+
+    variacion = np.var(estacional + residuo)
+    return {
+        "tendencia": tendencia,
+        "estacional": estacional,
+        "residuo": residuo,
+        "perfil": por_semana,
+        "fuerza_estacional": float(max(0.0, 1 - np.var(residuo) / variacion)) if variacion > 0 else 0.0,
+    }
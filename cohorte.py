@@ -0,0 +1,118 @@
+"""Simulación de una cohorte individual para indicadores de frecuencia.
+
+Cada persona de la población (hasta 10^7) tiene tres datos guardados como
+arreglos de NumPy: si ya era caso al inicio, el día de inicio de la
+enfermedad y el día de muerte (infinito si no ocurre en el seguimiento).
+Los casos nuevos aparecen con un riesgo constante (incidencia anual dada) y
+una fracción de los casos fallece tras una demora exponencial.
+
+Al terminar la simulación los tiempos se agregan por día con `np.bincount`
+en arreglos acumulados. Con ellos cualquier indicador en el día t
+(prevalencia puntual y de período, incidencia acumulada, densidad de
+incidencia por persona-tiempo y letalidad) es una consulta O(1), así que
+mover el día de corte no vuelve a simular.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+
+# Personas generadas por bloque (acota la memoria temporal en float64)
+PERSONAS_POR_BLOQUE = 1_000_000
+
+
+class CohorteSimulada:
+    """Cohorte simulada con sus acumulados diarios de casos, muertes y persona-tiempo
+
+    `prevalencia`, `incidencia_anual` y `letalidad` son proporciones en
+    [0, 1]; la incidencia anual es el riesgo de enfermar en 365 días para
+    quien está sano al inicio.
+    """
+
+    def __init__(self, poblacion: int, prevalencia: float, incidencia_anual: float,
+                 letalidad: float, dias: int = 365, demora_muerte: float = 30.0,
+                 semilla: Optional[int] = None):
+        if poblacion <= 0:
+            raise ValueError("La población debe ser positiva")
+        self.poblacion = int(poblacion)
+        self.dias = int(dias)
+        self.parametros = (prevalencia, incidencia_anual, letalidad, demora_muerte)
+        self.caso_basal = np.empty(self.poblacion, dtype=bool)
+        self.inicio = np.empty(self.poblacion, dtype=np.float32)
+        self.muerte = np.empty(self.poblacion, dtype=np.float32)
+
+        # Riesgo constante: tasa diaria equivalente al riesgo anual dado
+        tasa = -np.log1p(-min(incidencia_anual, 1 - 1e-12)) / 365.0
+        rng = np.random.default_rng(semilla)
+        for desde in range(0, self.poblacion, PERSONAS_POR_BLOQUE):
+            hasta = min(desde + PERSONAS_POR_BLOQUE, self.poblacion)
+            n = hasta - desde
+            basal = rng.random(n) < prevalencia
+            inicio = np.full(n, np.inf)
+            if tasa > 0:
+                inicio = rng.exponential(1 / tasa, n)
+            inicio[basal] = 0.0
+            inicio[inicio > self.dias] = np.inf
+            fallece = np.isfinite(inicio) & (rng.random(n) < letalidad)
+            muerte = np.where(fallece, inicio + rng.exponential(demora_muerte, n), np.inf)
+            muerte[muerte > self.dias] = np.inf
+
+            self.caso_basal[desde:hasta] = basal
+            self.inicio[desde:hasta] = inicio
+            self.muerte[desde:hasta] = muerte
+
+        self._acumular()
+
+    def _acumular(self) -> None:
+        """Acumulados por día: casos nuevos, suma de sus días de inicio y muertes"""
+        casillas = self.dias + 1
+        self.casos_basales = int(self.caso_basal.sum())
+        nuevos = ~self.caso_basal & np.isfinite(self.inicio)
+        inicios = self.inicio[nuevos].astype(np.float64)
+        # Un inicio en (t-1, t] cuenta como ocurrido al llegar al día t
+        dia_inicio = np.ceil(inicios).astype(np.int64)
+        self._nuevos = np.cumsum(np.bincount(dia_inicio, minlength=casillas))
+        self._suma_inicios = np.cumsum(np.bincount(dia_inicio, weights=inicios, minlength=casillas))
+        muertes = self.muerte[np.isfinite(self.muerte)]
+        self._muertes = np.cumsum(np.bincount(np.ceil(muertes).astype(np.int64), minlength=casillas))
+
+    def indicadores(self, dia: int) -> Dict[str, float]:
+        """Indicadores al día `dia` del seguimiento (proporciones y tasa por persona-año)"""
+        t = int(np.clip(dia, 0, self.dias))
+        nuevos = int(self._nuevos[t])
+        muertes = int(self._muertes[t])
+        casos = self.casos_basales + nuevos
+        en_riesgo = self.poblacion - self.casos_basales
+        vivos = self.poblacion - muertes
+        # Persona-tiempo en riesgo: cada sano aporta hasta enfermar o hasta t
+        persona_dias = float(en_riesgo * t - (nuevos * t - self._suma_inicios[t]))
+        return {
+            "dia": t,
+            "casos_basales": self.casos_basales,
+            "casos_nuevos": nuevos,
+            "casos_acumulados": casos,
+            "muertes": muertes,
+            "casos_vivos": casos - muertes,
+            "prevalencia_puntual": (casos - muertes) / vivos if vivos else 0.0,
+            "prevalencia_periodo": casos / self.poblacion,
+            "incidencia_acumulada": nuevos / en_riesgo if en_riesgo else 0.0,
+            "persona_anios": persona_dias / 365.0,
+            "densidad_incidencia": nuevos / (persona_dias / 365.0) if persona_dias > 0 else 0.0,
+            "letalidad": muertes / casos if casos else 0.0,
+        }
+
+    def serie(self) -> Dict[str, np.ndarray]:
+        """Indicadores de todos los días, vectorizados, para graficar la evolución"""
+        t = np.arange(self.dias + 1)
+        casos = self.casos_basales + self._nuevos
+        vivos = self.poblacion - self._muertes
+        en_riesgo = self.poblacion - self.casos_basales
+        persona_dias = en_riesgo * t - (self._nuevos * t - self._suma_inicios)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return {
+                "dia": t,
+                "prevalencia_puntual": np.where(vivos > 0, (casos - self._muertes) / vivos, 0.0),
+                "prevalencia_periodo": casos / self.poblacion,
+                "incidencia_acumulada": self._nuevos / en_riesgo if en_riesgo else np.zeros(t.size),
+                "densidad_incidencia": np.where(persona_dias > 0, self._nuevos / (persona_dias / 365.0), 0.0),
+                "letalidad": np.where(casos > 0, self._muertes / casos, 0.0),
+            }
@@ -0,0 +1,88 @@
+"""Estadísticos descriptivos por grupo y diferencias entre grupos, vectorizados.
+
+`estadisticos_por_grupo` recibe un arreglo de valores y otro de etiquetas de
+grupo (por ejemplo, la unidad hospitalaria de cada paciente) y devuelve, para
+k grupos a la vez, n, media, mediana, DE, mínimo, máximo y rango
+intercuartílico, además de las matrices k × k de diferencias absolutas,
+relativas y d de Cohen. Los datos se ordenan una sola vez por (grupo, valor) y
+todo lo demás son operaciones por segmentos sobre ese orden.
+"""
+from typing import Any, Dict
+
+import numpy as np
+
+
+def _cuantiles_por_segmento(ordenados: np.ndarray, inicios: np.ndarray, conteos: np.ndarray,
+                            q: float) -> np.ndarray:
+    """Cuantil q de cada segmento ya ordenado (interpolación lineal, como np.quantile)"""
+    posicion = q * (conteos - 1)
+    inferior = np.floor(posicion).astype(np.int64)
+    fraccion = posicion - inferior
+    superior = np.minimum(inferior + 1, conteos - 1)
+    a = ordenados[inicios + inferior]
+    b = ordenados[inicios + superior]
+    return a + (b - a) * fraccion
+
+
+def estadisticos_por_grupo(valores, grupos) -> Dict[str, Any]:
+    """Resumen por grupo y matrices de comparación entre todos los pares
+
+    Las matrices se leen como fila = grupo de referencia, columna = grupo
+    comparado: `diferencia[i, j] = media[j] - media[i]`,
+    `diferencia_relativa[i, j]` es esa diferencia en % de `media[i]` y
+    `cohen_d[i, j]` la divide por la DE combinada de ambos grupos.
+    """
+    valores = np.asarray(valores).ravel()
+    grupos = np.asarray(grupos).ravel()
+    if valores.size != grupos.size:
+        raise ValueError("Valores y grupos deben tener el mismo largo")
+    if valores.size == 0:
+        raise ValueError("No hay datos para resumir")
+
+    etiquetas, codigos, conteos = np.unique(grupos, return_inverse=True, return_counts=True)
+    k = etiquetas.size
+
+    # Orden por (grupo, valor): cada grupo queda en un segmento contiguo. Se
+    # ordena por valor y luego, de forma estable, por grupo (más rápido que lexsort)
+    orden = np.argsort(valores)
+    orden = orden[np.argsort(codigos[orden], kind="stable")]
+    ordenados = valores[orden]
+    inicios = np.concatenate(([0], np.cumsum(conteos)[:-1]))
+
+    datos = valores.astype(float)
+    medias = np.bincount(codigos, weights=datos, minlength=k) / conteos
+    desvios = datos - medias[codigos]
+    suma_cuadrados = np.bincount(codigos, weights=desvios * desvios, minlength=k)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        varianzas = np.where(conteos > 1, suma_cuadrados / (conteos - 1), 0.0)
+    de = np.sqrt(varianzas)
+
+    q1 = _cuantiles_por_segmento(ordenados, inicios, conteos, 0.25)
+    mediana = _cuantiles_por_segmento(ordenados, inicios, conteos, 0.5)
+    q3 = _cuantiles_por_segmento(ordenados, inicios, conteos, 0.75)
+
+    # Comparaciones entre todos los pares por difusión (broadcasting)
+    diferencia = medias[None, :] - medias[:, None]
+    gl = conteos[:, None] + conteos[None, :] - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        de_combinada = np.sqrt(
+            ((conteos[:, None] - 1) * varianzas[:, None] + (conteos[None, :] - 1) * varianzas[None, :]) / gl
+        )
+        cohen_d = np.where(de_combinada > 0, diferencia / de_combinada, 0.0)
+        relativa = np.where(medias[:, None] != 0, diferencia / medias[:, None] * 100, 0.0)
+
+    return {
+        'grupos': etiquetas.tolist(),
+        'n': conteos,
+        'mean': medias,
+        'median': mediana,
+        'sd': de,
+        'min': np.minimum.reduceat(ordenados, inicios),
+        'max': np.maximum.reduceat(ordenados, inicios),
+        'q1': q1,
+        'q3': q3,
+        'iqr': q3 - q1,
+        'diferencia': diferencia,
+        'diferencia_relativa': relativa,
+        'cohen_d': cohen_d,
+    }
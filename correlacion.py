@@ -0,0 +1,210 @@
+"""Matrices de correlación de Pearson y Spearman para tablas anchas y largas.
+
+La tabla (CSV) se lee por bloques de filas, así que la memoria no depende del
+número de filas:
+
+0. Una primera lectura decide qué columnas son numéricas mirando todos los
+   bloques: una columna lo es si todos sus valores no vacíos se pueden
+   convertir a número (el tipo que pandas infiere en un solo bloque no basta).
+1. Cada bloque se limpia (solo columnas numéricas, se descartan filas con
+   faltantes) y aporta su vector de medias y su matriz de co-momentos, que se
+   combinan con la fórmula de Chan et al. Al terminar la lectura ya se tiene
+   la matriz de Pearson. Los bloques limpios se copian a un archivo temporal.
+2. Para Spearman cada columna se transforma en rangos (con empates
+   promediados). Las columnas se reparten en el pool de procesos compartido;
+   cada tarea lee y escribe archivos mapeados en memoria, de modo que cada
+   proceso carga una sola columna a la vez.
+3. La matriz de Spearman es la de Pearson sobre los rangos, calculada otra
+   vez por bloques de filas.
+
+Los resultados se guardan en caché por archivo, tamaño y fecha de
+modificación; el mapa de calor lo dibuja la OVA con el servicio de gráficos.
+"""
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from procesos import pool_procesos
+
+# Filas por bloque al leer la tabla y al recorrer los rangos
+FILAS_POR_BLOQUE = 200_000
+# Por debajo de este número de filas los rangos se calculan en el mismo proceso
+FILAS_MINIMAS_PARALELO = 100_000
+
+
+class CoMomentos:
+    """Medias y matriz de co-momentos de p variables, combinables por bloques"""
+
+    def __init__(self, p: int):
+        self.n = 0
+        self.media = np.zeros(p)
+        self.c = np.zeros((p, p))
+
+    def agregar_bloque(self, bloque: np.ndarray) -> None:
+        if bloque.shape[0] == 0:
+            return
+        n_b = bloque.shape[0]
+        media_b = bloque.mean(axis=0)
+        centrado = bloque - media_b
+        c_b = centrado.T @ centrado
+        if self.n == 0:
+            self.n, self.media, self.c = n_b, media_b, c_b
+            return
+        n = self.n + n_b
+        delta = media_b - self.media
+        self.c += c_b + np.outer(delta, delta) * (self.n * n_b / n)
+        self.media += delta * n_b / n
+        self.n = n
+
+    def correlacion(self) -> np.ndarray:
+        desvio = np.sqrt(np.diag(self.c))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = self.c / np.outer(desvio, desvio)
+        r[~np.isfinite(r)] = 0.0
+        np.fill_diagonal(r, 1.0)
+        return np.clip(r, -1.0, 1.0)
+
+
+def rangos_columna(ruta_datos: str, ruta_rangos: str, n: int, p: int, j: int) -> None:
+    """Tarea del pool: escribe los rangos de la columna `j` en el archivo de rangos"""
+    datos = np.memmap(ruta_datos, dtype=np.float64, mode="r", shape=(n, p))
+    rangos = np.memmap(ruta_rangos, dtype=np.float64, mode="r+", shape=(p, n))
+    rangos[j] = stats.rankdata(np.asarray(datos[:, j]))
+    rangos.flush()
+
+
+class MotorCorrelacion:
+    """Calcula y guarda en caché las matrices de correlación de archivos CSV"""
+
+    def __init__(self, capacidad: int = 8):
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._capacidad = capacidad
+
+    @staticmethod
+    def _clave(ruta: Path) -> tuple:
+        info = ruta.stat()
+        return (str(ruta), info.st_size, info.st_mtime_ns)
+
+    def _de_cache(self, clave: tuple, campo: str) -> Optional[Any]:
+        with self._lock:
+            entrada = self._cache.get(clave)
+            if entrada is None or campo not in entrada:
+                return None
+            self._cache.move_to_end(clave)
+            return entrada[campo]
+
+    def _a_cache(self, clave: tuple, **campos: Any) -> None:
+        with self._lock:
+            self._cache.setdefault(clave, {}).update(campos)
+            self._cache.move_to_end(clave)
+            while len(self._cache) > self._capacidad:
+                self._cache.popitem(last=False)
+
+    def calcular(self, ruta: Union[str, Path],
+                 al_avanzar: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Devuelve {'columnas', 'n', 'pearson', 'spearman'} para el CSV de `ruta`
+
+        `al_avanzar(mensaje)` recibe mensajes de progreso para la UI.
+        """
+        ruta = Path(ruta).resolve()
+        clave = self._clave(ruta)
+        resultado = self._de_cache(clave, "resultado")
+        if resultado is not None:
+            return resultado
+
+        avisar = al_avanzar or (lambda mensaje: None)
+        directorio = tempfile.mkdtemp(prefix="ova_correlacion_")
+        try:
+            resultado = self._calcular(ruta, directorio, avisar)
+        finally:
+            shutil.rmtree(directorio, ignore_errors=True)
+        self._a_cache(clave, resultado=resultado)
+        return resultado
+
+    @staticmethod
+    def _columnas_numericas(ruta: Path, avisar: Callable[[str], None]) -> List[str]:
+        """Columnas con al menos un valor y cuyos valores no vacíos son todos numéricos, en todos los bloques"""
+        columnas: Optional[List[str]] = None
+        descartadas = set()
+        con_datos = set()
+        filas = 0
+        for bloque in pd.read_csv(ruta, chunksize=FILAS_POR_BLOQUE):
+            if columnas is None:
+                columnas = list(bloque.columns)
+            for columna in columnas:
+                if columna in descartadas:
+                    continue
+                valores = bloque[columna]
+                presentes = valores.notna()
+                if presentes.any():
+                    con_datos.add(columna)
+                if not pd.api.types.is_numeric_dtype(valores):
+                    convertidos = pd.to_numeric(valores, errors="coerce")
+                    if (convertidos.isna() & presentes).any():
+                        descartadas.add(columna)
+            filas += len(bloque)
+            avisar(f"Revisando tipos de columna ({filas:,} filas)")
+        return [c for c in columnas or [] if c in con_datos and c not in descartadas]
+
+    def _calcular(self, ruta: Path, directorio: str, avisar: Callable[[str], None]) -> Dict[str, Any]:
+        ruta_datos = os.path.join(directorio, "datos.f64")
+        ruta_rangos = os.path.join(directorio, "rangos.f64")
+
+        # 0. Columnas numéricas según todos los bloques
+        columnas = self._columnas_numericas(ruta, avisar)
+        if len(columnas) < 2:
+            raise ValueError("La tabla necesita al menos dos columnas numéricas")
+
+        # 1. Lectura por bloques: Pearson y copia de las filas completas
+        pearson = CoMomentos(len(columnas))
+        with open(ruta_datos, "wb") as salida:
+            for bloque in pd.read_csv(ruta, chunksize=FILAS_POR_BLOQUE, usecols=columnas):
+                valores = bloque[columnas].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=np.float64)
+                valores = valores[~np.isnan(valores).any(axis=1)]
+                pearson.agregar_bloque(valores)
+                salida.write(np.ascontiguousarray(valores).tobytes())
+                avisar(f"Leídas {pearson.n:,} filas completas")
+
+        if pearson.n < 3:
+            raise ValueError("La tabla no tiene suficientes filas completas")
+        n, p = pearson.n, len(columnas)
+
+        # 2. Rangos por columna (en paralelo si la tabla es grande)
+        avisar(f"Calculando rangos de {p} variables")
+        np.memmap(ruta_rangos, dtype=np.float64, mode="w+", shape=(p, n)).flush()
+        if n >= FILAS_MINIMAS_PARALELO:
+            pool = pool_procesos()
+            futuros = [pool.submit(rangos_columna, ruta_datos, ruta_rangos, n, p, j) for j in range(p)]
+            for futuro in futuros:
+                futuro.result()
+        else:
+            for j in range(p):
+                rangos_columna(ruta_datos, ruta_rangos, n, p, j)
+
+        # 3. Spearman = Pearson de los rangos, por bloques de filas
+        avisar("Calculando correlaciones de Spearman")
+        rangos = np.memmap(ruta_rangos, dtype=np.float64, mode="r", shape=(p, n))
+        spearman = CoMomentos(p)
+        for inicio in range(0, n, FILAS_POR_BLOQUE):
+            spearman.agregar_bloque(np.asarray(rangos[:, inicio:inicio + FILAS_POR_BLOQUE]).T)
+        del rangos
+
+        return {
+            "columnas": columnas,
+            "n": n,
+            "pearson": pearson.correlacion(),
+            "spearman": spearman.correlacion(),
+        }
+
+
+# Instancia compartida por la aplicación
+motor_correlacion = MotorCorrelacion()
@@ -0,0 +1,59 @@
+"""Estimación de densidad por kernel gaussiano con binning lineal y FFT.
+
+`scipy.stats.gaussian_kde` evalúa el kernel de cada observación en cada punto
+de la curva (costo O(n·m)). Aquí los datos se reparten primero en una malla
+regular con binning lineal y la malla se convoluciona con el kernel mediante
+FFT, de modo que el costo depende del tamaño de la malla y no de n (salvo el
+binning, que es una sola pasada vectorizada). Con la malla por defecto el
+resultado coincide con `gaussian_kde` a la precisión de un gráfico.
+"""
+import math
+from typing import Optional
+
+import numpy as np
+
+
+def ancho_banda_scott(datos: np.ndarray) -> float:
+    """Regla de Scott, la misma que usa `gaussian_kde` por defecto en 1D"""
+    n = datos.size
+    if n < 2:
+        return 0.0
+    return float(np.std(datos, ddof=1)) * n ** (-1 / 5)
+
+
+def kde_fft(datos, x: np.ndarray, ancho_banda: Optional[float] = None,
+            tamano_malla: int = 1024) -> Optional[np.ndarray]:
+    """Densidad estimada de `datos` evaluada en los puntos `x`
+
+    Devuelve None si el ancho de banda es 0 (menos de dos valores o todos
+    iguales), caso en el que la densidad no está definida.
+    """
+    datos = np.asarray(datos, dtype=float).ravel()
+    h = ancho_banda_scott(datos) if ancho_banda is None else ancho_banda
+    if h <= 0:
+        return None
+
+    # Malla que cubre los datos, los puntos pedidos y las colas del kernel
+    inferior = min(datos.min(), np.min(x)) - 4 * h
+    superior = max(datos.max(), np.max(x)) + 4 * h
+    paso = (superior - inferior) / (tamano_malla - 1)
+
+    # Binning lineal: cada dato reparte su peso entre los dos nodos vecinos
+    posicion = (datos - inferior) / paso
+    indice = np.clip(np.floor(posicion).astype(np.int64), 0, tamano_malla - 2)
+    fraccion = posicion - indice
+    conteos = np.bincount(indice, weights=1 - fraccion, minlength=tamano_malla)
+    conteos += np.bincount(indice + 1, weights=fraccion, minlength=tamano_malla)
+
+    # Kernel gaussiano muestreado en la malla, truncado a 4 anchos de banda
+    radio = min(tamano_malla - 1, int(math.ceil(4 * h / paso)))
+    desplazamientos = np.arange(-radio, radio + 1) * paso
+    kernel = np.exp(-0.5 * (desplazamientos / h) ** 2) / (h * math.sqrt(2 * math.pi) * datos.size)
+
+    # Convolución lineal por FFT (relleno con ceros para evitar el solapamiento circular)
+    largo = 1 << (tamano_malla + 2 * radio - 1).bit_length()
+    convolucion = np.fft.irfft(np.fft.rfft(conteos, largo) * np.fft.rfft(kernel, largo), largo)
+    densidad_malla = np.maximum(convolucion[radio:radio + tamano_malla], 0)
+
+    malla = inferior + np.arange(tamano_malla) * paso
+    return np.interp(x, malla, densidad_malla)
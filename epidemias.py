@@ -0,0 +1,154 @@
+"""Simulación de brotes: modelos SIR/SEIR y brotes de fuente común, vectorizados.
+
+El estado de todas las trayectorias es una matriz (trayectorias × 4) con las
+columnas S, E, I, R; cada día se avanza con una sola operación sobre la
+matriz, así que 1.000 trayectorias cuestan casi lo mismo que una. Los
+parámetros pueden ser escalares o un valor por trayectoria (por ejemplo, para
+propagar la incertidumbre sobre la transmisión).
+
+En tiempo discreto, la probabilidad diaria de pasar de un compartimento al
+siguiente es 1 - exp(-tasa). La versión determinista mueve la fracción
+esperada; la estocástica es una cadena binomial (cada persona cambia de
+estado con esa probabilidad), de donde salen las bandas de incertidumbre.
+
+Los brotes de fuente puntual y continua no son compartimentales: los casos
+son exposiciones convolucionadas con la distribución del período de
+incubación, con ruido multinomial o de Poisson entre trayectorias.
+"""
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import stats
+
+MODELOS = ("sir", "seir")
+S, E, I, R = range(4)
+
+
+class TrayectoriasEpidemicas:
+    """Casos nuevos por día de varias trayectorias y sus medidas resumen"""
+
+    def __init__(self, incidencia: np.ndarray, poblacion: int,
+                 susceptibles_finales: Optional[np.ndarray] = None):
+        self.incidencia = np.atleast_2d(incidencia)
+        self.poblacion = int(poblacion)
+        acumulados = self.incidencia.sum(axis=1)
+        # Tamaño final: quienes dejaron de ser susceptibles (incluye a los que
+        # aún incuban) o, sin compartimentos, los casos acumulados
+        self.tamano_final = (self.poblacion - susceptibles_finales
+                             if susceptibles_finales is not None else acumulados)
+
+    @property
+    def trayectorias(self) -> int:
+        return self.incidencia.shape[0]
+
+    @property
+    def dias(self) -> int:
+        return self.incidencia.shape[1]
+
+    @property
+    def dia_pico(self) -> np.ndarray:
+        return self.incidencia.argmax(axis=1)
+
+    @property
+    def tamano_pico(self) -> np.ndarray:
+        return self.incidencia.max(axis=1)
+
+    @property
+    def casos_totales(self) -> np.ndarray:
+        return self.incidencia.sum(axis=1)
+
+    @property
+    def tasa_ataque(self) -> np.ndarray:
+        return self.casos_totales / self.poblacion
+
+    def bandas(self, cuantiles: Sequence[float] = (0.05, 0.25, 0.5, 0.75, 0.95)) -> np.ndarray:
+        """Cuantiles por día entre trayectorias → matriz (cuantiles × días)"""
+        return np.quantile(self.incidencia, cuantiles, axis=0)
+
+    def resumen(self, nivel: float = 0.9) -> Dict[str, Tuple[float, float, float]]:
+        """(mediana, límite inferior, límite superior) de cada medida entre trayectorias"""
+        q = [0.5, (1 - nivel) / 2, 1 - (1 - nivel) / 2]
+        medidas = {
+            "dia_pico": self.dia_pico,
+            "tamano_pico": self.tamano_pico,
+            "casos_totales": self.casos_totales,
+            "tasa_ataque": self.tasa_ataque,
+            "tamano_final": self.tamano_final,
+        }
+        return {nombre: tuple(float(v) for v in np.quantile(valores, q))
+                for nombre, valores in medidas.items()}
+
+
+def simular_compartimental(modelo: str, poblacion: int, beta, gamma, sigma=0.2,
+                           dias: int = 120, infectados_iniciales=5, expuestos_iniciales=0,
+                           trayectorias: int = 1, estocastico: bool = False,
+                           semilla: Optional[int] = None) -> TrayectoriasEpidemicas:
+    """Integra un SIR o SEIR para `trayectorias` conjuntos de parámetros a la vez
+
+    `beta` es la tasa de contagio diaria, `gamma` la de recuperación y
+    `sigma` la de paso de expuesto a infeccioso (solo SEIR); R0 = beta/gamma.
+    La incidencia diaria son los nuevos infecciosos (inicio de síntomas).
+    """
+    if modelo not in MODELOS:
+        raise ValueError(f"Modelo desconocido: {modelo}")
+    k = int(trayectorias)
+    forma = (k,)
+    p_recuperacion = 1 - np.exp(-np.broadcast_to(np.asarray(gamma, dtype=float), forma))
+    p_incubacion = 1 - np.exp(-np.broadcast_to(np.asarray(sigma, dtype=float), forma))
+    beta = np.broadcast_to(np.asarray(beta, dtype=float), forma)
+
+    estado = np.zeros((k, 4), dtype=np.int64 if estocastico else float)
+    estado[:, E] = expuestos_iniciales
+    estado[:, I] = infectados_iniciales
+    estado[:, S] = poblacion - estado[:, E] - estado[:, I]
+    incidencia = np.zeros((k, dias), dtype=estado.dtype)
+    rng = np.random.default_rng(semilla)
+
+    for dia in range(dias):
+        p_contagio = 1 - np.exp(-beta * estado[:, I] / poblacion)
+        if estocastico:
+            contagios = rng.binomial(estado[:, S], p_contagio)
+            nuevos_infecciosos = rng.binomial(estado[:, E], p_incubacion) if modelo == "seir" else contagios
+            recuperados = rng.binomial(estado[:, I], p_recuperacion)
+        else:
+            contagios = estado[:, S] * p_contagio
+            nuevos_infecciosos = estado[:, E] * p_incubacion if modelo == "seir" else contagios
+            recuperados = estado[:, I] * p_recuperacion
+
+        estado[:, S] -= contagios
+        if modelo == "seir":
+            estado[:, E] += contagios - nuevos_infecciosos
+        estado[:, I] += nuevos_infecciosos - recuperados
+        estado[:, R] += recuperados
+        incidencia[:, dia] = nuevos_infecciosos
+
+    return TrayectoriasEpidemicas(incidencia, poblacion, susceptibles_finales=estado[:, S])
+
+
+def incubacion_diaria(dias: int, mediana: float = 5.0, dispersion: float = 0.4) -> np.ndarray:
+    """Probabilidad de iniciar síntomas cada día tras la exposición (lognormal discretizada)"""
+    bordes = stats.lognorm.cdf(np.arange(dias + 1), s=dispersion, scale=mediana)
+    pmf = np.diff(bordes)
+    return pmf / pmf.sum()
+
+
+def brote_fuente_puntual(poblacion: int, tasa_ataque, dias: int = 120, dia_exposicion: int = 0,
+                         trayectorias: int = 1, semilla: Optional[int] = None,
+                         **incubacion) -> TrayectoriasEpidemicas:
+    """Exposición única: los enfermos se reparten según el período de incubación"""
+    rng = np.random.default_rng(semilla)
+    pmf = np.zeros(dias)
+    pmf[dia_exposicion:] = incubacion_diaria(dias - dia_exposicion, **incubacion)
+    enfermos = rng.binomial(poblacion, np.broadcast_to(tasa_ataque, (trayectorias,)))
+    return TrayectoriasEpidemicas(rng.multinomial(enfermos, pmf), poblacion)
+
+
+def brote_fuente_continua(poblacion: int, tasa_diaria, inicio: int = 5, fin: int = 60,
+                          dias: int = 120, trayectorias: int = 1, semilla: Optional[int] = None,
+                          **incubacion) -> TrayectoriasEpidemicas:
+    """Exposición sostenida entre `inicio` y `fin`: exposiciones convolucionadas con la incubación"""
+    rng = np.random.default_rng(semilla)
+    exposiciones = np.zeros(dias)
+    exposiciones[inicio:fin] = poblacion * tasa_diaria
+    esperados = np.convolve(exposiciones, incubacion_diaria(dias, **incubacion))[:dias]
+    return TrayectoriasEpidemicas(rng.poisson(esperados, (trayectorias, dias)), poblacion)
@@ -0,0 +1,395 @@
+"""Acumuladores y resúmenes estadísticos para series grandes.
+
+Los acumuladores permiten resumir series muy largas (exportaciones de
+monitoreo con millones de lecturas) sin guardarlas completas en memoria: los
+datos pueden llegar valor a valor, como arreglos NumPy o como un iterable de
+bloques, y dos acumuladores parciales se combinan con `merge`.
+
+La media y la suma de cuadrados de desviaciones se actualizan con el
+algoritmo de Welford y se combinan entre bloques con la fórmula de Chan et al.,
+que es numéricamente estable aun cuando la media es grande frente a la
+dispersión. Para cuantiles de flujos que no caben en memoria se usa un
+t-digest (`DigestoCuantiles`); cuando los datos sí caben, `medidas_centrales`
+calcula media, mediana y modas de forma exacta y vectorizada.
+"""
+import itertools
+import math
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+
+# Tamaño de bloque al consumir iterables de escalares
+TAMANO_BLOQUE = 65536
+
+
+class AcumuladorDispersion:
+    """n, media, varianza, desviación estándar, mínimo, máximo, rango y CV en una pasada"""
+
+    def __init__(self):
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def push(self, x: float) -> None:
+        """Agrega un valor (actualización de Welford)"""
+        x = float(x)
+        self.n += 1
+        delta = x - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (x - self.media)
+        if x < self.minimo:
+            self.minimo = x
+        if x > self.maximo:
+            self.maximo = x
+
+    def push_many(self, valores: Union[np.ndarray, Iterable[float]]) -> None:
+        """Agrega un arreglo o un iterable de valores
+
+        Los arreglos se resumen de forma vectorizada y se combinan con `merge`;
+        los iterables genéricos se consumen en bloques de `TAMANO_BLOQUE`.
+        """
+        if isinstance(valores, (np.ndarray, list, tuple)):
+            self._push_arreglo(np.asarray(valores, dtype=float))
+            return
+        iterador = iter(valores)
+        while True:
+            bloque = np.fromiter(itertools.islice(iterador, TAMANO_BLOQUE), dtype=float)
+            if bloque.size == 0:
+                break
+            self._push_arreglo(bloque)
+
+    def push_bloques(self, bloques: Iterable[Union[np.ndarray, Iterable[float]]]) -> None:
+        """Agrega cada bloque de un iterable de bloques (por ejemplo, lecturas por archivo)"""
+        for bloque in bloques:
+            self.push_many(bloque)
+
+    def _push_arreglo(self, arreglo: np.ndarray) -> None:
+        arreglo = arreglo.ravel()
+        if arreglo.size == 0:
+            return
+        parcial = AcumuladorDispersion()
+        parcial.n = int(arreglo.size)
+        parcial.media = float(arreglo.mean())
+        # Dos pasadas dentro del bloque: estable y sin bucles de Python
+        parcial.m2 = float(np.square(arreglo - parcial.media).sum())
+        parcial.minimo = float(arreglo.min())
+        parcial.maximo = float(arreglo.max())
+        self.merge(parcial)
+
+    def merge(self, otro: "AcumuladorDispersion") -> "AcumuladorDispersion":
+        """Incorpora otro acumulador parcial (fórmula de Chan et al.)"""
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media, self.m2 = otro.n, otro.media, otro.m2
+            self.minimo, self.maximo = otro.minimo, otro.maximo
+            return self
+        n = self.n + otro.n
+        delta = otro.media - self.media
+        self.media += delta * otro.n / n
+        self.m2 += otro.m2 + delta * delta * self.n * otro.n / n
+        self.n = n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        return self
+
+    @property
+    def varianza(self) -> float:
+        """Varianza muestral (n - 1); 0 con menos de dos valores"""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desviacion(self) -> float:
+        return math.sqrt(self.varianza)
+
+    @property
+    def rango(self) -> float:
+        return self.maximo - self.minimo if self.n else 0.0
+
+    @property
+    def cv(self) -> float:
+        """Coeficiente de variación en porcentaje; 0 si la media es 0"""
+        return (self.desviacion / self.media) * 100 if self.media != 0 else 0.0
+
+    def resumen(self) -> Dict[str, Any]:
+        return {
+            'n': self.n,
+            'mean': self.media,
+            'variance': self.varianza,
+            'std_dev': self.desviacion,
+            'min': self.minimo if self.n else None,
+            'max': self.maximo if self.n else None,
+            'range': self.rango,
+            'cv': self.cv,
+        }
+
+
+class AcumuladorMomentos(AcumuladorDispersion):
+    """Momentos centrales hasta el cuarto en una pasada, combinables entre bloques
+
+    Extiende `AcumuladorDispersion` con las sumas M3 y M4 (actualización y
+    combinación de Pébay), de modo que resultados parciales de bloques o de
+    procesos distintos se unen con `merge` sin volver a leer los datos.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.m3 = 0.0
+        self.m4 = 0.0
+
+    def push(self, x: float) -> None:
+        x = float(x)
+        n1 = self.n
+        self.n += 1
+        n = self.n
+        delta = x - self.media
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        termino = delta * delta_n * n1
+        self.media += delta_n
+        self.m4 += termino * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * self.m2 - 4 * delta_n * self.m3
+        self.m3 += termino * delta_n * (n - 2) - 3 * delta_n * self.m2
+        self.m2 += termino
+        if x < self.minimo:
+            self.minimo = x
+        if x > self.maximo:
+            self.maximo = x
+
+    def _push_arreglo(self, arreglo: np.ndarray) -> None:
+        arreglo = arreglo.ravel()
+        if arreglo.size == 0:
+            return
+        parcial = AcumuladorMomentos()
+        parcial.n = int(arreglo.size)
+        parcial.media = float(arreglo.mean())
+        desvios = arreglo - parcial.media
+        cuadrados = desvios * desvios
+        parcial.m2 = float(cuadrados.sum())
+        parcial.m3 = float((cuadrados * desvios).sum())
+        parcial.m4 = float((cuadrados * cuadrados).sum())
+        parcial.minimo = float(arreglo.min())
+        parcial.maximo = float(arreglo.max())
+        self.merge(parcial)
+
+    def merge(self, otro: "AcumuladorMomentos") -> "AcumuladorMomentos":
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.n, self.media = otro.n, otro.media
+            self.m2, self.m3, self.m4 = otro.m2, otro.m3, otro.m4
+            self.minimo, self.maximo = otro.minimo, otro.maximo
+            return self
+        na, nb = self.n, otro.n
+        n = na + nb
+        delta = otro.media - self.media
+        delta2 = delta * delta
+        m2 = self.m2 + otro.m2 + delta2 * na * nb / n
+        m3 = (self.m3 + otro.m3 + delta * delta2 * na * nb * (na - nb) / n ** 2
+              + 3 * delta * (na * otro.m2 - nb * self.m2) / n)
+        m4 = (self.m4 + otro.m4 + delta2 * delta2 * na * nb * (na * na - na * nb + nb * nb) / n ** 3
+              + 6 * delta2 * (na * na * otro.m2 + nb * nb * self.m2) / n ** 2
+              + 4 * delta * (na * otro.m3 - nb * self.m3) / n)
+        self.media += delta * nb / n
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.n = n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        return self
+
+    @property
+    def asimetria(self) -> float:
+        """Asimetría g1 (sesgada, como `scipy.stats.skew` por defecto)"""
+        if self.n < 2 or self.m2 <= 0:
+            return 0.0
+        return math.sqrt(self.n) * self.m3 / self.m2 ** 1.5
+
+    @property
+    def curtosis(self) -> float:
+        """Exceso de curtosis g2 (sesgado, como `scipy.stats.kurtosis` por defecto)"""
+        if self.n < 2 or self.m2 <= 0:
+            return 0.0
+        return self.n * self.m4 / (self.m2 * self.m2) - 3
+
+    @property
+    def asimetria_corregida(self) -> float:
+        """Asimetría G1 corregida por sesgo (requiere n > 2)"""
+        n = self.n
+        if n < 3:
+            return 0.0
+        return self.asimetria * math.sqrt(n * (n - 1)) / (n - 2)
+
+    @property
+    def curtosis_corregida(self) -> float:
+        """Exceso de curtosis G2 corregido por sesgo (requiere n > 3)"""
+        n = self.n
+        if n < 4:
+            return 0.0
+        return ((n + 1) * self.curtosis + 6) * (n - 1) / ((n - 2) * (n - 3))
+
+    @property
+    def jarque_bera(self) -> float:
+        """Estadístico de Jarque–Bera a partir de g1 y g2"""
+        return self.n / 6 * (self.asimetria ** 2 + self.curtosis ** 2 / 4)
+
+    @property
+    def jarque_bera_p(self) -> float:
+        """Valor p asintótico: la cola de una chi-cuadrado con 2 gl es exp(-x/2)"""
+        return math.exp(-self.jarque_bera / 2)
+
+
+def medidas_centrales(datos: Union[np.ndarray, Iterable[float]],
+                      resolucion: Optional[float] = None) -> Dict[str, Any]:
+    """Media, mediana y modas exactas de `datos`
+
+    La mediana se obtiene por selección (`np.partition`) en lugar de ordenar
+    todo el arreglo. Las modas se cuentan sobre los valores cuantizados a
+    `resolucion` (por ejemplo 0.1 para temperaturas); sin resolución se usan
+    los valores tal cual. Si todos los valores aparecen una sola vez no hay
+    moda y `modas` queda vacía.
+    """
+    arreglo = np.asarray(datos).ravel()
+    n = int(arreglo.size)
+    if n == 0:
+        raise ValueError("No hay datos para resumir")
+
+    media = float(arreglo.mean())
+
+    medio = n // 2
+    if n % 2:
+        mediana = np.partition(arreglo, medio)[medio].item()
+    else:
+        par = np.partition(arreglo, [medio - 1, medio])[medio - 1:medio + 1]
+        mediana = float(par.mean())
+
+    # Con resolución se cuentan códigos enteros (valor / resolución redondeado)
+    valores = np.rint(arreglo / resolucion).astype(np.int64) if resolucion else arreglo
+    minimo = valores.min()
+    if valores.dtype.kind in "iu" and valores.max() - minimo < 4 * n:
+        # Enteros en un rango acotado: contar con bincount
+        conteos = np.bincount(valores - minimo)
+        distintos = np.flatnonzero(conteos)
+        unicos, conteos = distintos + minimo, conteos[distintos]
+    else:
+        unicos, conteos = np.unique(valores, return_counts=True)
+
+    frecuencia = int(conteos.max())
+    modas = unicos[conteos == frecuencia] if frecuencia > 1 else unicos[:0]
+    if resolucion:
+        decimales = max(0, -math.floor(math.log10(resolucion)))
+        modas = np.round(modas * resolucion, decimales)
+    modas = modas.tolist()
+
+    return {
+        'n': n,
+        'media': media,
+        'mediana': mediana,
+        'modas': modas,
+        'frecuencia_moda': frecuencia,
+        'distintos': int(unicos.size),
+    }
+
+
+class DigestoCuantiles:
+    """Cuantiles aproximados con memoria acotada (t-digest con fusión por bloques)
+
+    Los valores se acumulan en un búfer; al llenarse se ordenan junto con los
+    centroides actuales y se agrupan según la función de escala k1, que deja
+    centroides pequeños en las colas y grandes en el centro. El número de
+    centroides queda acotado por aproximadamente `compresion / 2`; el error en
+    rango es del orden de 1e-4 con la compresión por defecto.
+    """
+
+    def __init__(self, compresion: float = 200, tamano_bufer: int = 8192):
+        self.compresion = compresion
+        self.tamano_bufer = tamano_bufer
+        self._medias = np.empty(0)
+        self._pesos = np.empty(0)
+        self._bufer = []
+        self._en_bufer = 0
+        self.n = 0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+
+    def push(self, x: float) -> None:
+        self.push_many(np.array([x], dtype=float))
+
+    def push_many(self, valores: Union[np.ndarray, Iterable[float]]) -> None:
+        if not isinstance(valores, (np.ndarray, list, tuple)):
+            iterador = iter(valores)
+            while True:
+                bloque = np.fromiter(itertools.islice(iterador, TAMANO_BLOQUE), dtype=float)
+                if bloque.size == 0:
+                    return
+                self.push_many(bloque)
+        arreglo = np.asarray(valores, dtype=float).ravel()
+        if arreglo.size == 0:
+            return
+        self.n += int(arreglo.size)
+        self.minimo = min(self.minimo, float(arreglo.min()))
+        self.maximo = max(self.maximo, float(arreglo.max()))
+        self._bufer.append(arreglo)
+        self._en_bufer += arreglo.size
+        if self._en_bufer >= self.tamano_bufer:
+            self._comprimir()
+
+    def push_bloques(self, bloques: Iterable[Union[np.ndarray, Iterable[float]]]) -> None:
+        for bloque in bloques:
+            self.push_many(bloque)
+
+    def merge(self, otro: "DigestoCuantiles") -> "DigestoCuantiles":
+        """Incorpora los centroides de otro digesto"""
+        otro._comprimir()
+        if otro.n == 0:
+            return self
+        self._comprimir()
+        self._medias = np.concatenate([self._medias, otro._medias])
+        self._pesos = np.concatenate([self._pesos, otro._pesos])
+        self.n += otro.n
+        self.minimo = min(self.minimo, otro.minimo)
+        self.maximo = max(self.maximo, otro.maximo)
+        self._fusionar(self._medias, self._pesos)
+        return self
+
+    def _comprimir(self) -> None:
+        if not self._bufer:
+            return
+        nuevos = np.concatenate(self._bufer)
+        self._bufer = []
+        self._en_bufer = 0
+        self._fusionar(np.concatenate([self._medias, nuevos]),
+                       np.concatenate([self._pesos, np.ones(nuevos.size)]))
+
+    def _fusionar(self, medias: np.ndarray, pesos: np.ndarray) -> None:
+        orden = np.argsort(medias, kind="stable")
+        medias, pesos = medias[orden], pesos[orden]
+        total = pesos.sum()
+        # Posición de cada punto en la distribución acumulada y su grupo según k1
+        q = (np.cumsum(pesos) - pesos / 2) / total
+        k = self.compresion / (2 * math.pi) * np.arcsin(2 * q - 1)
+        grupos = np.floor(k - k.min()).astype(np.int64)
+        inicios = np.flatnonzero(np.r_[True, np.diff(grupos) != 0])
+        pesos_grupo = np.add.reduceat(pesos, inicios)
+        self._medias = np.add.reduceat(medias * pesos, inicios) / pesos_grupo
+        self._pesos = pesos_grupo
+
+    @property
+    def centroides(self) -> int:
+        self._comprimir()
+        return int(self._medias.size)
+
+    def cuantil(self, q: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Cuantil(es) aproximado(s) para q en [0, 1]"""
+        self._comprimir()
+        if self.n == 0:
+            raise ValueError("El digesto está vacío")
+        acumulado = np.cumsum(self._pesos) - self._pesos / 2
+        x = np.r_[0.0, acumulado, float(self.n)]
+        y = np.r_[self.minimo, self._medias, self.maximo]
+        resultado = np.interp(np.asarray(q, dtype=float) * self.n, x, y)
+        return float(resultado) if np.ndim(resultado) == 0 else resultado
+
+    @property
+    def mediana(self) -> float:
+        return self.cuantil(0.5)
@@ -1,8 +1,10 @@
 import flet as ft
 import inicio
-from importlib.util import spec_from_file_location, module_from_spec
-from pathlib import Path
-import inspect
+import multiprocessing
+from registro_ovas import registro
+from manifiesto_ovas import OVAS, obtener_ova, ruta_ova, nombre_modulo, lanzar_ova
+from precarga_ovas import precargador
+from rendimiento import traza
 import traceback
 
 
@@ -65,6 +67,8 @@ def mostrar_estadistica_descriptiva(page: ft.Page) -> None:
 
 def app_main(page: ft.Page):
     page.on_route_change = lambda e: route_change(page)
+    # Precargar dependencias y OVAs mientras el usuario está en inicio.py
+    precargador.iniciar()
     # Primera carga
     page.go("/inicio")
 
@@ -77,33 +81,52 @@ def mostrar_menu_ovas(page: ft.Page) -> None:
     def volver(e):
         page.go("/estadistica")
 
-    # Lista básica de OVAs disponibles
-    ovas = [
-        ("1", "OVA 1: Bioestadística esencial para salud"),
-        ("2", "OVA 2: Calidad y limpieza de datos clínicos"),
-        ("3", "OVA 3: Tablas de frecuencias y resúmenes categóricos"),
-        ("4", "OVA 4: Medidas de tendencia central y posición"),
-        ("6", "OVA 6: Asimetría, curtosis y normalidad práctica"),
-        ("12", "OVA 12: Curvas epidémicas y series de tiempo"),
-        ("18", "OVA 18: Dashboard descriptivo básico"),
-    ]
+    # Indicador de precarga: rayo verde si la OVA ya está en memoria
+    iconos_estado = {
+        "lista": (ft.icons.BOLT, ft.colors.GREEN_600),
+        "cargando": (ft.icons.HOURGLASS_TOP, ft.colors.AMBER_700),
+        "fria": (ft.icons.HOURGLASS_EMPTY, ft.colors.GREY_500),
+        "error": (ft.icons.ERROR_OUTLINE, ft.colors.RED_400),
+    }
+
+    botones = {}
+    for ova in OVAS:
+        icono, color = iconos_estado[precargador.estado(ova["clave"])]
+        botones[ova["clave"]] = ft.ElevatedButton(
+            f"OVA {ova['clave']}: {ova['titulo']}",
+            icon=icono,
+            icon_color=color,
+            on_click=lambda e, k=ova["clave"]: page.go(f"/ova/{k}"),
+            width=520,
+        )
 
-    botones = [
-        ft.ElevatedButton(texto, on_click=lambda e, k=clave: page.go(f"/ova/{k}"), width=520)
-        for clave, texto in ovas
-    ]
+    def actualizar_estado(clave, estado):
+        # Llamado desde el hilo de precarga; ignorar si ya no estamos en el menú
+        if page.route != "/ovas" or clave not in botones:
+            return
+        botones[clave].icon, botones[clave].icon_color = iconos_estado[estado]
+        page.update()
+
+    precargador.oyente = actualizar_estado
 
     page.add(
         ft.Column(
             [
                 ft.Text("OVAS - Selecciona un módulo", size=24, weight=ft.FontWeight.BOLD, color=ft.colors.BLUE),
                 ft.Container(height=20),
-                ft.Column(botones, spacing=10, horizontal_alignment=ft.CrossAxisAlignment.CENTER),
+                ft.Column(
+                    list(botones.values()),
+                    spacing=10,
+                    horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+                    scroll=ft.ScrollMode.AUTO,
+                    expand=True,
+                ),
                 ft.Container(height=30),
                 ft.ElevatedButton("◀ Volver", on_click=volver),
             ],
             alignment=ft.MainAxisAlignment.CENTER,
             horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            expand=True,
         )
     )
     page.update()
@@ -112,82 +135,18 @@ def mostrar_menu_ovas(page: ft.Page) -> None:
 def abrir_ova(page: ft.Page, clave: str) -> None:
     page.clean()
     try:
-        base_dir = Path(__file__).resolve().parent
-
-        def load_module_by_filename(filename: str, module_name: str):
-            spec = spec_from_file_location(module_name, str(base_dir / filename))
-            if spec is None or spec.loader is None:
-                raise ImportError(f"No se pudo crear el spec para {filename}")
-            module = module_from_spec(spec)
-            spec.loader.exec_module(module)
-            return module
-
-        def run_module_main(mod):
-            # 1) Si hay función main(page)
-            if hasattr(mod, "main") and callable(getattr(mod, "main")):
-                mod.main(page)
-                return True
-            # 2) Buscar clase con método main(self, page)
-            for attr_name in dir(mod):
-                attr = getattr(mod, attr_name)
-                if isinstance(attr, type):
-                    if hasattr(attr, "main") and callable(getattr(attr, "main")):
-                        needs_page = False
-                        try:
-                            sig = inspect.signature(attr.__init__)
-                            needs_page = "page" in sig.parameters and len(sig.parameters) >= 2
-                        except (ValueError, TypeError):
-                            needs_page = False
-                        instance = attr(page) if needs_page else attr()
-                        instance.main(page)  # type: ignore
-                        return True
-            return False
-
-        if clave == "1":
-            ova = load_module_by_filename("1. OVA_bioestadistica_flet.py", "ova1")
-            if not run_module_main(ova):
-                # Fallback explícito
-                app = ova.OVABioestadistica()
-                app.main(page)
-            return
-        if clave == "2":
-            ova = load_module_by_filename("2. OVA_calidad_datos_flet.py", "ova2")
-            if not run_module_main(ova):
-                app = ova.OVAApp()
-                app.main(page)
-            return
-        if clave == "3":
-            ova = load_module_by_filename("3. OVA_tablas_frecuencias_flet.py", "ova3")
-            if not run_module_main(ova):
-                app = ova.OVAApp()
-                app.main(page)
+        ova = obtener_ova(clave)
+        if ova is None:
+            # Si no está en el manifiesto
+            page.add(ft.Text("OVA no disponible", color=ft.colors.RED))
+            page.update()
             return
-        if clave == "4":
-            ova = load_module_by_filename("4. OVA_medidas_tendencia_central_flet.py", "ova4")
-            if not run_module_main(ova):
-                app = ova.OVAApp()
-                app.main(page)
-            return
-        if clave == "6":
-            ova = load_module_by_filename("6. OVA_asimetria_curtosis_flet.py", "ova6")
-            if not run_module_main(ova):
-                app = ova.OVAAsimetriaCurtosis()
-                app.main(page)
-            return
-        if clave == "12":
-            ova = load_module_by_filename("12. OVA_curvas_epidemicas_flet.py", "ova12")
-            # Esta OVA construye UI en su __init__(page)
-            if not run_module_main(ova):
-                ova.OVAEpidemicCurves(page)
-            return
-        if clave == "18":
-            ova = load_module_by_filename("18. OVA_dashboard_flet.py", "ova18")
-            if not run_module_main(ova):
-                ova.main(page)
-            return
-        # Si no está mapeada
-        page.add(ft.Text("OVA no disponible", color=ft.colors.RED))
-        page.update()
+        with traza.contexto_ova(clave):
+            # El registro ejecuta el archivo solo la primera vez o si cambió en disco
+            with traza.tramo("importacion"):
+                modulo = registro.obtener(ruta_ova(ova), nombre_modulo(ova))
+            with traza.primer_update(page):
+                lanzar_ova(modulo, ova, page)
     except Exception as err:
         # Registrar traza en consola y mostrar mensaje en UI
         traceback.print_exc()
@@ -195,11 +154,72 @@ def abrir_ova(page: ft.Page, clave: str) -> None:
         page.update()
 
 
+def mostrar_debug_perf(page: ft.Page) -> None:
+    """Ruta oculta con el resumen p50/p95 de los tramos de tiempo por OVA"""
+    page.clean()
+    page.title = "Rendimiento - Estadística Descriptiva"
+    page.bgcolor = "#f8f9fa"
+
+    filas = [
+        ft.DataRow(cells=[
+            ft.DataCell(ft.Text(fila["origen"])),
+            ft.DataCell(ft.Text(fila["fase"])),
+            ft.DataCell(ft.Text(str(fila["n"]))),
+            ft.DataCell(ft.Text(f"{fila['p50']:.1f}")),
+            ft.DataCell(ft.Text(f"{fila['p95']:.1f}")),
+        ])
+        for fila in traza.resumen()
+    ]
+
+    def limpiar(e):
+        traza.limpiar()
+        mostrar_debug_perf(page)
+
+    page.add(
+        ft.Column(
+            [
+                ft.Text("Tiempos de navegación (ms)", size=24, weight=ft.FontWeight.BOLD, color=ft.colors.BLUE),
+                ft.Text(f"Traza JSONL: {traza.archivo or 'desactivada (OVA_TRAZA_PERF)'}", size=12),
+                ft.DataTable(
+                    columns=[
+                        ft.DataColumn(ft.Text("OVA / ruta")),
+                        ft.DataColumn(ft.Text("Fase")),
+                        ft.DataColumn(ft.Text("n"), numeric=True),
+                        ft.DataColumn(ft.Text("p50"), numeric=True),
+                        ft.DataColumn(ft.Text("p95"), numeric=True),
+                    ],
+                    rows=filas,
+                ),
+                ft.Row(
+                    [
+                        ft.ElevatedButton("Actualizar", on_click=lambda e: mostrar_debug_perf(page)),
+                        ft.ElevatedButton("Limpiar", on_click=limpiar),
+                        ft.ElevatedButton("◀ Volver", on_click=lambda e: page.go("/ovas")),
+                    ],
+                    alignment=ft.MainAxisAlignment.CENTER,
+                ),
+            ],
+            horizontal_alignment=ft.CrossAxisAlignment.CENTER,
+            scroll=ft.ScrollMode.AUTO,
+            expand=True,
+        )
+    )
+    page.update()
+
+
 def route_change(page: ft.Page):
+    clave = page.route.split("/ova/")[-1] if page.route.startswith("/ova/") else None
+    with traza.tramo("ruta", ova=clave, ruta=page.route):
+        _despachar_ruta(page)
+
+
+def _despachar_ruta(page: ft.Page):
     if page.route == "/estadistica":
         mostrar_estadistica_descriptiva(page)
     elif page.route == "/ovas":
         mostrar_menu_ovas(page)
+    elif page.route == "/debug/perf":
+        mostrar_debug_perf(page)
     elif page.route.startswith("/ova/"):
         clave = page.route.split("/ova/")[-1]
         abrir_ova(page, clave)
@@ -211,4 +231,6 @@ def route_change(page: ft.Page):
 
 
 if __name__ == "__main__":
+    # Necesario para los pools de procesos (simulaciones) en ejecutables empaquetados
+    multiprocessing.freeze_support()
     ft.app(target=app_main)
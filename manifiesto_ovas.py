@@ -0,0 +1,206 @@
+"""Manifiesto declarativo de las OVAs disponibles.
+
+Cada entrada indica el archivo de la OVA, su clase de entrada, la convención
+de construcción y las dependencias pesadas que importa. El lanzador de
+`main.py` y el menú de OVAs se construyen a partir de esta lista, de modo que
+agregar una OVA solo requiere una entrada nueva aquí.
+
+Convenciones de construcción:
+    "instancia": la clase se crea sin argumentos y luego se llama `app.main(page)`
+    "page":      la clase recibe `page` en `__init__` y construye la UI allí
+    "funcion":   se llama directamente a la función `main(page)` del módulo
+"""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from rendimiento import traza
+
+BASE_DIR = Path(__file__).resolve().parent
+
+OVAS: List[Dict[str, Any]] = [
+    {
+        "clave": "1",
+        "titulo": "Bioestadística esencial para salud",
+        "archivo": "1. OVA_bioestadistica_flet.py",
+        "clase": "OVABioestadistica",
+        "constructor": "instancia",
+        "dependencias": [],
+    },
+    {
+        "clave": "2",
+        "titulo": "Calidad y limpieza de datos clínicos",
+        "archivo": "2. OVA_calidad_datos_flet.py",
+        "clase": "OVAApp",
+        "constructor": "instancia",
+        "dependencias": [],
+    },
+    {
+        "clave": "3",
+        "titulo": "Tablas de frecuencias y resúmenes categóricos",
+        "archivo": "3. OVA_tablas_frecuencias_flet.py",
+        "clase": "OVAApp",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "pandas", "scipy.stats"],
+    },
+    {
+        "clave": "4",
+        "titulo": "Medidas de tendencia central y posición",
+        "archivo": "4. OVA_medidas_tendencia_central_flet.py",
+        "clase": "OVAApp",
+        "constructor": "page",
+        "dependencias": ["numpy", "matplotlib.figure"],
+    },
+    {
+        "clave": "5",
+        "titulo": "Dispersión y variabilidad clínica",
+        "archivo": "5. OVA_dispersion_variabilidad.py",
+        "clase": "OVAApp",
+        "constructor": "page",
+        "dependencias": ["numpy", "matplotlib.pyplot"],
+    },
+    {
+        "clave": "6",
+        "titulo": "Asimetría, curtosis y normalidad práctica",
+        "archivo": "6. OVA_asimetria_curtosis_flet.py",
+        "clase": "OVAAsimetriaCurtosis",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "matplotlib.figure", "scipy.stats", "pandas"],
+    },
+    {
+        "clave": "7",
+        "titulo": "Visualización para salud I: gráficos categóricos",
+        "archivo": "7. OVA Estadistica en Salud.py",
+        "clase": None,
+        "constructor": "funcion",
+        "dependencias": ["pandas"],
+    },
+    {
+        "clave": "8",
+        "titulo": "Visualización para salud II: gráficos numéricos",
+        "archivo": "8. OVA_visualizacion_numerica_salud.py",
+        "clase": "OVAVisualizacionSalud",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "matplotlib.pyplot", "pandas"],
+    },
+    {
+        "clave": "9",
+        "titulo": "Comparaciones descriptivas entre grupos",
+        "archivo": "9. OVA_comparaciones_descriptivas.py",
+        "clase": "OVAApp",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "matplotlib.pyplot", "pandas"],
+    },
+    {
+        "clave": "11",
+        "titulo": "Indicadores de frecuencia en salud",
+        "archivo": "11. OVA_Indicadores de frecuencia en salud.py",
+        "clase": "OVAIndicadoresSalud",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "matplotlib.pyplot", "matplotlib.figure"],
+    },
+    {
+        "clave": "12",
+        "titulo": "Curvas epidémicas y series de tiempo",
+        "archivo": "12. OVA_curvas_epidemicas_flet.py",
+        "clase": "OVAEpidemicCurves",
+        "constructor": "page",
+        "dependencias": ["numpy", "matplotlib.figure", "pandas", "scipy.stats", "PIL.Image"],
+    },
+    {
+        "clave": "13",
+        "titulo": "Correlación y regresión lineal en salud",
+        "archivo": "13. OVA_correlacion_regresion_salud.py",
+        "clase": "OVAApp",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "scipy.stats", "pandas", "plotly.graph_objects", "plotly.express", "matplotlib.figure"],
+    },
+    {
+        "clave": "14",
+        "titulo": "Diseño y sesgos en estudios descriptivos",
+        "archivo": "14. OVA_diseno_sesgos_estudios_descriptivos.py",
+        "clase": "OVA14App",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "matplotlib.figure", "pandas", "reportlab.platypus"],
+    },
+    {
+        "clave": "16",
+        "titulo": "Flujo de trabajo reproducible",
+        "archivo": "16. OVA_flujo_trabajo_reproducible.py",
+        "clase": "OVAApp",
+        "constructor": "instancia",
+        "dependencias": ["matplotlib.figure"],
+    },
+    {
+        "clave": "17",
+        "titulo": "Resúmenes ejecutivos y escritura científica",
+        "archivo": "17. OVA_resumenes_ejecutivos.py",
+        "clase": "OVA17App",
+        "constructor": "instancia",
+        "dependencias": [],
+    },
+    {
+        "clave": "18",
+        "titulo": "Dashboard descriptivo básico",
+        "archivo": "18. OVA_dashboard_flet.py",
+        "clase": None,
+        # main(page) configura la página antes de crear OVADashboard
+        "constructor": "funcion",
+        "dependencias": ["numpy", "matplotlib.figure"],
+    },
+    {
+        "clave": "19",
+        "titulo": "Visualización de inequidades en salud",
+        "archivo": "19. OVA_inequidades_salud.py",
+        "clase": "OVAInequidadesSalud",
+        "constructor": "instancia",
+        "dependencias": ["numpy", "matplotlib.figure", "pandas"],
+    },
+    {
+        "clave": "20",
+        "titulo": "Mini-metodología de reporte gráfico",
+        "archivo": "20. OVA_metodologia_reporte_grafico.py",
+        "clase": "OVAApp",
+        "constructor": "instancia",
+        "dependencias": ["pandas", "plotly.graph_objects", "plotly.express"],
+    },
+]
+
+# Orden en que se precargan las OVAs más usadas mientras el usuario está en las
+# pantallas de inicio (ver precarga_ovas.py)
+ORDEN_PRECARGA: List[str] = ["4", "6", "12", "18", "13", "3", "1", "2", "14"]
+
+_POR_CLAVE: Dict[str, Dict[str, Any]] = {ova["clave"]: ova for ova in OVAS}
+
+
+def obtener_ova(clave: str) -> Optional[Dict[str, Any]]:
+    """Devuelve la entrada del manifiesto para `clave`, o None si no existe"""
+    return _POR_CLAVE.get(clave)
+
+
+def ruta_ova(ova: Dict[str, Any]) -> Path:
+    """Ruta absoluta del archivo de la OVA"""
+    return BASE_DIR / ova["archivo"]
+
+
+def nombre_modulo(ova: Dict[str, Any]) -> str:
+    """Nombre con el que se registra el módulo de la OVA"""
+    return f"ova{ova['clave']}"
+
+
+def lanzar_ova(modulo, ova: Dict[str, Any], page) -> None:
+    """Ejecuta el punto de entrada de la OVA según su convención de construcción"""
+    constructor = ova["constructor"]
+    if constructor == "instancia":
+        with traza.tramo("construccion"):
+            app = getattr(modulo, ova["clase"])()
+        with traza.tramo("ui"):
+            app.main(page)
+    elif constructor == "page":
+        # Estas clases construyen la UI en __init__, así que ambas fases coinciden
+        with traza.tramo("ui"):
+            getattr(modulo, ova["clase"])(page)
+    elif constructor == "funcion":
+        with traza.tramo("ui"):
+            modulo.main(page)
+    else:
+        raise ValueError(f"Convención de construcción desconocida: {constructor}")
@@ -0,0 +1,131 @@
+"""Número reproductivo efectivo Rt con el método de Cori et al. (ecuación de renovación).
+
+Con la incidencia diaria I_t y el intervalo serial w_s, la infecciosidad
+total es Λ_t = Σ_s I_{t-s} w_s (una convolución). Con una previa Gamma(a, b)
+para Rt y una ventana deslizante de τ días que termina en t, la posterior es
+
+    Gamma(forma = a + Σ I_k,  escala = 1 / (1/b + Σ Λ_k)),   k ∈ (t-τ, t]
+
+Las sumas de la ventana salen de diferencias de sumas acumuladas, así que
+una serie de varios años se estima en milisegundos. Al agregar un día nuevo
+solo se calcula su Λ (un producto escalar con el intervalo serial) y su
+ventana; las medias e intervalos posteriores ya calculados quedan en caché.
+"""
+from typing import Dict, Optional
+
+import numpy as np
+from scipy import stats
+
+
+def intervalo_serial(media: float, desviacion: float, max_dias: Optional[int] = None) -> np.ndarray:
+    """Intervalo serial gamma discretizado: w[s] = P(s-1 < SI ≤ s), con w[0] = 0"""
+    if media <= 0 or desviacion <= 0:
+        raise ValueError("La media y la desviación del intervalo serial deben ser positivas")
+    forma = (media / desviacion) ** 2
+    escala = desviacion ** 2 / media
+    if max_dias is None:
+        max_dias = int(np.ceil(stats.gamma.ppf(0.999, forma, scale=escala))) + 1
+    w = np.diff(stats.gamma.cdf(np.arange(max_dias + 1), forma, scale=escala))
+    w = np.concatenate(([0.0], w[1:]))
+    return w / w.sum()
+
+
+class EstimadorRt:
+    """Rt por ventanas deslizantes sobre una serie diaria que puede crecer día a día"""
+
+    def __init__(self, intervalo: np.ndarray, ventana: int = 7, forma_previa: float = 1.0,
+                 escala_previa: float = 5.0, nivel: float = 0.95, capacidad: int = 1024):
+        self.w = np.asarray(intervalo, dtype=float)
+        self.ventana = int(ventana)
+        self.forma_previa = forma_previa
+        self.escala_previa = escala_previa
+        self.nivel = nivel
+        self.n = 0
+        self._casos = np.zeros(capacidad)
+        self._lambda = np.zeros(capacidad)
+        # Sumas acumuladas con un cero inicial: suma de (i, j] = c[j] - c[i]
+        self._acum_casos = np.zeros(capacidad + 1)
+        self._acum_lambda = np.zeros(capacidad + 1)
+        self._calculados = 0
+        self._resultado = {nombre: np.zeros(capacidad) for nombre in ("media", "inferior", "superior", "cv")}
+
+    def _reservar(self, n: int) -> None:
+        capacidad = self._casos.size
+        if n <= capacidad:
+            return
+        while capacidad < n:
+            capacidad *= 2
+        for nombre in ("_casos", "_lambda"):
+            viejo = getattr(self, nombre)
+            nuevo = np.zeros(capacidad)
+            nuevo[:viejo.size] = viejo
+            setattr(self, nombre, nuevo)
+        for nombre in ("_acum_casos", "_acum_lambda"):
+            viejo = getattr(self, nombre)
+            nuevo = np.zeros(capacidad + 1)
+            nuevo[:viejo.size] = viejo
+            setattr(self, nombre, nuevo)
+        for nombre, viejo in self._resultado.items():
+            nuevo = np.zeros(capacidad)
+            nuevo[:viejo.size] = viejo
+            self._resultado[nombre] = nuevo
+
+    def agregar(self, casos) -> None:
+        """Agrega uno o varios días al final de la serie"""
+        nuevos = np.atleast_1d(np.asarray(casos, dtype=float))
+        if nuevos.size == 0:
+            return
+        if (nuevos < 0).any():
+            raise ValueError("Los casos diarios no pueden ser negativos")
+        inicio, fin = self.n, self.n + nuevos.size
+        self._reservar(fin)
+        self._casos[inicio:fin] = nuevos
+
+        # Λ de los días nuevos: convolución de la parte de la serie que los afecta
+        s = self.w.size
+        desde = max(0, inicio - s + 1)
+        tramo = np.convolve(self._casos[desde:fin], self.w)[inicio - desde:fin - desde]
+        self._lambda[inicio:fin] = tramo
+        self._acum_casos[inicio + 1:fin + 1] = self._acum_casos[inicio] + np.cumsum(nuevos)
+        self._acum_lambda[inicio + 1:fin + 1] = self._acum_lambda[inicio] + np.cumsum(tramo)
+        self.n = fin
+
+    def estimaciones(self) -> Dict[str, np.ndarray]:
+        """Media, límites del intervalo de credibilidad y CV posterior de cada día
+
+        Los días sin una ventana completa o sin infecciosidad previa quedan en NaN.
+        Solo se calculan los días agregados desde la última llamada.
+        """
+        if self._calculados < self.n:
+            t = np.arange(self._calculados, self.n)
+            inicio_ventana = np.maximum(t + 1 - self.ventana, 0)
+            suma_casos = self._acum_casos[t + 1] - self._acum_casos[inicio_ventana]
+            suma_lambda = self._acum_lambda[t + 1] - self._acum_lambda[inicio_ventana]
+            forma = self.forma_previa + suma_casos
+            escala = 1.0 / (1.0 / self.escala_previa + suma_lambda)
+            validos = (t + 1 >= self.ventana + 1) & (suma_lambda > 0)
+            alfa = (1 - self.nivel) / 2
+            with np.errstate(invalid="ignore"):
+                self._resultado["media"][t] = np.where(validos, forma * escala, np.nan)
+                self._resultado["inferior"][t] = np.where(validos, stats.gamma.ppf(alfa, forma, scale=escala), np.nan)
+                self._resultado["superior"][t] = np.where(validos, stats.gamma.ppf(1 - alfa, forma, scale=escala), np.nan)
+                self._resultado["cv"][t] = np.where(validos, 1 / np.sqrt(forma), np.nan)
+            self._calculados = self.n
+        return {nombre: valores[:self.n] for nombre, valores in self._resultado.items()}
+
+    def casos(self) -> np.ndarray:
+        return self._casos[:self.n]
+
+    def primera_estimacion_confiable(self, cv_maximo: float = 0.3) -> Optional[int]:
+        """Primer día cuya posterior tiene CV menor a `cv_maximo` (None si no hay)"""
+        cv = self.estimaciones()["cv"]
+        dias = np.flatnonzero(cv < cv_maximo)
+        return int(dias[0]) if dias.size else None
+
+
+def estimar_rt(casos, media_intervalo: float, desviacion_intervalo: float,
+               ventana: int = 7, **opciones) -> EstimadorRt:
+    """Crea un estimador con el intervalo serial dado y le carga toda la serie"""
+    estimador = EstimadorRt(intervalo_serial(media_intervalo, desviacion_intervalo), ventana, **opciones)
+    estimador.agregar(casos)
+    return estimador
@@ -0,0 +1,88 @@
+"""Precarga en segundo plano de las dependencias pesadas y las OVAs más usadas.
+
+Mientras el usuario está en las pantallas de bienvenida y de selección de
+avatar, un hilo importa matplotlib, scipy.stats, pandas, plotly, etc. y carga
+los módulos de OVA en el orden de `ORDEN_PRECARGA`. Así el primer clic en una
+OVA encuentra todo en memoria.
+"""
+import importlib
+import threading
+import traceback
+from typing import Callable, Dict, Optional
+
+from manifiesto_ovas import ORDEN_PRECARGA, obtener_ova, ruta_ova, nombre_modulo
+from registro_ovas import registro
+
+FRIA = "fria"
+CARGANDO = "cargando"
+LISTA = "lista"
+ERROR = "error"
+
+
+class PrecargadorOVAs:
+    """Hilo de precarga con estado consultable por clave de OVA"""
+
+    def __init__(self):
+        self._estado: Dict[str, str] = {}
+        self._hilo: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        # Callback opcional (clave, estado) que usa el menú para refrescarse
+        self.oyente: Optional[Callable[[str, str], None]] = None
+
+    def iniciar(self) -> None:
+        """Lanza el hilo de precarga una sola vez por proceso"""
+        with self._lock:
+            if self._hilo is not None:
+                return
+            self._hilo = threading.Thread(target=self._ejecutar, name="precarga-ovas", daemon=True)
+            self._hilo.start()
+
+    def estado(self, clave: str) -> str:
+        """Estado de la OVA: fria, cargando, lista o error"""
+        ova = obtener_ova(clave)
+        if ova is not None and registro.esta_cargado(ruta_ova(ova)):
+            return LISTA
+        estado = self._estado.get(clave, FRIA)
+        # Si el archivo cambió en disco después de precargarlo vuelve a estar frío
+        return FRIA if estado == LISTA else estado
+
+    def esta_lista(self, clave: str) -> bool:
+        return self.estado(clave) == LISTA
+
+    def _notificar(self, clave: str, estado: str) -> None:
+        self._estado[clave] = estado
+        oyente = self.oyente
+        if oyente is not None:
+            try:
+                oyente(clave, estado)
+            except Exception:
+                traceback.print_exc()
+
+    def _importar(self, dependencia: str) -> None:
+        if dependencia.startswith("matplotlib"):
+            # Las OVAs solo renderizan a PNG; evitar que pyplot elija un backend
+            # de ventana desde un hilo secundario.
+            import matplotlib
+            matplotlib.use("Agg")
+        importlib.import_module(dependencia)
+
+    def _ejecutar(self) -> None:
+        for clave in ORDEN_PRECARGA:
+            ova = obtener_ova(clave)
+            if ova is None:
+                continue
+            self._notificar(clave, CARGANDO)
+            try:
+                for dependencia in ova["dependencias"]:
+                    self._importar(dependencia)
+                registro.obtener(ruta_ova(ova), nombre_modulo(ova))
+            except Exception:
+                # La OVA se cargará (y mostrará su error) al abrirla
+                traceback.print_exc()
+                self._notificar(clave, ERROR)
+                continue
+            self._notificar(clave, LISTA)
+
+
+# Instancia compartida por la aplicación
+precargador = PrecargadorOVAs()
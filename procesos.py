@@ -0,0 +1,52 @@
+"""Pool de procesos compartido para los cálculos pesados de las OVAs.
+
+Las simulaciones, los rangos de tablas grandes y el bootstrap reparten su
+trabajo en este único pool en lugar de crear uno cada uno. Se usa el método
+spawn para que los procesos no hereden los hilos de Flet ni del pool de
+gráficos. Las funciones que se envían deben vivir en módulos importables (no
+en los archivos de OVA, que se cargan desde ruta y no pueden serializarse).
+
+Si un proceso del pool muere (por ejemplo, por falta de memoria), el pool
+queda roto y rechaza toda tarea nueva; `pool_procesos()` lo detecta y crea uno
+nuevo, así que una caída no obliga a reiniciar la aplicación.
+"""
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_executor: Optional[ProcessPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def _descartar(executor: ProcessPoolExecutor) -> None:
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def pool_procesos() -> ProcessPoolExecutor:
+    """Devuelve el pool compartido, creándolo en el primer uso o si el anterior quedó roto"""
+    global _executor
+    with _lock:
+        if _executor is not None and getattr(_executor, "_broken", False):
+            _descartar(_executor)
+            _executor = None
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=max(1, (os.cpu_count() or 2) - 1),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def reiniciar_pool(roto: Optional[ProcessPoolExecutor] = None) -> None:
+    """Descarta el pool compartido; el próximo `pool_procesos()` crea uno nuevo
+
+    Con `roto` solo se descarta si sigue siendo el pool actual (otro hilo
+    puede haberlo reemplazado ya).
+    """
+    global _executor
+    with _lock:
+        if _executor is not None and (roto is None or _executor is roto):
+            _descartar(_executor)
+            _executor = None
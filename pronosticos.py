@@ -0,0 +1,265 @@
+"""Pronósticos de series diarias de casos con intervalos y validación por origen móvil.
+
+Los tres modelos trabajan sobre z = log(1 + casos), donde el crecimiento
+epidémico es aditivo y los intervalos no bajan de cero al volver a la escala
+original:
+
+- "ets": suavizado exponencial con tendencia amortiguada (ETS(A,Ad,N)),
+  con α, β y φ elegidos por búsqueda en grilla (todas las combinaciones se
+  filtran a la vez, una columna por combinación).
+- "estacional": ingenuo estacional (se repite la última semana).
+- "loglineal": recta por mínimos cuadrados sobre las últimas semanas
+  (crecimiento o decrecimiento exponencial).
+
+Cada modelo calcula de una sola vez los pronósticos desde muchos orígenes
+(una matriz orígenes × horizonte): para la recta, las sumas de cada ventana
+salen de sumas acumuladas; para el ETS, los estados de todos los orígenes
+salen de un único filtrado. Así la validación por origen móvil de una serie
+diaria de cinco años tarda una fracción de segundo.
+
+Los ajustes corren en el pool de procesos compartido y quedan en caché por
+(hash de la serie, modelo, horizonte); el nivel de confianza se aplica
+después, así que moverlo no vuelve a ajustar nada. Si un proceso del pool
+muere durante un ajuste, el pool se rehace y la tarea se reintenta una vez.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from scipy import stats
+
+from procesos import pool_procesos, reiniciar_pool
+
+MODELOS = ("ets", "estacional", "loglineal")
+# Período de la estacionalidad semanal de una serie diaria
+PERIODO = 7
+# Días de la ventana de la regresión log-lineal
+VENTANA_LOGLINEAL = 28
+# Orígenes de la validación: uno por semana, hasta un año hacia atrás
+PASO_ORIGENES = 7
+MAX_ORIGENES = 52
+# Días mínimos de entrenamiento antes del primer origen
+MINIMO_ENTRENAMIENTO = 2 * VENTANA_LOGLINEAL
+
+# Grilla de parámetros del ETS (β ≤ α)
+_ALFAS = np.array([0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9])
+_BETAS = np.array([0.0, 0.01, 0.05, 0.1, 0.2])
+_FIS = np.array([0.8, 0.9, 0.95, 0.98, 1.0])
+
+# Pronóstico desde varios orígenes: (centro, error estándar, grados de libertad), en escala log
+Pronostico = Tuple[np.ndarray, np.ndarray, float]
+
+
+def _ets_estados(z: np.ndarray, alfa, beta, fi) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Filtra la serie con uno o varios juegos de parámetros (vectores del mismo largo)
+
+    Devuelve el nivel y la tendencia al cierre de cada día (n × combinaciones)
+    y los errores de pronóstico a un paso.
+    """
+    n = z.size
+    m = min(PERIODO, n - 1)
+    nivel = np.full(np.shape(alfa), z[0])
+    tendencia = np.full(np.shape(alfa), (z[m] - z[0]) / m if m > 0 else 0.0)
+    niveles = np.empty((n,) + nivel.shape)
+    tendencias = np.empty_like(niveles)
+    errores = np.empty_like(niveles)
+    niveles[0], tendencias[0], errores[0] = nivel, tendencia, 0.0
+    for t in range(1, n):
+        error = z[t] - (nivel + fi * tendencia)
+        nivel = nivel + fi * tendencia + alfa * error
+        tendencia = fi * tendencia + beta * error
+        niveles[t], tendencias[t], errores[t] = nivel, tendencia, error
+    return niveles, tendencias, errores
+
+
+def _ajustar_ets(z: np.ndarray) -> Tuple[float, float, float, float]:
+    """(α, β, φ, σ) con menor suma de errores cuadráticos a un paso"""
+    alfa, beta, fi = (g.ravel() for g in np.meshgrid(_ALFAS, _BETAS, _FIS, indexing="ij"))
+    validos = beta <= alfa
+    alfa, beta, fi = alfa[validos], beta[validos], fi[validos]
+    _, _, errores = _ets_estados(z, alfa, beta, fi)
+    sse = (errores[1:] ** 2).sum(axis=0)
+    mejor = int(np.argmin(sse))
+    sigma = float(np.sqrt(sse[mejor] / max(1, z.size - 1)))
+    return float(alfa[mejor]), float(beta[mejor]), float(fi[mejor]), sigma
+
+
+def _ets(z: np.ndarray, origenes: np.ndarray, horizonte: int, entrenamiento: int) -> Pronostico:
+    """ETS(A,Ad,N): parámetros ajustados con z[:entrenamiento], estados de cada origen en un solo filtrado"""
+    alfa, beta, fi, sigma = _ajustar_ets(z[:entrenamiento])
+    niveles, tendencias, _ = _ets_estados(z[:origenes.max()], alfa, beta, fi)
+    pasos = np.arange(1, horizonte + 1)
+    # φ_h = φ + φ² + ... + φ^h
+    fi_acumulado = np.cumsum(fi ** pasos)
+    centro = niveles[origenes - 1, None] + tendencias[origenes - 1, None] * fi_acumulado
+    # Varianza a h pasos: σ² (1 + Σ_{j<h} (α + β φ_j)²)
+    coeficientes = np.concatenate(([0.0], np.cumsum((alfa + beta * fi_acumulado[:-1]) ** 2)))
+    error = sigma * np.sqrt(1 + coeficientes)
+    return centro, np.broadcast_to(error, centro.shape), np.inf
+
+
+def _estacional(z: np.ndarray, origenes: np.ndarray, horizonte: int) -> Pronostico:
+    """Ingenuo estacional; σ de cada origen con los residuos estacionales previos a él"""
+    pasos = np.arange(horizonte)
+    centro = z[origenes[:, None] - PERIODO + pasos % PERIODO]
+    residuos = np.zeros(z.size)
+    residuos[PERIODO:] = (z[PERIODO:] - z[:-PERIODO]) ** 2
+    acumulado = np.concatenate(([0.0], np.cumsum(residuos)))
+    sigma = np.sqrt(acumulado[origenes] / np.maximum(1, origenes - PERIODO))
+    error = sigma[:, None] * np.sqrt(pasos // PERIODO + 1)
+    return centro, error, np.inf
+
+
+def _loglineal(z: np.ndarray, origenes: np.ndarray, horizonte: int) -> Pronostico:
+    """Recta de z sobre el día en la ventana previa a cada origen, con error de predicción"""
+    w = VENTANA_LOGLINEAL
+    x = np.arange(z.size, dtype=float)
+    suma_z = np.concatenate(([0.0], np.cumsum(z)))
+    suma_xz = np.concatenate(([0.0], np.cumsum(x * z)))
+    suma_zz = np.concatenate(([0.0], np.cumsum(z * z)))
+    desde = origenes - w
+    sz = suma_z[origenes] - suma_z[desde]
+    sxz = suma_xz[origenes] - suma_xz[desde]
+    szz = suma_zz[origenes] - suma_zz[desde]
+    media_x = desde + (w - 1) / 2
+    sxx_centrado = w * (w * w - 1) / 12
+    pendiente = (sxz - media_x * sz) / sxx_centrado
+    intercepto = sz / w - pendiente * media_x
+    sse = np.maximum(szz - intercepto * sz - pendiente * sxz, 0.0)
+    s = np.sqrt(sse / (w - 2))
+
+    futuro = origenes[:, None] + np.arange(horizonte)
+    centro = intercepto[:, None] + pendiente[:, None] * futuro
+    error = s[:, None] * np.sqrt(1 + 1 / w + (futuro - media_x[:, None]) ** 2 / sxx_centrado)
+    return centro, error, float(w - 2)
+
+
+def _pronosticos(modelo: str, z: np.ndarray, origenes: np.ndarray, horizonte: int,
+                 entrenamiento: int) -> Pronostico:
+    if modelo == "ets":
+        return _ets(z, origenes, horizonte, entrenamiento)
+    if modelo == "estacional":
+        return _estacional(z, origenes, horizonte)
+    if modelo == "loglineal":
+        return _loglineal(z, origenes, horizonte)
+    raise ValueError(f"Modelo desconocido: {modelo}")
+
+
+def _transformar(casos) -> np.ndarray:
+    casos = np.asarray(casos, dtype=float)
+    if casos.ndim != 1 or casos.size < MINIMO_ENTRENAMIENTO:
+        raise ValueError(f"La serie necesita al menos {MINIMO_ENTRENAMIENTO} días")
+    return np.log1p(np.clip(np.nan_to_num(casos), 0, None))
+
+
+def ajustar(modelo: str, casos, horizonte: int) -> Dict[str, Any]:
+    """Tarea del pool: pronóstico de `horizonte` días desde el final de la serie"""
+    z = _transformar(casos)
+    centro, error, gl = _pronosticos(modelo, z, np.array([z.size]), int(horizonte), z.size)
+    return {"modelo": modelo, "centro": centro[0], "error": np.array(error[0]), "gl": gl}
+
+
+def validar(casos, horizonte: int) -> Dict[str, Any]:
+    """Tarea del pool: pronósticos de todos los modelos desde orígenes semanales
+
+    Los orígenes van hacia atrás desde el último con `horizonte` días
+    observados por delante. Devuelve los observados (orígenes × horizonte)
+    y, por modelo, la matriz de pronósticos en escala log.
+    """
+    z = _transformar(casos)
+    horizonte = int(horizonte)
+    ultimo = z.size - horizonte
+    origenes = np.arange(ultimo, MINIMO_ENTRENAMIENTO - 1, -PASO_ORIGENES)[:MAX_ORIGENES][::-1]
+    if origenes.size == 0:
+        raise ValueError("La serie es demasiado corta para validar con ese horizonte")
+    observados = np.expm1(z[origenes[:, None] + np.arange(horizonte)])
+    return {
+        "origenes": origenes,
+        "observados": observados,
+        "modelos": {
+            modelo: dict(zip(("centro", "error", "gl"), _pronosticos(modelo, z, origenes, horizonte, origenes[0])))
+            for modelo in MODELOS
+        },
+    }
+
+
+def intervalos(pronostico: Dict[str, Any], nivel: float = 0.95) -> Dict[str, np.ndarray]:
+    """Mediana y límites del intervalo de predicción en casos (no negativos)"""
+    q = stats.t.ppf(1 - (1 - nivel) / 2, pronostico["gl"])
+    centro, error = pronostico["centro"], pronostico["error"]
+    return {
+        "mediana": np.expm1(centro).clip(0),
+        "inferior": np.expm1(centro - q * error).clip(0),
+        "superior": np.expm1(centro + q * error).clip(0),
+    }
+
+
+def metricas(validacion: Dict[str, Any], nivel: float = 0.95) -> Dict[str, Dict[str, float]]:
+    """MAE, RMSE, R² y cobertura del intervalo de cada modelo en la validación"""
+    observados = validacion["observados"]
+    dispersion = ((observados - observados.mean()) ** 2).sum()
+    resultado = {}
+    for modelo, pronostico in validacion["modelos"].items():
+        bandas = intervalos(pronostico, nivel)
+        error = bandas["mediana"] - observados
+        resultado[modelo] = {
+            "mae": float(np.abs(error).mean()),
+            "rmse": float(np.sqrt((error ** 2).mean())),
+            "r2": float(1 - (error ** 2).sum() / dispersion) if dispersion > 0 else float("nan"),
+            "cobertura": float(((observados >= bandas["inferior"]) & (observados <= bandas["superior"])).mean()),
+        }
+    return resultado
+
+
+def ranking(validacion: Dict[str, Any], nivel: float = 0.95) -> list:
+    """Modelos ordenados de menor a mayor error absoluto medio"""
+    resultado = metricas(validacion, nivel)
+    return sorted(resultado, key=lambda modelo: resultado[modelo]["mae"])
+
+
+class MotorPronosticos:
+    """Envía ajustes y validaciones al pool y los guarda en caché"""
+
+    def __init__(self, capacidad: int = 32):
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._capacidad = capacidad
+
+    @staticmethod
+    def huella(casos) -> str:
+        return hashlib.sha1(np.ascontiguousarray(casos, dtype=float).tobytes()).hexdigest()
+
+    def _calcular(self, clave: tuple, tarea, *argumentos) -> Dict[str, Any]:
+        with self._lock:
+            if clave in self._cache:
+                self._cache.move_to_end(clave)
+                return self._cache[clave]
+        pool = pool_procesos()
+        try:
+            resultado = pool.submit(tarea, *argumentos).result()
+        except BrokenProcessPool:
+            # Un proceso murió: se rehace el pool y se reintenta una vez
+            reiniciar_pool(pool)
+            resultado = pool_procesos().submit(tarea, *argumentos).result()
+        with self._lock:
+            self._cache[clave] = resultado
+            while len(self._cache) > self._capacidad:
+                self._cache.popitem(last=False)
+        return resultado
+
+    def pronosticar(self, casos, modelo: str, horizonte: int) -> Dict[str, Any]:
+        """Pronóstico desde el final de la serie (bloquea hasta que el pool responde)"""
+        casos = np.asarray(casos, dtype=float)
+        return self._calcular((self.huella(casos), modelo, int(horizonte)), ajustar, modelo, casos, horizonte)
+
+    def validar(self, casos, horizonte: int) -> Dict[str, Any]:
+        """Validación por origen móvil de todos los modelos"""
+        casos = np.asarray(casos, dtype=float)
+        return self._calcular((self.huella(casos), "validacion", int(horizonte)), validar, casos, horizonte)
+
+
+# Instancia compartida por la aplicación
+motor_pronosticos = MotorPronosticos()
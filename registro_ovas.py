@@ -0,0 +1,71 @@
+"""Registro de módulos OVA cargados en el proceso.
+
+Cada archivo de OVA se ejecuta una sola vez por proceso y se reutiliza en las
+visitas siguientes. La entrada se indexa por ruta y fecha de modificación, de
+modo que solo se recarga cuando el archivo cambia en disco.
+"""
+import threading
+from importlib.util import spec_from_file_location, module_from_spec
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Optional, Tuple, Union
+
+
+class RegistroModulos:
+    """Caché de módulos indexada por (ruta, mtime)"""
+
+    def __init__(self):
+        self._modulos: Dict[Path, Tuple[int, ModuleType]] = {}
+        self._locks: Dict[Path, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _lock_para(self, ruta: Path) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(ruta, threading.Lock())
+
+    def obtener(self, ruta: Union[str, Path], nombre_modulo: str) -> ModuleType:
+        """Devuelve el módulo de `ruta`, cargándolo solo si no está o si cambió en disco"""
+        ruta = Path(ruta).resolve()
+        mtime = ruta.stat().st_mtime_ns
+
+        entrada = self._modulos.get(ruta)
+        if entrada is not None and entrada[0] == mtime:
+            return entrada[1]
+
+        # Un lock por archivo: dos hilos que piden la misma OVA la ejecutan una
+        # sola vez, sin bloquear la carga de otras OVAs.
+        with self._lock_para(ruta):
+            entrada = self._modulos.get(ruta)
+            if entrada is not None and entrada[0] == mtime:
+                return entrada[1]
+
+            spec = spec_from_file_location(nombre_modulo, str(ruta))
+            if spec is None or spec.loader is None:
+                raise ImportError(f"No se pudo crear el spec para {ruta.name}")
+            modulo = module_from_spec(spec)
+            spec.loader.exec_module(modulo)
+            self._modulos[ruta] = (mtime, modulo)
+            return modulo
+
+    def esta_cargado(self, ruta: Union[str, Path]) -> bool:
+        """Indica si `ruta` está en caché y coincide con la versión en disco"""
+        ruta = Path(ruta).resolve()
+        entrada = self._modulos.get(ruta)
+        if entrada is None:
+            return False
+        try:
+            return entrada[0] == ruta.stat().st_mtime_ns
+        except OSError:
+            return False
+
+    def invalidar(self, ruta: Optional[Union[str, Path]] = None) -> None:
+        """Elimina la entrada de `ruta`, o todas si no se indica ninguna"""
+        with self._lock:
+            if ruta is None:
+                self._modulos.clear()
+            else:
+                self._modulos.pop(Path(ruta).resolve(), None)
+
+
+# Instancia compartida por el lanzador
+registro = RegistroModulos()
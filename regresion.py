@@ -0,0 +1,165 @@
+"""Motor de correlación y regresión lineal simple basado en estadísticos suficientes.
+
+El modelo guarda n, las medias de X e Y y las sumas de productos centrados
+Sxx, Syy y Sxy. Con eso alcanza para r, r², pendiente, intercepto, error
+estándar residual e intervalos de confianza y de predicción, sin volver a
+recorrer los datos. Los puntos pueden agregarse o quitarse en O(1)
+(actualización de Welford) y los arreglos grandes se resumen de forma
+vectorizada por bloques y se combinan con la fórmula de Chan et al.
+
+Se usan sumas centradas en lugar de Σx, Σx², Σxy crudas porque estas últimas
+pierden precisión por cancelación cuando hay millones de puntos o cuando la
+media es grande frente a la dispersión; ambas representaciones son
+equivalentes (Σx = n·x̄, Σx² = Sxx + n·x̄², etc.).
+"""
+import math
+from typing import Dict, Tuple, Union
+
+import numpy as np
+from scipy import stats
+
+# Puntos por bloque en el camino vectorizado (acota la memoria temporal)
+TAMANO_BLOQUE = 1_000_000
+
+
+class RegresionLineal:
+    """Regresión de Y sobre X mantenida con estadísticos suficientes"""
+
+    def __init__(self):
+        self.n = 0
+        self.media_x = 0.0
+        self.media_y = 0.0
+        self.sxx = 0.0
+        self.syy = 0.0
+        self.sxy = 0.0
+
+    @classmethod
+    def desde_arreglos(cls, x, y) -> "RegresionLineal":
+        modelo = cls()
+        modelo.agregar_muchos(x, y)
+        return modelo
+
+    def agregar(self, x: float, y: float) -> None:
+        """Agrega un punto en O(1)"""
+        self.n += 1
+        dx = x - self.media_x
+        dy = y - self.media_y
+        self.media_x += dx / self.n
+        self.media_y += dy / self.n
+        self.sxx += dx * (x - self.media_x)
+        self.syy += dy * (y - self.media_y)
+        self.sxy += dx * (y - self.media_y)
+
+    def quitar(self, x: float, y: float) -> None:
+        """Quita un punto agregado antes, en O(1) (inverso exacto de `agregar`)"""
+        if self.n == 0:
+            raise ValueError("El modelo no tiene puntos")
+        if self.n == 1:
+            self.__init__()
+            return
+        n1 = self.n - 1
+        media_x = (self.n * self.media_x - x) / n1
+        media_y = (self.n * self.media_y - y) / n1
+        self.sxx -= (x - media_x) * (x - self.media_x)
+        self.syy -= (y - media_y) * (y - self.media_y)
+        self.sxy -= (x - media_x) * (y - self.media_y)
+        self.n, self.media_x, self.media_y = n1, media_x, media_y
+
+    def agregar_muchos(self, x, y) -> None:
+        """Agrega arreglos de puntos de forma vectorizada, por bloques"""
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if x.size != y.size:
+            raise ValueError("X e Y deben tener la misma cantidad de valores")
+        for inicio in range(0, x.size, TAMANO_BLOQUE):
+            bx = x[inicio:inicio + TAMANO_BLOQUE]
+            by = y[inicio:inicio + TAMANO_BLOQUE]
+            parcial = RegresionLineal()
+            parcial.n = int(bx.size)
+            parcial.media_x = float(bx.mean())
+            parcial.media_y = float(by.mean())
+            dx = bx - parcial.media_x
+            dy = by - parcial.media_y
+            parcial.sxx = float(dx @ dx)
+            parcial.syy = float(dy @ dy)
+            parcial.sxy = float(dx @ dy)
+            self.merge(parcial)
+
+    def merge(self, otro: "RegresionLineal") -> "RegresionLineal":
+        """Combina con otro modelo parcial (fórmula de Chan et al.)"""
+        if otro.n == 0:
+            return self
+        if self.n == 0:
+            self.__dict__.update(otro.__dict__)
+            return self
+        n = self.n + otro.n
+        dx = otro.media_x - self.media_x
+        dy = otro.media_y - self.media_y
+        factor = self.n * otro.n / n
+        self.sxx += otro.sxx + dx * dx * factor
+        self.syy += otro.syy + dy * dy * factor
+        self.sxy += otro.sxy + dx * dy * factor
+        self.media_x += dx * otro.n / n
+        self.media_y += dy * otro.n / n
+        self.n = n
+        return self
+
+    @property
+    def r(self) -> float:
+        """Coeficiente de correlación de Pearson (0 si alguna variable es constante)"""
+        denominador = math.sqrt(self.sxx * self.syy)
+        return self.sxy / denominador if denominador > 0 else 0.0
+
+    @property
+    def r2(self) -> float:
+        return self.r ** 2
+
+    @property
+    def pendiente(self) -> float:
+        return self.sxy / self.sxx if self.sxx > 0 else 0.0
+
+    @property
+    def intercepto(self) -> float:
+        return self.media_y - self.pendiente * self.media_x
+
+    @property
+    def error_estandar(self) -> float:
+        """Error estándar residual, raíz de SSE / (n - 2)"""
+        if self.n < 3:
+            return 0.0
+        sse = max(self.syy - self.pendiente * self.sxy, 0.0)
+        return math.sqrt(sse / (self.n - 2))
+
+    def predecir(self, x: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        y = self.intercepto + self.pendiente * np.asarray(x, dtype=float)
+        return float(y) if y.ndim == 0 else y
+
+    def _intervalo(self, x, nivel: float, prediccion: bool) -> Tuple:
+        x = np.asarray(x, dtype=float)
+        y = self.intercepto + self.pendiente * x
+        if self.n < 3 or self.sxx <= 0:
+            return y, y, y
+        t = stats.t.ppf(0.5 + nivel / 2, self.n - 2)
+        varianza = 1 / self.n + (x - self.media_x) ** 2 / self.sxx
+        if prediccion:
+            varianza = varianza + 1
+        margen = t * self.error_estandar * np.sqrt(varianza)
+        return y, y - margen, y + margen
+
+    def intervalo_prediccion(self, x, nivel: float = 0.95) -> Tuple:
+        """(ŷ, inferior, superior) para una nueva observación en `x`"""
+        return self._intervalo(x, nivel, prediccion=True)
+
+    def intervalo_confianza(self, x, nivel: float = 0.95) -> Tuple:
+        """(ŷ, inferior, superior) para la media de Y en `x` (banda de la recta)"""
+        return self._intervalo(x, nivel, prediccion=False)
+
+    def resumen(self) -> Dict[str, float]:
+        return {
+            "n": self.n,
+            "r": self.r,
+            "r2": self.r2,
+            "slope": self.pendiente,
+            "intercept": self.intercepto,
+            "residual_se": self.error_estandar,
+        }
@@ -0,0 +1,132 @@
+"""Instrumentación de tiempos de navegación y apertura de OVAs.
+
+Cada fase medida (importación del módulo, construcción de la clase, armado de
+la UI, primer `page.update()`, renderizado de gráficos, cambio de ruta) genera
+un tramo que se guarda en un buffer circular y, si la variable de entorno
+OVA_TRAZA_PERF apunta a un archivo, también se agrega a ese archivo JSONL.
+La ruta oculta /debug/perf muestra el resumen p50/p95 por OVA.
+"""
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+
+def _percentil(ordenados: List[float], q: float) -> float:
+    """Percentil con interpolación lineal sobre una lista ya ordenada"""
+    if not ordenados:
+        return 0.0
+    posicion = (len(ordenados) - 1) * q
+    inferior = math.floor(posicion)
+    superior = math.ceil(posicion)
+    fraccion = posicion - inferior
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fraccion
+
+
+class Trazador:
+    """Registro de tramos de tiempo en memoria y, opcionalmente, en JSONL"""
+
+    def __init__(self, capacidad: int = 5000, archivo: Optional[str] = None):
+        self._tramos: deque = deque(maxlen=capacidad)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.archivo = archivo
+
+    def ova_actual(self) -> Optional[str]:
+        """Clave de la OVA que se está abriendo en este hilo, si la hay"""
+        return getattr(self._local, "ova", None)
+
+    @contextmanager
+    def contexto_ova(self, clave: Optional[str]):
+        """Etiqueta con `clave` los tramos registrados dentro del bloque"""
+        anterior = self.ova_actual()
+        self._local.ova = clave
+        try:
+            yield
+        finally:
+            self._local.ova = anterior
+
+    def registrar(self, fase: str, duracion_ms: float, ova: Optional[str] = None, **extra: Any) -> None:
+        tramo = {
+            "ts": time.time(),
+            "fase": fase,
+            "ova": ova if ova is not None else self.ova_actual(),
+            "duracion_ms": round(duracion_ms, 3),
+        }
+        tramo.update(extra)
+        with self._lock:
+            self._tramos.append(tramo)
+            if self.archivo:
+                try:
+                    with open(self.archivo, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(tramo, ensure_ascii=False) + "\n")
+                except OSError:
+                    # La traza en disco es opcional; no interrumpir la navegación
+                    self.archivo = None
+
+    @contextmanager
+    def tramo(self, fase: str, ova: Optional[str] = None, **extra: Any):
+        """Mide la duración del bloque y la registra como `fase`"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(fase, (time.perf_counter() - inicio) * 1000, ova=ova, **extra)
+
+    @contextmanager
+    def primer_update(self, page):
+        """Mide el tiempo hasta que termina el primer `page.update()` del bloque"""
+        inicio = time.perf_counter()
+        ova = self.ova_actual()
+        original = page.update
+        medido = False
+
+        def update(*controles):
+            nonlocal medido
+            original(*controles)
+            if not medido:
+                medido = True
+                self.registrar("primer_update", (time.perf_counter() - inicio) * 1000, ova=ova)
+
+        page.update = update
+        try:
+            yield
+        finally:
+            # Quitar el atributo de instancia para volver al método de la clase
+            del page.update
+
+    def tramos(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._tramos)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._tramos.clear()
+
+    def resumen(self) -> List[Dict[str, Any]]:
+        """Cantidad, p50 y p95 (ms) agrupados por OVA (o ruta) y fase"""
+        grupos: Dict[tuple, List[float]] = {}
+        for tramo in self.tramos():
+            origen = tramo["ova"] if tramo["ova"] is not None else tramo.get("ruta", "-")
+            grupos.setdefault((str(origen), tramo["fase"]), []).append(tramo["duracion_ms"])
+
+        filas = []
+        for (origen, fase), duraciones in grupos.items():
+            duraciones.sort()
+            filas.append({
+                "origen": origen,
+                "fase": fase,
+                "n": len(duraciones),
+                "p50": _percentil(duraciones, 0.50),
+                "p95": _percentil(duraciones, 0.95),
+            })
+        filas.sort(key=lambda f: (f["origen"], f["fase"]))
+        return filas
+
+
+# Instancia compartida por la aplicación
+traza = Trazador(archivo=os.environ.get("OVA_TRAZA_PERF"))
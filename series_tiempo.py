@@ -0,0 +1,154 @@
+"""Almacén de series diarias de casos con niveles de agregación en caché.
+
+`SerieDiaria` guarda los conteos de días consecutivos como un arreglo de
+NumPy junto con la fecha del primer día. Puede armarse desde conteos, desde
+pares (fecha, conteo) irregulares o desde un listado de casos (una fila por
+caso con su fecha de inicio de síntomas); en los dos últimos casos las
+fechas se agrupan por día con `np.bincount`.
+
+Todas las agregaciones salen de la suma acumulada: los totales por semana
+epidemiológica o por mes son diferencias de la suma acumulada en los
+límites de cada período, igual que las medias móviles y las tasas de
+crecimiento a 7 días. Cada nivel se calcula una vez y queda en caché, así que
+pasar de la vista diaria a la semanal (o acercar un rango de fechas) no
+vuelve a recorrer los datos crudos.
+"""
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+NIVELES = ("dia", "semana", "mes")
+Fecha = Union[str, np.datetime64]
+
+
+def semana_epidemiologica(inicios_semana: np.ndarray):
+    """Año y número de semana epidemiológica (semanas de domingo a sábado)
+
+    La semana 1 es la primera que tiene al menos cuatro días en el año, es
+    decir, la que contiene el primer miércoles de enero.
+    """
+    miercoles = inicios_semana.astype("datetime64[D]") + 3
+    anio = miercoles.astype("datetime64[Y]")
+    dia_del_anio = (miercoles - anio.astype("datetime64[D]")).astype(np.int64)
+    return anio.astype(np.int64) + 1970, dia_del_anio // 7 + 1
+
+
+class SerieDiaria:
+    """Conteos diarios consecutivos a partir de `inicio`"""
+
+    def __init__(self, inicio: Fecha, conteos):
+        self.inicio = np.datetime64(inicio, "D")
+        self.conteos = np.asarray(conteos, dtype=float)
+        if self.conteos.ndim != 1:
+            raise ValueError("Los conteos deben ser un arreglo de una dimensión")
+        self._acumulado = np.concatenate(([0.0], np.cumsum(self.conteos)))
+        self._niveles: Dict[str, Dict[str, np.ndarray]] = {}
+
+    @classmethod
+    def desde_eventos(cls, fechas) -> "SerieDiaria":
+        """Serie a partir de un listado de casos (una fecha de inicio por caso)"""
+        dias = np.asarray(fechas, dtype="datetime64[D]")
+        dias = dias[~np.isnat(dias)]
+        if dias.size == 0:
+            raise ValueError("El listado no tiene fechas válidas")
+        inicio = dias.min()
+        return cls(inicio, np.bincount((dias - inicio).astype(np.int64)))
+
+    @classmethod
+    def desde_fechas(cls, fechas, conteos) -> "SerieDiaria":
+        """Serie a partir de pares (fecha, conteo) sin orden; los días faltantes valen 0"""
+        dias = np.asarray(fechas, dtype="datetime64[D]")
+        inicio = dias.min()
+        return cls(inicio, np.bincount((dias - inicio).astype(np.int64), weights=np.asarray(conteos, dtype=float)))
+
+    def __len__(self) -> int:
+        return self.conteos.size
+
+    @property
+    def fechas(self) -> np.ndarray:
+        return self.inicio + np.arange(self.conteos.size)
+
+    @property
+    def total(self) -> float:
+        return float(self._acumulado[-1])
+
+    def acumulado(self) -> np.ndarray:
+        return self._acumulado[1:]
+
+    def _limites(self, nivel: str) -> np.ndarray:
+        """Índices (en días) donde empieza cada período del nivel, más el final"""
+        fechas = self.fechas
+        if nivel == "dia":
+            return np.arange(self.conteos.size + 1)
+        if nivel == "semana":
+            # Domingo de la semana de cada día (1970-01-01 fue jueves)
+            dia_semana = (fechas.astype(np.int64) + 4) % 7
+            periodo = fechas - dia_semana
+        elif nivel == "mes":
+            periodo = fechas.astype("datetime64[M]")
+        else:
+            raise ValueError(f"Nivel desconocido: {nivel}")
+        cambios = np.flatnonzero(periodo[1:] != periodo[:-1]) + 1
+        return np.concatenate(([0], cambios, [self.conteos.size]))
+
+    def agregada(self, nivel: str = "dia") -> Dict[str, np.ndarray]:
+        """Totales por período: {'inicio', 'conteos', 'dias', 'etiquetas'}
+
+        'inicio' es la fecha de inicio de cada período (para semanas, el
+        domingo, aunque la serie empiece a mitad de semana) y 'dias' cuántos
+        días de la serie cubre.
+        """
+        if nivel not in self._niveles:
+            limites = self._limites(nivel)
+            desde, hasta = limites[:-1], limites[1:]
+            primeros = self.inicio + desde
+            if nivel == "semana":
+                inicios = primeros - (primeros.astype(np.int64) + 4) % 7
+                anios, semanas = semana_epidemiologica(inicios)
+                etiquetas = np.char.add(np.char.add(anios.astype(str), "-S"), np.char.zfill(semanas.astype(str), 2))
+            elif nivel == "mes":
+                inicios = primeros.astype("datetime64[M]").astype("datetime64[D]")
+                etiquetas = np.datetime_as_string(inicios, unit="M")
+            else:
+                inicios = primeros
+                etiquetas = np.datetime_as_string(inicios, unit="D")
+            self._niveles[nivel] = {
+                "inicio": inicios,
+                "conteos": self._acumulado[hasta] - self._acumulado[desde],
+                "dias": hasta - desde,
+                "etiquetas": etiquetas,
+            }
+        return self._niveles[nivel]
+
+    def nivel_automatico(self, max_puntos: int = 400) -> str:
+        """Nivel más fino cuyo número de períodos no supera `max_puntos`"""
+        for nivel, dias in (("dia", 1), ("semana", 7)):
+            if len(self) / dias <= max_puntos:
+                return nivel
+        return "mes"
+
+    def rango(self, nivel: str, desde: Optional[Fecha] = None, hasta: Optional[Fecha] = None) -> Dict[str, np.ndarray]:
+        """Períodos del nivel que empiezan entre `desde` y `hasta` (para acercar la vista)"""
+        datos = self.agregada(nivel)
+        inicios = datos["inicio"]
+        i = 0 if desde is None else np.searchsorted(inicios, np.datetime64(desde, "D"), side="left")
+        j = inicios.size if hasta is None else np.searchsorted(inicios, np.datetime64(hasta, "D"), side="right")
+        return {clave: valores[i:j] for clave, valores in datos.items()}
+
+    def media_movil(self, ventana: int = 7) -> np.ndarray:
+        """Media móvil diaria hacia atrás; los primeros `ventana - 1` días quedan en NaN"""
+        medias = np.full(self.conteos.size, np.nan)
+        if self.conteos.size >= ventana:
+            medias[ventana - 1:] = (self._acumulado[ventana:] - self._acumulado[:-ventana]) / ventana
+        return medias
+
+    def crecimiento(self, ventana: int = 7) -> np.ndarray:
+        """Variación (%) de los casos de los últimos `ventana` días frente a los `ventana` anteriores"""
+        tasas = np.full(self.conteos.size, np.nan)
+        if self.conteos.size >= 2 * ventana:
+            c = self._acumulado
+            recientes = c[2 * ventana:] - c[ventana:-ventana]
+            previos = c[ventana:-ventana] - c[:-2 * ventana]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                tasas[2 * ventana - 1:] = np.where(previos > 0, (recientes / previos - 1) * 100, np.nan)
+        return tasas
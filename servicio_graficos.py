@@ -0,0 +1,352 @@
+"""Servicio compartido de renderizado de gráficos matplotlib fuera del hilo de UI.
+
+Las OVAs describen cada gráfico con una especificación (un diccionario con la
+clave "tipo" y los datos y opciones que necesite su función de dibujo). El
+servicio dibuja la figura en un pool de hilos con el backend Agg, la codifica
+en PNG base64 y la entrega como un `Future`. Mientras tanto la UI muestra un
+indicador de carga en lugar de bloquear el manejador de eventos.
+
+Se usa `matplotlib.figure.Figure` directamente (sin pyplot) para que cada
+figura sea independiente y pueda dibujarse desde cualquier hilo.
+
+Como la mayoría de los gráficos son función determinista de su
+especificación, las imágenes se guardan en una caché direccionada por el hash
+de la especificación: un nivel LRU en memoria con presupuesto en bytes y, si
+la variable de entorno OVA_CACHE_GRAFICOS apunta a un directorio, un nivel en
+disco que sobrevive a los reinicios, también acotado en bytes (los archivos
+menos usados se borran primero). La clave incluye la firma del código de la
+función de dibujo y la de los `rcParams` globales de matplotlib (tamaños de
+letra, estilos), porque algunas OVAs los modifican para todo el proceso.
+"""
+import base64
+import hashlib
+import io
+import os
+import threading
+import traceback
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+import flet as ft
+import matplotlib
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from rendimiento import traza
+
+Especificacion = Dict[str, Any]
+
+
+def _alimentar(h, valor: Any) -> None:
+    """Agrega `valor` al hash de forma canónica (el orden de las claves no importa)"""
+    if isinstance(valor, dict):
+        h.update(b"{")
+        for clave in sorted(valor, key=str):
+            _alimentar(h, clave)
+            _alimentar(h, valor[clave])
+        h.update(b"}")
+    elif isinstance(valor, (list, tuple)):
+        try:
+            arreglo = np.asarray(valor) if valor else None
+        except ValueError:
+            # Listas anidadas de distinto largo: se hashean elemento por elemento
+            arreglo = None
+        if arreglo is not None and arreglo.dtype.kind in "biuf":
+            # Listas numéricas: hashear el bloque de memoria de una vez
+            _alimentar(h, arreglo)
+        else:
+            h.update(b"[" + str(len(valor)).encode())
+            for item in valor:
+                _alimentar(h, item)
+            h.update(b"]")
+    elif isinstance(valor, np.ndarray):
+        h.update(f"nd{valor.dtype.str}{valor.shape}".encode())
+        h.update(np.ascontiguousarray(valor).tobytes())
+    else:
+        h.update(f"{type(valor).__name__}:{valor!r};".encode())
+
+
+def _firma_codigo(codigo) -> str:
+    """Huella estable del bytecode (incluye comprensiones y lambdas anidadas)"""
+    h = hashlib.blake2b(codigo.co_code, digest_size=16)
+    for constante in codigo.co_consts:
+        if hasattr(constante, "co_code"):
+            h.update(_firma_codigo(constante).encode())
+        else:
+            h.update(repr(constante).encode())
+    return h.hexdigest()
+
+
+_estilo_lock = threading.Lock()
+_estilo_actual: Dict[str, Any] = {}
+_estilo_firma = ""
+
+
+def _firma_estilo() -> str:
+    """Huella de los rcParams de matplotlib; solo se recalcula cuando cambian"""
+    global _estilo_actual, _estilo_firma
+    # Copia a nivel de dict (sin la validación de RcParams) y comparación en C
+    actual = dict.copy(matplotlib.rcParams)
+    with _estilo_lock:
+        if actual != _estilo_actual or not _estilo_firma:
+            _estilo_actual = actual
+            texto = repr(sorted(actual.items(), key=lambda par: par[0]))
+            _estilo_firma = hashlib.blake2b(texto.encode(), digest_size=16).hexdigest()
+        return _estilo_firma
+
+
+class CacheGraficos:
+    """Caché de imágenes en base64 indexada por el hash de la especificación"""
+
+    def __init__(self, presupuesto_bytes: int = 64 * 1024 * 1024, directorio: Optional[str] = None,
+                 presupuesto_disco: int = 256 * 1024 * 1024):
+        self.presupuesto_bytes = presupuesto_bytes
+        self.presupuesto_disco = presupuesto_disco
+        self.directorio = Path(directorio) if directorio else None
+        self._memoria: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        # Archivos en disco (clave -> bytes) del menos al más usado; se lee al primer uso
+        self._disco: "Optional[OrderedDict[str, int]]" = None
+        self._bytes_disco = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def clave(spec: Especificacion) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        _alimentar(h, spec)
+        return h.hexdigest()
+
+    def _ruta(self, clave: str) -> Optional[Path]:
+        return self.directorio / f"{clave}.png" if self.directorio else None
+
+    def obtener(self, clave: str) -> Optional[str]:
+        with self._lock:
+            imagen = self._memoria.get(clave)
+            if imagen is not None:
+                self._memoria.move_to_end(clave)
+                return imagen
+
+        ruta = self._ruta(clave)
+        if ruta is None or not ruta.exists():
+            return None
+        try:
+            imagen = base64.b64encode(ruta.read_bytes()).decode()
+            # La fecha de modificación marca el uso para el orden LRU entre reinicios
+            os.utime(ruta)
+        except OSError:
+            return None
+        with self._lock:
+            disco = self._indice_disco()
+            if clave in disco:
+                disco.move_to_end(clave)
+        self._guardar_en_memoria(clave, imagen)
+        return imagen
+
+    def _indice_disco(self) -> "OrderedDict[str, int]":
+        """Índice de los PNG del directorio ordenado por último uso (llamar con el lock tomado)"""
+        if self._disco is None:
+            archivos = []
+            if self.directorio is not None and self.directorio.is_dir():
+                for ruta in self.directorio.glob("*.png"):
+                    try:
+                        info = ruta.stat()
+                    except OSError:
+                        continue
+                    archivos.append((info.st_mtime, ruta.stem, info.st_size))
+            archivos.sort()
+            self._disco = OrderedDict((clave, tamano) for _, clave, tamano in archivos)
+            self._bytes_disco = sum(self._disco.values())
+        return self._disco
+
+    def guardar(self, clave: str, imagen: str) -> None:
+        self._guardar_en_memoria(clave, imagen)
+        ruta = self._ruta(clave)
+        if ruta is None:
+            return
+        try:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            temporal = ruta.with_suffix(".tmp")
+            contenido = base64.b64decode(imagen)
+            temporal.write_bytes(contenido)
+            os.replace(temporal, ruta)
+        except OSError:
+            # El nivel en disco es opcional
+            traceback.print_exc()
+            return
+
+        with self._lock:
+            disco = self._indice_disco()
+            self._bytes_disco += len(contenido) - disco.pop(clave, 0)
+            disco[clave] = len(contenido)
+            # Borrar los archivos menos usados hasta entrar en el presupuesto
+            while self._bytes_disco > self.presupuesto_disco and len(disco) > 1:
+                desalojada, tamano = disco.popitem(last=False)
+                self._bytes_disco -= tamano
+                try:
+                    self._ruta(desalojada).unlink()
+                except OSError:
+                    pass
+
+    def _guardar_en_memoria(self, clave: str, imagen: str) -> None:
+        with self._lock:
+            anterior = self._memoria.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            self._memoria[clave] = imagen
+            self._bytes += len(imagen)
+            # Desalojar las menos usadas hasta entrar en el presupuesto
+            while self._bytes > self.presupuesto_bytes and len(self._memoria) > 1:
+                _, desalojada = self._memoria.popitem(last=False)
+                self._bytes -= len(desalojada)
+
+    def limpiar(self) -> None:
+        """Vacía el nivel en memoria (los archivos en disco se conservan)"""
+        with self._lock:
+            self._memoria.clear()
+            self._bytes = 0
+
+
+class ServicioGraficos:
+    """Pool de renderizado de gráficos con tipos registrados por nombre"""
+
+    def __init__(self, max_workers: int = 2, cache: Optional[CacheGraficos] = None):
+        self._tipos: Dict[str, Callable[[Figure, Especificacion], None]] = {}
+        self._firmas: Dict[str, str] = {}
+        self._max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.cache = cache if cache is not None else CacheGraficos()
+        # Renderizados en curso por clave, para no dibujar dos veces lo mismo
+        self._en_curso: Dict[str, Future] = {}
+        # Último pedido de cada imagen: un resultado más viejo no la sobrescribe
+        self._turnos: "weakref.WeakKeyDictionary[ft.Image, int]" = weakref.WeakKeyDictionary()
+
+    def registrar(self, tipo: str, dibujar: Callable[[Figure, Especificacion], None]) -> None:
+        """Asocia `tipo` con una función `dibujar(fig, spec)` que dibuja sobre la figura"""
+        self._tipos[tipo] = dibujar
+        # La firma del código entra en la clave de caché: si la OVA cambia su
+        # función de dibujo, las imágenes guardadas dejan de coincidir.
+        codigo = getattr(dibujar, "__code__", None)
+        self._firmas[tipo] = _firma_codigo(codigo) if codigo else repr(dibujar)
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="graficos"
+                )
+            return self._executor
+
+    def renderizar(self, spec: Especificacion) -> str:
+        """Dibuja `spec` en el hilo actual y devuelve el PNG en base64"""
+        dibujar = self._tipos.get(spec["tipo"])
+        if dibujar is None:
+            raise KeyError(f"Tipo de gráfico no registrado: {spec['tipo']}")
+
+        fig = Figure(figsize=spec.get("figsize", (8, 6)))
+        FigureCanvasAgg(fig)
+        dibujar(fig, spec)
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=spec.get("dpi", 100), bbox_inches="tight")
+        return base64.b64encode(buffer.getvalue()).decode()
+
+    def _renderizar_medido(self, spec: Especificacion, ova: Optional[str], clave: str) -> str:
+        try:
+            with traza.tramo("grafico", ova=ova, tipo=spec["tipo"]):
+                imagen = self.renderizar(spec)
+            self.cache.guardar(clave, imagen)
+            return imagen
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave, None)
+
+    def enviar(self, spec: Especificacion) -> Future:
+        """Encola `spec` en el pool; el Future resuelve al PNG en base64
+
+        Si la imagen ya está en caché se devuelve un Future ya resuelto.
+        """
+        clave = self.cache.clave({"spec": spec, "firma": self._firmas.get(spec["tipo"]), "estilo": _firma_estilo()})
+        imagen = self.cache.obtener(clave)
+        if imagen is not None:
+            futuro = Future()
+            futuro.set_result(imagen)
+            return futuro
+
+        pool = self._pool()
+        with self._lock:
+            futuro = self._en_curso.get(clave)
+            if futuro is None:
+                # La OVA activa se captura aquí porque el hilo del pool no la conoce
+                futuro = pool.submit(self._renderizar_medido, spec, traza.ova_actual(), clave)
+                self._en_curso[clave] = futuro
+        return futuro
+
+    def imagen(self, spec: Especificacion, **kwargs: Any) -> ft.Container:
+        """Control que muestra un indicador de carga hasta que llega la imagen
+
+        Los argumentos extra (width, height, fit, ...) se pasan a `ft.Image`.
+        """
+        contenedor = ft.Container(
+            content=ft.ProgressRing(),
+            width=kwargs.get("width"),
+            height=kwargs.get("height"),
+            alignment=ft.alignment.center,
+        )
+
+        def listo(futuro: Future):
+            try:
+                contenedor.content = ft.Image(src_base64=futuro.result(), **kwargs)
+            except Exception:
+                traceback.print_exc()
+                contenedor.content = ft.Text("No se pudo generar el gráfico", color=ft.colors.RED)
+            _refrescar(contenedor)
+
+        self.enviar(spec).add_done_callback(listo)
+        return contenedor
+
+    def asignar(self, imagen: ft.Image, spec: Especificacion) -> Future:
+        """Renderiza `spec` en segundo plano y lo coloca en una `ft.Image` existente
+
+        Mientras llega, la imagen anterior se atenúa como marcador de posición.
+        Si antes de que termine se asigna otra especificación a la misma
+        imagen, este resultado se descarta.
+        """
+        with self._lock:
+            turno = self._turnos.get(imagen, 0) + 1
+            self._turnos[imagen] = turno
+        imagen.opacity = 0.4
+        futuro = self.enviar(spec)
+
+        def listo(futuro: Future):
+            with self._lock:
+                if self._turnos.get(imagen) != turno:
+                    return
+            try:
+                imagen.src_base64 = futuro.result()
+                imagen.src = None
+            except Exception:
+                traceback.print_exc()
+            imagen.opacity = 1
+            _refrescar(imagen)
+
+        futuro.add_done_callback(listo)
+        return futuro
+
+
+def _refrescar(control: ft.Control) -> None:
+    # Si el control aún no está en la página, el próximo page.update() del
+    # llamador enviará el contenido ya actualizado.
+    if control.page is not None:
+        try:
+            control.update()
+        except AssertionError:
+            pass
+
+
+# Instancia compartida por todas las OVAs
+servicio_graficos = ServicioGraficos(cache=CacheGraficos(directorio=os.environ.get("OVA_CACHE_GRAFICOS")))
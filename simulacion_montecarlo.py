@@ -0,0 +1,153 @@
+"""Distribución muestral de la asimetría y la curtosis por Monte Carlo.
+
+Para una configuración (distribución, n, forma) se extraen miles de muestras
+réplica y se calcula la asimetría g1 y el exceso de curtosis g2 de cada una.
+Las réplicas se generan por lotes como una matriz (réplicas × n) y los
+momentos se calculan por filas de forma vectorizada; los lotes se reparten en
+el pool de procesos compartido y sus resultados llegan a la UI a medida que
+terminan.
+"""
+import threading
+import traceback
+from concurrent.futures import Future
+from typing import Callable, List, Optional
+
+import numpy as np
+from scipy import stats
+
+from procesos import pool_procesos
+
+# Valores por lote (réplicas × n) que procesa cada tarea del pool
+VALORES_POR_LOTE = 200_000
+
+
+def generar_replicas(dist_type: str, n: int, shape_param: float, replicas: int,
+                     rng: np.random.Generator) -> np.ndarray:
+    """Matriz (replicas × n) con las mismas distribuciones que el simulador de OVA 6"""
+    tamano = (replicas, n)
+    if dist_type == "normal":
+        return rng.normal(100, 15, tamano)
+    if dist_type == "skewed":
+        return stats.skewnorm.rvs(a=shape_param, loc=100, scale=15, size=tamano, random_state=rng)
+    if dist_type == "negskewed":
+        return stats.skewnorm.rvs(a=-shape_param, loc=100, scale=15, size=tamano, random_state=rng)
+    if dist_type == "leptokurtic":
+        df = max(3, 10 - shape_param)
+        return stats.t.rvs(df=df, loc=100, scale=15, size=tamano, random_state=rng)
+    if dist_type == "platykurtic":
+        width = 15 * shape_param * 2
+        return rng.uniform(100 - width, 100 + width, tamano)
+    raise ValueError(f"Distribución desconocida: {dist_type}")
+
+
+def momentos_por_fila(muestras: np.ndarray):
+    """Asimetría g1 y exceso de curtosis g2 de cada fila (como scipy con bias=True)"""
+    desvios = muestras - muestras.mean(axis=1, keepdims=True)
+    cuadrados = desvios * desvios
+    m2 = cuadrados.mean(axis=1)
+    m3 = (cuadrados * desvios).mean(axis=1)
+    m4 = (cuadrados * cuadrados).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        asimetria = np.where(m2 > 0, m3 / m2 ** 1.5, 0.0)
+        curtosis = np.where(m2 > 0, m4 / (m2 * m2) - 3, 0.0)
+    return asimetria, curtosis
+
+
+def procesar_lote(dist_type: str, n: int, shape_param: float, replicas: int,
+                  semilla: np.random.SeedSequence):
+    """Tarea del pool: genera un lote de réplicas y devuelve (g1, g2) por réplica"""
+    rng = np.random.default_rng(semilla)
+    return momentos_por_fila(generar_replicas(dist_type, n, shape_param, replicas, rng))
+
+
+def rechaza_normalidad(asimetria: np.ndarray, curtosis: np.ndarray) -> np.ndarray:
+    """Regla práctica de OVA 6: normalidad aceptable si |g1| < 2 y |g2| < 7"""
+    return ~((np.abs(asimetria) < 2) & (np.abs(curtosis) < 7))
+
+
+class CorridaMuestreo:
+    """Resultados acumulados de una exploración en curso"""
+
+    def __init__(self, dist_type: str, n: int, shape_param: float, replicas: int):
+        self.config = (dist_type, n, shape_param)
+        self.total = replicas
+        self.completadas = 0
+        self.rechazos = 0
+        self.error: Optional[BaseException] = None
+        self.cancelada = False
+        self._asimetrias: List[np.ndarray] = []
+        self._curtosis: List[np.ndarray] = []
+        self._futuros: List[Future] = []
+        self._lock = threading.Lock()
+
+    @property
+    def terminada(self) -> bool:
+        return self.cancelada or self.error is not None or self.completadas >= self.total
+
+    @property
+    def tasa_rechazo(self) -> float:
+        return self.rechazos / self.completadas if self.completadas else 0.0
+
+    def asimetrias(self) -> np.ndarray:
+        with self._lock:
+            return np.concatenate(self._asimetrias) if self._asimetrias else np.empty(0)
+
+    def curtosis(self) -> np.ndarray:
+        with self._lock:
+            return np.concatenate(self._curtosis) if self._curtosis else np.empty(0)
+
+    def cancelar(self) -> None:
+        """Descarta los lotes pendientes; los que ya corren se ignoran al terminar"""
+        self.cancelada = True
+        for futuro in self._futuros:
+            futuro.cancel()
+
+    def _agregar(self, asimetria: np.ndarray, curtosis: np.ndarray) -> None:
+        with self._lock:
+            self._asimetrias.append(asimetria)
+            self._curtosis.append(curtosis)
+            self.completadas += asimetria.size
+            self.rechazos += int(rechaza_normalidad(asimetria, curtosis).sum())
+
+
+class ExploradorMuestreo:
+    """Reparte los lotes de réplicas en el pool de procesos compartido"""
+
+    def explorar(self, dist_type: str, n: int, shape_param: float, replicas: int = 2000,
+                 al_avanzar: Optional[Callable[[CorridaMuestreo], None]] = None) -> CorridaMuestreo:
+        """Lanza `replicas` muestras de tamaño `n` y devuelve la corrida en curso
+
+        `al_avanzar(corrida)` se llama cada vez que termina un lote (desde un
+        hilo del pool, no desde el de la UI).
+        """
+        corrida = CorridaMuestreo(dist_type, n, shape_param, replicas)
+        por_lote = max(1, min(replicas, VALORES_POR_LOTE // max(n, 1)))
+        tamanos = [min(por_lote, replicas - inicio) for inicio in range(0, replicas, por_lote)]
+        semillas = np.random.SeedSequence().spawn(len(tamanos))
+
+        def listo(futuro: Future):
+            if corrida.cancelada or futuro.cancelled():
+                return
+            try:
+                asimetria, curtosis = futuro.result()
+            except Exception as exc:
+                traceback.print_exc()
+                corrida.error = exc
+            else:
+                corrida._agregar(asimetria, curtosis)
+            if al_avanzar is not None:
+                try:
+                    al_avanzar(corrida)
+                except Exception:
+                    traceback.print_exc()
+
+        pool = pool_procesos()
+        for tamano, semilla in zip(tamanos, semillas):
+            futuro = pool.submit(procesar_lote, dist_type, n, shape_param, tamano, semilla)
+            corrida._futuros.append(futuro)
+            futuro.add_done_callback(listo)
+        return corrida
+
+
+# Instancia compartida por la aplicación
+explorador_muestreo = ExploradorMuestreo()
@@ -0,0 +1,201 @@
+"""Tablas de contingencia de dos y tres vías a partir de registros crudos.
+
+Cada variable se codifica una sola vez como enteros 0..k-1 (por hash, con
+`pd.factorize`). Una tabla es entonces un `np.bincount` sobre la clave
+combinada `(estrato · k_fila + fila) · k_columna + columna`, que escala a
+millones de registros sin agrupar en Python.
+
+De cada tabla se obtienen los porcentajes por fila, por columna y del
+total, la prueba chi-cuadrado de independencia y, si hay una variable de
+estratificación, el resumen de Cochran–Mantel–Haenszel (y la razón de odds
+de Mantel–Haenszel cuando la tabla es 2 × 2). Los resultados se guardan en
+caché por (variables, filtro), así que cambiar entre porcentajes por fila y
+por columna no recalcula nada.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Filtro: pares (variable, valor) que deben cumplirse a la vez
+Filtro = Tuple[Tuple[str, str], ...]
+
+
+def porcentajes(conteos: np.ndarray) -> Dict[str, np.ndarray]:
+    """Porcentajes por fila, por columna y del total sobre los dos últimos ejes"""
+    conteos = np.asarray(conteos, dtype=float)
+    filas = conteos.sum(axis=-1, keepdims=True)
+    columnas = conteos.sum(axis=-2, keepdims=True)
+    total = conteos.sum(axis=(-2, -1), keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "fila": np.where(filas > 0, conteos / filas * 100, 0.0),
+            "columna": np.where(columnas > 0, conteos / columnas * 100, 0.0),
+            "total": np.where(total > 0, conteos / total * 100, 0.0),
+        }
+
+
+def chi_cuadrado(conteos: np.ndarray) -> Dict[str, float]:
+    """Chi-cuadrado de independencia de Pearson (filas o columnas vacías se omiten)"""
+    conteos = np.asarray(conteos, dtype=float)
+    conteos = conteos[conteos.sum(axis=1) > 0][:, conteos.sum(axis=0) > 0]
+    r, c = conteos.shape
+    if r < 2 or c < 2:
+        return {"estadistico": float("nan"), "gl": 0, "p": float("nan"), "esperado_minimo": float("nan")}
+    esperados = np.outer(conteos.sum(axis=1), conteos.sum(axis=0)) / conteos.sum()
+    estadistico = float(((conteos - esperados) ** 2 / esperados).sum())
+    gl = (r - 1) * (c - 1)
+    return {
+        "estadistico": estadistico,
+        "gl": gl,
+        "p": float(stats.chi2.sf(estadistico, gl)),
+        "esperado_minimo": float(esperados.min()),
+    }
+
+
+def mantel_haenszel(conteos: np.ndarray, nivel: float = 0.95) -> Optional[Dict[str, float]]:
+    """Prueba de Cochran–Mantel–Haenszel de asociación general para tablas (estratos × r × c)
+
+    Para tablas 2 × 2 agrega la razón de odds de Mantel–Haenszel con su
+    intervalo de Robins–Breslow–Greenland. Los estratos con menos de dos
+    registros no aportan información y se omiten.
+    """
+    conteos = np.asarray(conteos, dtype=float)
+    conteos = conteos[conteos.sum(axis=(1, 2)) > 1]
+    if conteos.shape[0] == 0:
+        return None
+    _, r, c = conteos.shape
+    if r < 2 or c < 2:
+        return None
+
+    n = conteos.sum(axis=(1, 2))
+    p_fila = conteos.sum(axis=2) / n[:, None]
+    p_columna = conteos.sum(axis=1) / n[:, None]
+
+    # Celdas libres (r-1)(c-1) de cada estrato: observadas, esperadas y covarianza
+    observadas = conteos[:, :-1, :-1].reshape(len(n), -1)
+    esperadas = (n[:, None, None] * p_fila[:, :-1, None] * p_columna[:, None, :-1]).reshape(len(n), -1)
+    v_fila = np.einsum("hi,ij->hij", p_fila[:, :-1], np.eye(r - 1)) - p_fila[:, :-1, None] * p_fila[:, None, :-1]
+    v_columna = np.einsum("hi,ij->hij", p_columna[:, :-1], np.eye(c - 1)) - p_columna[:, :-1, None] * p_columna[:, None, :-1]
+    covarianza = np.einsum("hab,hcd->hacbd", v_fila, v_columna).reshape(len(n), (r - 1) * (c - 1), -1)
+    covarianza = (covarianza * (n ** 2 / (n - 1))[:, None, None]).sum(axis=0)
+    diferencia = (observadas - esperadas).sum(axis=0)
+
+    gl = (r - 1) * (c - 1)
+    try:
+        estadistico = float(diferencia @ np.linalg.solve(covarianza, diferencia))
+    except np.linalg.LinAlgError:
+        estadistico = float(diferencia @ np.linalg.pinv(covarianza) @ diferencia)
+    resultado = {
+        "estadistico": estadistico,
+        "gl": gl,
+        "p": float(stats.chi2.sf(estadistico, gl)),
+        "estratos": int(len(n)),
+    }
+
+    if (r, c) == (2, 2):
+        a, b = conteos[:, 0, 0], conteos[:, 0, 1]
+        cc, d = conteos[:, 1, 0], conteos[:, 1, 1]
+        R, S = a * d / n, b * cc / n
+        P, Q = (a + d) / n, (b + cc) / n
+        suma_r, suma_s = R.sum(), S.sum()
+        if suma_r > 0 and suma_s > 0:
+            razon = suma_r / suma_s
+            varianza_log = ((P * R).sum() / (2 * suma_r ** 2)
+                            + (P * S + Q * R).sum() / (2 * suma_r * suma_s)
+                            + (Q * S).sum() / (2 * suma_s ** 2))
+            z = stats.norm.ppf(1 - (1 - nivel) / 2)
+            margen = z * np.sqrt(varianza_log)
+            resultado.update({
+                "odds_ratio": float(razon),
+                "ic_inferior": float(np.exp(np.log(razon) - margen)),
+                "ic_superior": float(np.exp(np.log(razon) + margen)),
+            })
+        with np.errstate(divide="ignore", invalid="ignore"):
+            por_estrato = np.where((b * cc) > 0, a * d / (b * cc), np.nan)
+        resultado["odds_ratio_estratos"] = por_estrato
+    return resultado
+
+
+class MotorContingencia:
+    """Codifica las variables de una tabla de registros y arma tablas cruzadas con caché"""
+
+    def __init__(self, datos: pd.DataFrame, capacidad: int = 32):
+        self.n = len(datos)
+        self.variables: List[str] = list(datos.columns)
+        self._codigos: Dict[str, np.ndarray] = {}
+        self._etiquetas: Dict[str, List[str]] = {}
+        for variable in self.variables:
+            codigos, etiquetas = pd.factorize(datos[variable], sort=True)
+            self._codigos[variable] = codigos.astype(np.int64)
+            self._etiquetas[variable] = [str(e) for e in etiquetas]
+        self._lock = threading.Lock()
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._capacidad = capacidad
+
+    def categorias(self, variable: str) -> List[str]:
+        return self._etiquetas[variable]
+
+    def _mascara(self, variables: List[str], filtro: Filtro) -> np.ndarray:
+        """Registros con dato en todas las variables y que cumplen el filtro"""
+        mascara = np.ones(self.n, dtype=bool)
+        for variable in variables:
+            mascara &= self._codigos[variable] >= 0
+        for variable, valor in filtro:
+            etiquetas = self._etiquetas[variable]
+            codigo = etiquetas.index(valor) if valor in etiquetas else -2
+            mascara &= self._codigos[variable] == codigo
+        return mascara
+
+    def tabla(self, fila: str, columna: str, estrato: Optional[str] = None,
+              filtro: Filtro = ()) -> Dict[str, Any]:
+        """Tabla cruzada de `fila` × `columna` (opcionalmente por `estrato`) con sus resúmenes
+
+        Devuelve las etiquetas, 'conteos' (r × c), 'porcentajes' ('fila',
+        'columna', 'total'), 'chi2' y 'excluidos'; con estrato agrega
+        'conteos_estrato' (s × r × c), sus porcentajes y 'mantel_haenszel'.
+        """
+        clave = (fila, columna, estrato, tuple(filtro))
+        with self._lock:
+            if clave in self._cache:
+                self._cache.move_to_end(clave)
+                return self._cache[clave]
+
+        variables = [fila, columna] + ([estrato] if estrato else [])
+        mascara = self._mascara(variables, filtro)
+        k_fila, k_columna = len(self._etiquetas[fila]), len(self._etiquetas[columna])
+        clave_celda = self._codigos[fila][mascara] * k_columna + self._codigos[columna][mascara]
+        k_estrato = 1
+        if estrato:
+            k_estrato = len(self._etiquetas[estrato])
+            clave_celda += self._codigos[estrato][mascara] * (k_fila * k_columna)
+        conteos_estrato = np.bincount(clave_celda, minlength=k_estrato * k_fila * k_columna)
+        conteos_estrato = conteos_estrato.reshape(k_estrato, k_fila, k_columna)
+        conteos = conteos_estrato.sum(axis=0)
+
+        resultado: Dict[str, Any] = {
+            "filas": self._etiquetas[fila],
+            "columnas": self._etiquetas[columna],
+            "conteos": conteos,
+            "total": int(conteos.sum()),
+            "excluidos": int(self.n - mascara.sum()),
+            "porcentajes": porcentajes(conteos),
+            "chi2": chi_cuadrado(conteos),
+        }
+        if estrato:
+            resultado.update({
+                "estratos": self._etiquetas[estrato],
+                "conteos_estrato": conteos_estrato,
+                "porcentajes_estrato": porcentajes(conteos_estrato),
+                "chi2_estrato": [chi_cuadrado(t) for t in conteos_estrato],
+                "mantel_haenszel": mantel_haenszel(conteos_estrato),
+            })
+
+        with self._lock:
+            self._cache[clave] = resultado
+            while len(self._cache) > self._capacidad:
+                self._cache.popitem(last=False)
+        return resultado
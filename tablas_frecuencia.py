@@ -0,0 +1,158 @@
+"""Tablas de frecuencias de variables categóricas a partir de observaciones crudas.
+
+`ConteoCategorias` cuenta las categorías de un arreglo (o de una columna de
+CSV leída por bloques) y los conteos de distintos bloques se combinan
+alineando por categoría, así que un archivo de millones de filas se procesa
+como flujo. Los valores de texto se cuentan por hash (`value_counts` de
+pandas) y los numéricos con `np.unique`.
+
+`tabla` ordena por frecuencia, puede quedarse con las k categorías más
+frecuentes y agrupar el resto en "Otros", y calcula los intervalos de Wald,
+Wilson y Clopper–Pearson de todas las proporciones a la vez.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+# Filas por bloque al leer una columna de CSV
+FILAS_POR_BLOQUE = 500_000
+METODOS_INTERVALO = ("wald", "wilson", "clopper_pearson")
+
+
+def intervalos_proporcion(conteos, total: int, nivel: float = 0.95) -> Dict[str, np.ndarray]:
+    """Intervalos de Wald, Wilson y Clopper–Pearson para conteos/total, vectorizados
+
+    Cada método devuelve una matriz (k × 2) con los límites inferior y superior
+    como proporciones en [0, 1].
+    """
+    x = np.asarray(conteos, dtype=float)
+    n = float(total)
+    if n <= 0:
+        raise ValueError("El total debe ser positivo")
+    p = x / n
+    z = stats.norm.ppf(1 - (1 - nivel) / 2)
+
+    margen = z * np.sqrt(p * (1 - p) / n)
+    wald = np.clip(np.column_stack([p - margen, p + margen]), 0.0, 1.0)
+
+    z2 = z * z
+    centro = (p + z2 / (2 * n)) / (1 + z2 / n)
+    medio_ancho = z * np.sqrt(p * (1 - p) / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    wilson = np.clip(np.column_stack([centro - medio_ancho, centro + medio_ancho]), 0.0, 1.0)
+
+    alfa = 1 - nivel
+    with np.errstate(invalid="ignore"):
+        inferior = np.where(x > 0, stats.beta.ppf(alfa / 2, x, n - x + 1), 0.0)
+        superior = np.where(x < n, stats.beta.ppf(1 - alfa / 2, x + 1, n - x), 1.0)
+    clopper_pearson = np.column_stack([inferior, superior])
+
+    return {"wald": wald, "wilson": wilson, "clopper_pearson": clopper_pearson}
+
+
+def _etiqueta(categoria: Any) -> str:
+    """Texto de una categoría; los códigos numéricos enteros se muestran sin decimales"""
+    if isinstance(categoria, (float, np.floating)) and float(categoria).is_integer():
+        return str(int(categoria))
+    return str(categoria)
+
+
+class ConteoCategorias:
+    """Frecuencias por categoría, combinables entre bloques"""
+
+    def __init__(self):
+        self._conteos = pd.Series(dtype=np.int64)
+        self.faltantes = 0
+
+    @property
+    def total(self) -> int:
+        return int(self._conteos.sum())
+
+    @property
+    def categorias(self) -> int:
+        return int(self._conteos.size)
+
+    def _sumar(self, conteos: pd.Series) -> None:
+        if conteos.empty:
+            return
+        if self._conteos.empty:
+            self._conteos = conteos.astype(np.int64)
+        else:
+            self._conteos = self._conteos.add(conteos, fill_value=0).astype(np.int64)
+
+    def agregar(self, valores) -> None:
+        """Cuenta un bloque de observaciones (los faltantes se registran aparte)"""
+        serie = valores if isinstance(valores, pd.Series) else pd.Series(np.asarray(valores).ravel())
+        if pd.api.types.is_numeric_dtype(serie.dtype) and not pd.api.types.is_bool_dtype(serie.dtype):
+            datos = serie.to_numpy()
+            validos = datos[~pd.isna(datos)]
+            self.faltantes += datos.size - validos.size
+            etiquetas, conteos = np.unique(validos, return_counts=True)
+            self._sumar(pd.Series(conteos, index=etiquetas))
+        else:
+            conteos = serie.value_counts(dropna=True, sort=False)
+            self.faltantes += int(serie.size - conteos.sum())
+            self._sumar(conteos)
+
+    def agregar_conteos(self, categorias: Iterable[Any], conteos: Iterable[int]) -> None:
+        """Suma conteos ya agregados (por ejemplo, filas "categoría,frecuencia")"""
+        serie = pd.Series(list(conteos), index=list(categorias), dtype=np.int64)
+        if (serie < 0).any():
+            raise ValueError("Las frecuencias no pueden ser negativas")
+        self._sumar(serie.groupby(level=0, sort=False).sum())
+
+    def agregar_bloques(self, bloques: Iterable[Any]) -> None:
+        for bloque in bloques:
+            self.agregar(bloque)
+
+    def merge(self, otro: "ConteoCategorias") -> None:
+        self._sumar(otro._conteos)
+        self.faltantes += otro.faltantes
+
+    @classmethod
+    def desde_csv(cls, ruta: Union[str, Path], columna: str,
+                  filas_por_bloque: int = FILAS_POR_BLOQUE) -> "ConteoCategorias":
+        """Cuenta una columna de un CSV leyéndolo por bloques
+
+        La columna se lee como texto para que una misma categoría tenga la
+        misma etiqueta en todos los bloques.
+        """
+        conteo = cls()
+        for bloque in pd.read_csv(ruta, usecols=[columna], dtype=str, chunksize=filas_por_bloque):
+            conteo.agregar(bloque[columna].str.strip().replace("", np.nan))
+        return conteo
+
+    def tabla(self, top_k: Optional[int] = None, nivel: float = 0.95,
+              etiqueta_otros: str = "Otros") -> Dict[str, Any]:
+        """Tabla ordenada por frecuencia con proporciones e intervalos
+
+        Con `top_k` se conservan las k categorías más frecuentes y las demás
+        se suman en una fila `etiqueta_otros`. Devuelve 'categorias', 'n',
+        'proporcion', un intervalo (k × 2) por método, 'total', 'faltantes' y
+        'agrupadas' (cuántas categorías quedaron dentro de "Otros").
+        """
+        total = self.total
+        if total == 0:
+            raise ValueError("No hay observaciones para tabular")
+        # Orden estable por frecuencia descendente (empates en orden de aparición)
+        ordenados = self._conteos.iloc[np.argsort(-self._conteos.to_numpy(), kind="stable")]
+        categorias = [_etiqueta(c) for c in ordenados.index]
+        conteos = ordenados.to_numpy()
+        agrupadas = 0
+        if top_k is not None and len(categorias) > top_k:
+            agrupadas = len(categorias) - top_k
+            categorias = categorias[:top_k] + [etiqueta_otros]
+            conteos = np.append(conteos[:top_k], conteos[top_k:].sum())
+
+        resultado = {
+            "categorias": categorias,
+            "n": conteos,
+            "proporcion": conteos / total,
+            "total": total,
+            "faltantes": self.faltantes,
+            "agrupadas": agrupadas,
+        }
+        resultado.update(intervalos_proporcion(conteos, total, nivel))
+        return resultado